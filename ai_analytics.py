@@ -1,19 +1,25 @@
 
-import numpy as np
-from scipy.cluster.hierarchy import linkage, fcluster
-from scipy.spatial.distance import pdist
+# numpy, scipy and requests are imported inside the functions that use them, so that
+# importing this module (and starting a web worker) does not pay for loading them.
 from datetime import datetime, timedelta
+import os
 import re
 import logging
-import requests
 import time
 from functools import lru_cache
-from deep_translator import GoogleTranslator
+from instrumentation import span, timed
+from translate import translate_text
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Names exported by 'from ai_analytics import *'; translation helpers come from translate.py
+__all__ = [
+    'NAKURU_LANDMARKS', 'geocode_location', 'fuzzy_match_location', 'detect_spam', 'detect_anomalies',
+    'perform_clustering', 'calculate_hotspot_density', 'analyze_trends', 'generate_patrol_recommendations',
+]
+
 # PART 1: ENHANCED GEOCODING WITH MULTIPLE STRATEGIES
 
 # Comprehensive landmark database for Nakuru County
@@ -61,6 +67,31 @@ NAKURU_LANDMARKS = {
 }
 
 
+# Nominatim search endpoint; overridable to point at a mirror or a local stub
+NOMINATIM_URL = os.environ.get('NOMINATIM_URL', 'https://nominatim.openstreetmap.org/search')
+NOMINATIM_HEADERS = {'User-Agent': 'NakuruSafetyPlatform/3.0'}
+NOMINATIM_TIMEOUT = 8
+
+
+def nominatim_params(query):
+    """Query parameters for a single Kenyan Nominatim search"""
+    return {'q': query, 'format': 'json', 'limit': 1, 'countrycodes': 'ke'}
+
+
+def nominatim_queries(location_name, constituency):
+    """Search strings tried in order: constituency-qualified, then town-wide"""
+    return [f"{location_name}, {constituency}, Nakuru County, Kenya", f"{location_name}, Nakuru, Kenya"]
+
+
+def parse_nominatim(results):
+    """Return (lat, lon) from a Nominatim JSON result if it lies in Nakuru County, else None"""
+    if results:
+        lat, lon = float(results[0]['lat']), float(results[0]['lon'])
+        if -1.2 <= lat <= 0.2 and 35.7 <= lon <= 36.5:
+            return lat, lon
+    return None
+
+
 @lru_cache(maxsize=500)
 def geocode_location(location_name, constituency="Nakuru", retries=3):
     """
@@ -73,39 +104,27 @@ def geocode_location(location_name, constituency="Nakuru", retries=3):
         return coords
 
     # Strategy 2: Online geocoding with Nominatim
+    import requests
+
+    search_query, fallback_query = nominatim_queries(location_name, constituency)
     for attempt in range(retries):
         try:
-            search_query = f"{location_name}, {constituency}, Nakuru County, Kenya"
+            with span('nominatim', 'external'):
+                response = requests.get(NOMINATIM_URL, params=nominatim_params(search_query),
+                                        headers=NOMINATIM_HEADERS, timeout=NOMINATIM_TIMEOUT)
 
-            response = requests.get(
-                "https://nominatim.openstreetmap.org/search",
-                params={'q': search_query, 'format': 'json', 'limit': 1, 'countrycodes': 'ke'},
-                headers={'User-Agent': 'NakuruSafetyPlatform/3.0'},
-                timeout=8
-            )
-
-            if response.status_code == 200 and response.json():
-                data = response.json()[0]
-                lat, lon = float(data['lat']), float(data['lon'])
-
-                if -1.2 <= lat <= 0.2 and 35.7 <= lon <= 36.5:
-                    logger.info(f"✓ Geocoded '{location_name}' → ({lat:.4f}, {lon:.4f})")
-                    return lat, lon
+            coords = parse_nominatim(response.json()) if response.status_code == 200 else None
+            if coords:
+                logger.info(f"✓ Geocoded '{location_name}' → ({coords[0]:.4f}, {coords[1]:.4f})")
+                return coords
 
             if attempt == 0:
-                fallback_query = f"{location_name}, Nakuru, Kenya"
-                response = requests.get(
-                    "https://nominatim.openstreetmap.org/search",
-                    params={'q': fallback_query, 'format': 'json', 'limit': 1, 'countrycodes': 'ke'},
-                    headers={'User-Agent': 'NakuruSafetyPlatform/3.0'},
-                    timeout=8
-                )
-
-                if response.status_code == 200 and response.json():
-                    data = response.json()[0]
-                    lat, lon = float(data['lat']), float(data['lon'])
-                    if -1.2 <= lat <= 0.2 and 35.7 <= lon <= 36.5:
-                        return lat, lon
+                with span('nominatim', 'external'):
+                    response = requests.get(NOMINATIM_URL, params=nominatim_params(fallback_query),
+                                            headers=NOMINATIM_HEADERS, timeout=NOMINATIM_TIMEOUT)
+                coords = parse_nominatim(response.json()) if response.status_code == 200 else None
+                if coords:
+                    return coords
 
             if attempt < retries - 1:
                 time.sleep(1)
@@ -157,8 +176,12 @@ def fuzzy_match_location(location_name):
 
 # PART 2: INTEGRATED AI ANALYTICS WITH MULTILINGUAL SUPPORT
 
-def detect_spam(report_data, get_settings_func=None):
-    """AI-POWERED SPAM DETECTION with multilingual support"""
+@timed()
+def detect_spam(report_data, get_settings_func=None, location_found=None):
+    """
+    AI-POWERED SPAM DETECTION with multilingual support.
+    Pass location_found when the caller has already geocoded the location, to skip the lookup.
+    """
     spam_threshold = 60
     auto_reject = 80
     if get_settings_func:
@@ -209,12 +232,14 @@ def detect_spam(report_data, get_settings_func=None):
         spam_score += 30
         reasons.append("Invalid location")
     else:
-        lat, lon = fuzzy_match_location(location)
-        if not lat and not lon:
-            lat, lon = geocode_location(location, report_data.get('constituency', 'Nakuru'))
-            if not lat:
-                spam_score += 20
-                reasons.append("Location not found")
+        if location_found is None:
+            lat, lon = fuzzy_match_location(location)
+            if not lat and not lon:
+                lat, lon = geocode_location(location, report_data.get('constituency', 'Nakuru'))
+            location_found = bool(lat)
+        if not location_found:
+            spam_score += 20
+            reasons.append("Location not found")
 
     # Check 5: GPS Validation
     lat, lon = report_data.get('lat'), report_data.get('lon')
@@ -253,6 +278,7 @@ def detect_spam(report_data, get_settings_func=None):
     }
 
 
+@timed()
 def detect_anomalies(reports):
     """AI ANOMALY DETECTION: Identifies urgent/critical incidents"""
     if not reports or len(reports) < 1:
@@ -329,12 +355,17 @@ def detect_anomalies(reports):
     return anomalies
 
 
+@timed()
 def perform_clustering(hotspots, distance_threshold=0.01):
     """HIERARCHICAL CLUSTERING: Groups nearby incidents"""
     if len(hotspots) < 2:
         return list(zip(hotspots, [0] * len(hotspots)))
 
     try:
+        import numpy as np
+        from scipy.cluster.hierarchy import linkage, fcluster
+        from scipy.spatial.distance import pdist
+
         coords = []
         for spot in hotspots:
             lat = float(spot.get('lat', 0))
@@ -352,6 +383,7 @@ def perform_clustering(hotspots, distance_threshold=0.01):
         return list(zip(hotspots, [0] * len(hotspots)))
 
 
+@timed()
 def calculate_hotspot_density(hotspots, radius=0.005):
     """DENSITY ANALYSIS: Calculates incident concentration"""
     if not hotspots:
@@ -373,6 +405,8 @@ def calculate_hotspot_density(hotspots, radius=0.005):
         return []
 
     try:
+        import numpy as np
+
         data = np.array(coords, dtype=np.float64)
         density_results = []
 
@@ -404,94 +438,13 @@ def calculate_hotspot_density(hotspots, radius=0.005):
         return []
 
 
-# PART 3: ROBUST TRANSLATION SYSTEM (Python 3.13 Compatible)
-
-LANG_MAP = {'en': 'en', 'sw': 'sw', 'ki': 'sw', 'kikuyu': 'sw'}
-
-
-def safe_translate(text, src='auto', dest='en', retries=3):
-    """ROBUST TRANSLATION using deep-translator"""
-    if not text or not text.strip():
-        return text
-
-    text = ' '.join(text.split())
-
-    for attempt in range(retries):
-        try:
-            translator = GoogleTranslator(source=src, target=dest)
-            result = translator.translate(text)
-            if result:
-                return result
-        except Exception as e:
-            if attempt < retries - 1:
-                time.sleep(2 ** attempt)
-
-    return "[Translation unavailable]"
-
-
-@lru_cache(maxsize=200)
-def detect_language(text):
-    """LANGUAGE DETECTION with simple heuristics"""
-    if not text or not text.strip():
-        return 'en'
-
-    try:
-        from deep_translator import single_detection
-        detected = single_detection(text, api_key=None)
-        if detected:
-            return detected.lower()
-    except:
-        pass
-
-    # Fallback heuristic
-    text_lower = text.lower()
-    swahili_words = ['ni', 'na', 'wa', 'kwa', 'ya', 'hii', 'sasa', 'tafadhali', 'polisi']
-    word_count = sum(1 for word in swahili_words if f' {word} ' in f' {text_lower} ')
-
-    if word_count >= 2:
-        return 'sw'
-
-    return 'en'
-
-
-def translate_text(text, target_lang):
-    """SMART TRANSLATION with automatic language detection"""
-    if not text or not text.strip():
-        return text
-
-    target = LANG_MAP.get(target_lang.lower(), 'en')
-    src_lang = detect_language(text)
-
-    if src_lang in ('ki', 'kikuyu'):
-        src_lang = 'sw'
-
-    if src_lang == target:
-        return text
-
-    return safe_translate(text, src=src_lang, dest=target)
-
-
-def translate_report(report_dict, target_lang):
-    """BATCH TRANSLATION: Translates all fields in a report"""
-    if not report_dict:
-        return {}
-
-    translated = {}
-    for key, value in report_dict.items():
-        if not value:
-            translated[key] = value
-            continue
-
-        try:
-            translated[key] = translate_text(str(value), target_lang)
-        except:
-            translated[key] = value
-
-    return translated
-
+# PART 3: TRANSLATION
+# Language detection and translation live in translate.py, the single language service;
+# import them from there.
 
 # PART 4: ADVANCED ANALYTICS & RECOMMENDATIONS
 
+@timed()
 def analyze_trends(reports, time_window_days=7):
     """TREND ANALYSIS: Identifies crime patterns over time"""
     if not reports:
@@ -553,6 +506,7 @@ def analyze_trends(reports, time_window_days=7):
                 'most_common_category': 'N/A'}
 
 
+@timed()
 def generate_patrol_recommendations(hotspots, reports, constituency):
     """AI-POWERED PATROL RECOMMENDATIONS"""
     try:
@@ -1,22 +1,27 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, send_file
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, send_file, Response, \
+    stream_with_context, g, before_render_template, template_rendered
 import os
 import mimetypes
 import bleach
-from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash
-from functools import wraps, lru_cache
+from functools import wraps
 from database import *
+from db_connection import get_pool_metrics, get_query_metrics
 from ai_analytics import *
-from translate import translate_text, translate_report, detect_language
+from translate import translate_text, translate_report, detect_language, schedule_report_translation, \
+    report_translation_fields, is_complete_translation, get_language_metrics
 from ai_analytics import geocode_location, fuzzy_match_location
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 import time
+import json
+from types import MappingProxyType
 from io import BytesIO
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib import colors
+from media_store import save_upload, resolve_path, media_etag, media_cache_control
+from thumbnails import schedule_previews, find_thumbnail
+from instrumentation import begin_request, end_request, record, render_metrics, metrics_visible, timing_visible
+from profiler import should_profile, begin_profile, end_profile, list_profiles, PROFILE_DIR, PROFILE_HEADER, \
+    PROFILE_NAME_RE, PROFILE_SAMPLE_RATE
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -32,7 +37,11 @@ app.config.update(
     SESSION_COOKIE_SECURE=os.environ.get('FLASK_ENV') == 'production',
     SESSION_COOKIE_HTTPONLY=True,
     SESSION_COOKIE_SAMESITE='Lax',
-    PERMANENT_SESSION_LIFETIME=3600
+    PERMANENT_SESSION_LIFETIME=3600,
+    # Media offload to the front-end server: '' (serve from Flask), 'x-accel' (nginx) or 'x-sendfile' (Apache)
+    MEDIA_OFFLOAD=os.environ.get('MEDIA_OFFLOAD', ''),
+    # nginx 'internal' location aliased to UPLOAD_FOLDER
+    MEDIA_ACCEL_PREFIX=os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
 )
 
 for folder in [app.config['UPLOAD_FOLDER'], 'templates', 'static', 'logs']:
@@ -99,38 +108,55 @@ KISWAHILI_TEXTS = {
 }
 
 
-@lru_cache(maxsize=1000)
+LANGUAGE_CODES = {'English': 'en', 'Kiswahili': 'sw'}
+
+
+def _compile_translation_bundles():
+    """Build the per-language frozen bundles and the English value -> key map"""
+    bundles = {
+        'English': MappingProxyType(dict(BASE_TEXTS)),
+        'Kiswahili': MappingProxyType({**BASE_TEXTS, **KISWAHILI_TEXTS}),
+    }
+    reverse = MappingProxyType({value: key for key, value in BASE_TEXTS.items()})
+    return MappingProxyType(bundles), reverse
+
+
+# Compiled once at startup; lookups are O(1) and nothing here is ever flushed at runtime
+TRANSLATION_BUNDLES, TEXT_TO_KEY = _compile_translation_bundles()
+
+
 def get_translation(text, target_lang):
-    """Get translation for text with caching - ENHANCED VERSION"""
+    """Get translation for an English UI string"""
     if not text or target_lang == 'English':
         return text
 
-    # Use manual translations for Kiswahili
-    if target_lang == 'Kiswahili':
-        # Check if we have a manual translation
-        for key, value in BASE_TEXTS.items():
-            if value == text:
-                return KISWAHILI_TEXTS.get(key, text)
+    bundle = TRANSLATION_BUNDLES.get(target_lang)
+    if bundle is None:
+        return text
 
-        # Fall back to automatic translation for custom text
-        try:
-            lang_map = {'English': 'en', 'Kiswahili': 'sw'}
-            target_code = lang_map.get(target_lang, 'en')
-            return translate_text(text, target_code)
-        except Exception as e:
-            logger.error(f"Translation error: {e}")
-            return text
+    key = TEXT_TO_KEY.get(text)
+    if key is not None:
+        return bundle[key]
+
+    # Fall back to automatic translation for custom text (cached by translate.py)
+    try:
+        return translate_text(text, LANGUAGE_CODES[target_lang])
+    except Exception as e:
+        logger.error(f"Translation error: {e}")
+        return text
 
-    return text
+
+def translate_key(key, lang):
+    """Get the translation of a BASE_TEXTS key, or of the key itself if it is not one"""
+    bundle = TRANSLATION_BUNDLES.get(lang, TRANSLATION_BUNDLES['English'])
+    if key in bundle:
+        return bundle[key]
+    return get_translation(key, lang)
 
 
 def get_all_translations(lang):
-    """Get all base texts translated to target language"""
-    if lang == 'English':
-        return BASE_TEXTS
-    elif lang == 'Kiswahili':
-        return KISWAHILI_TEXTS
-    return BASE_TEXTS
+    """Get the frozen translation bundle for a language"""
+    return TRANSLATION_BUNDLES.get(lang, TRANSLATION_BUNDLES['English'])
 
 
 def get_user_language():
@@ -152,7 +178,6 @@ def set_language(lang):
     if lang in AVAILABLE_LANGUAGES:
         session['language'] = lang
         session.permanent = True
-        get_translation.cache_clear()
         logger.info(f"Language changed to: {lang}")
     return redirect(request.referrer or url_for('home'))
 
@@ -262,26 +287,23 @@ def report():
             lat, lon = -0.3031, 36.0800
 
         if not all([category, description, manual_location, constituency]):
-            return jsonify({'error': get_translation('all_fields_required', lang)}), 400
+            return jsonify({'error': translate_key('all_fields_required', lang)}), 400
 
         enrolled = [c[0] for c in get_all_constituencies()]
         if constituency not in enrolled:
             return jsonify({'error': 'Invalid or inactive constituency'}), 400
 
         # FILE UPLOAD
-        media_path = None
+        media = None
         if 'media' in request.files:
             file = request.files['media']
             if file and file.filename and allowed_file(file.filename):
                 try:
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    filename = secure_filename(f"{timestamp}_{file.filename}")
-                    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                    file.save(filepath)
-                    media_path = filename
-                    logger.info(f"File uploaded: {filename}")
+                    media = save_upload(file, app.config['UPLOAD_FOLDER'], app.config['MAX_CONTENT_LENGTH'])
+                    logger.info(f"File uploaded: {media['name']} ({media['size']} bytes)")
                 except Exception as e:
                     logger.error(f"File upload error: {str(e)}")
+        media_path = media['name'] if media else None
 
         spam_result = detect_spam({
             'description': description,
@@ -294,24 +316,28 @@ def report():
 
         settings = get_system_settings()
         if spam_result['spam_score'] >= settings.get('auto_reject_threshold', 85):
-            if media_path:
-                try:
-                    os.remove(os.path.join(app.config['UPLOAD_FOLDER'], media_path))
-                except:
-                    pass
+            # The upload stays: identical content may be shared with another report. Unreferenced
+            # files are deleted by the media sweep (python media_store.py).
             return jsonify({'error': 'Report rejected as spam'}), 400
 
         report_id = add_report(category, description, manual_location, lat, lon, constituency, language,
-                               media_path, spam_result)
+                               media_path, spam_result, media)
         add_audit_log('citizen', 'anonymous', f'Submitted report #{report_id}',
                       f'Spam: {spam_result["spam_score"]}', get_client_ip())
+        if media:
+            schedule_previews(app.config['UPLOAD_FOLDER'], media['name'])
+        schedule_report_translation(report_id, {
+            'category': category,
+            'description': description,
+            'manual_location': manual_location
+        }, LANGUAGE_CODES[language])
 
         short_report_id = str(report_id)[-8:]
 
         return jsonify({
             'success': True,
             'report_id': short_report_id,
-            'message': f'{get_translation("report_submitted", lang)} Report ID: {short_report_id}',
+            'message': f'{translate_key("report_submitted", lang)} Report ID: {short_report_id}',
             'gps_captured': lat != -0.3031 or lon != 36.0800,
             'file_uploaded': media_path is not None
         })
@@ -319,23 +345,66 @@ def report():
     except Exception as e:
         logger.error(f"Report error: {str(e)}")
         lang = get_user_language()
-        return jsonify({'error': get_translation('report_failed', lang)}), 500
+        return jsonify({'error': translate_key('report_failed', lang)}), 500
 
 
 @app.route('/media/<filename>')
 @login_required('police')
 def serve_media(filename):
-    """Serve uploaded media files to police officers"""
+    """Serve uploaded media files to police officers with conditional and range support"""
     try:
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        if os.path.exists(filepath):
-            return send_file(filepath)
-        return jsonify({'error': 'File not found'}), 404
+        filepath = resolve_path(app.config['UPLOAD_FOLDER'], filename)
+        if not os.path.isfile(filepath):
+            return jsonify({'error': 'File not found'}), 404
+
+        etag = media_etag(filename)
+        offload = app.config['MEDIA_OFFLOAD']
+
+        if offload in ('x-accel', 'x-sendfile'):
+            # The front-end server sends the bytes and answers Range requests itself
+            if etag and request.if_none_match.contains(etag):
+                response = app.response_class(status=304)
+            else:
+                response = app.response_class(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+                if offload == 'x-accel':
+                    relative = os.path.relpath(filepath, app.config['UPLOAD_FOLDER']).replace(os.sep, '/')
+                    prefix = app.config['MEDIA_ACCEL_PREFIX'].rstrip('/')
+                    response.headers['X-Accel-Redirect'] = f'{prefix}/{relative}'
+                else:
+                    response.headers['X-Sendfile'] = os.path.abspath(filepath)
+            if etag:
+                response.set_etag(etag)
+        else:
+            # send_file answers If-None-Match and Range (206) and hands the file to the server's sendfile
+            response = send_file(filepath, etag=etag or True, conditional=True)
+
+        response.headers['Cache-Control'] = media_cache_control(filename)
+        return response
     except Exception as e:
         logger.error(f"Media serving error: {str(e)}")
         return jsonify({'error': 'Failed to load file'}), 500
 
 
+@app.route('/media/thumb/<filename>')
+@login_required('police')
+def serve_thumbnail(filename):
+    """Serve the downscaled preview of an uploaded image or video"""
+    try:
+        # Only an explicit image/webp counts; '*/*' alone does not mean WebP can be decoded
+        accept_webp = 'image/webp' in request.accept_mimetypes.values()
+        filepath, mimetype = find_thumbnail(app.config['UPLOAD_FOLDER'], filename, accept_webp)
+        if not filepath:
+            return jsonify({'error': 'Preview not available'}), 404
+
+        response = send_file(filepath, mimetype=mimetype, etag=True, conditional=True)
+        response.headers['Cache-Control'] = media_cache_control(filename)
+        response.headers['Vary'] = 'Accept'
+        return response
+    except Exception as e:
+        logger.error(f"Thumbnail serving error: {str(e)}")
+        return jsonify({'error': 'Failed to load preview'}), 500
+
+
 @app.route('/police/login', methods=['GET', 'POST'])
 def police_login():
     lang = get_user_language()
@@ -347,7 +416,7 @@ def police_login():
 
             if not username or not password:
                 return render_template('police_login.html',
-                                       error=get_translation('all_fields_required', lang),
+                                       error=translate_key('all_fields_required', lang),
                                        lang=lang,
                                        t=get_all_translations(lang),
                                        available_languages=AVAILABLE_LANGUAGES)
@@ -364,14 +433,14 @@ def police_login():
                 return redirect(url_for('police_dashboard'))
 
             return render_template('police_login.html',
-                                   error=get_translation('invalid_credentials', lang),
+                                   error=translate_key('invalid_credentials', lang),
                                    lang=lang,
                                    t=get_all_translations(lang),
                                    available_languages=AVAILABLE_LANGUAGES)
         except Exception as e:
             logger.error(f"Login error: {str(e)}")
             return render_template('police_login.html',
-                                   error=get_translation('login_failed', lang),
+                                   error=translate_key('login_failed', lang),
                                    lang=lang,
                                    t=get_all_translations(lang),
                                    available_languages=AVAILABLE_LANGUAGES)
@@ -417,77 +486,20 @@ def police_dashboard():
 def police_download_report(report_id):
     """Download report as PDF"""
     try:
-        from bson.objectid import ObjectId
+        from pdf_export import render_report_pdf, report_filename
 
         constituency = session.get('station')
-        report = reports_col.find_one({'_id': ObjectId(report_id)})
+        report = get_report(report_id)
 
         if not report or report['constituency'] != constituency:
             return jsonify({'error': 'Unauthorized'}), 403
 
-        response = responses_col.find_one({'report_id': report['_id']})
-
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
-
-        story.append(Paragraph(f"<b>INCIDENT REPORT #{str(report['_id'])[-8:]}</b>", styles['Title']))
-        story.append(Spacer(1, 12))
-
-        data = [
-            ['Category:', report.get('category', 'N/A')],
-            ['Location:', report.get('manual_location', 'N/A')],
-            ['Constituency:', report.get('constituency', 'N/A')],
-            ['Status:', report.get('status', 'pending').upper()],
-            ['Submitted:', report.get('created_at', datetime.now()).strftime('%Y-%m-%d %H:%M:%S')],
-            ['Language:', report.get('language', 'English')],
-        ]
-
-        table = Table(data, colWidths=[150, 350])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.grey),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(table)
-        story.append(Spacer(1, 12))
-
-        story.append(Paragraph("<b>Description:</b>", styles['Heading2']))
-        story.append(Paragraph(report.get('description', 'N/A'), styles['BodyText']))
-        story.append(Spacer(1, 12))
-
-        if response:
-            story.append(Paragraph("<b>Police Response:</b>", styles['Heading2']))
-            response_data = [
-                ['Officer:', response.get('officer_name', 'N/A')],
-                ['Action Taken:', response.get('action_taken', 'N/A')],
-                ['Notes:', response.get('notes', 'N/A')],
-                ['Response Date:', response.get('created_at', datetime.now()).strftime('%Y-%m-%d %H:%M:%S')],
-            ]
-            response_table = Table(response_data, colWidths=[150, 350])
-            response_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (0, -1), colors.green),
-                ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            story.append(response_table)
-
-        doc.build(story)
-        buffer.seek(0)
+        response = get_response_for_report(report)
 
         return send_file(
-            buffer,
+            BytesIO(render_report_pdf(report, response)),
             as_attachment=True,
-            download_name=f'Report_{str(report["_id"])[-8:]}.pdf',
+            download_name=report_filename(report),
             mimetype='application/pdf'
         )
 
@@ -496,6 +508,65 @@ def police_download_report(report_id):
         return jsonify({'error': 'Failed to generate PDF'}), 500
 
 
+@app.route('/police/export_reports')
+@login_required('police')
+def police_export_reports():
+    """Bulk export of the station's reports as a ZIP of PDFs or a single combined PDF"""
+    try:
+        from pdf_export import stream_reports_zip, render_combined_pdf, COMBINED_PDF_MAX_REPORTS
+
+        constituency = session.get('station')
+        export_format = request.args.get('format', 'zip')
+        status = sanitize_input(request.args.get('status', ''), 50) or None
+
+        if export_format not in ('zip', 'pdf'):
+            return jsonify({'error': 'Invalid format'}), 400
+        if status and status not in ['pending', 'investigating', 'resolved', 'closed']:
+            return jsonify({'error': 'Invalid status'}), 400
+
+        try:
+            start_date = datetime.strptime(request.args['start'], '%Y-%m-%d') if request.args.get('start') else None
+            end_date = datetime.strptime(request.args['end'], '%Y-%m-%d') if request.args.get('end') else None
+        except ValueError:
+            return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+        if end_date:
+            # The end date is inclusive
+            end_date = end_date + timedelta(days=1)
+
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        if export_format == 'pdf':
+            # Decide from what is fetched, not an earlier count: reports keep arriving meanwhile
+            reports = list(iter_reports_for_export(constituency, start_date, end_date, status,
+                                                   limit=COMBINED_PDF_MAX_REPORTS + 1))
+            if len(reports) > COMBINED_PDF_MAX_REPORTS:
+                return jsonify({'error': f'Too many reports for one PDF (over {COMBINED_PDF_MAX_REPORTS}), '
+                                         f'use ZIP export'}), 400
+            pdf = render_combined_pdf(reports)
+            add_audit_log('police', session['username'], f'Exported {len(reports)} reports (pdf)',
+                          f'Status: {status or "all"}', get_client_ip())
+            return send_file(
+                BytesIO(pdf),
+                as_attachment=True,
+                download_name=f'Reports_{stamp}.pdf',
+                mimetype='application/pdf'
+            )
+
+        total = count_reports_for_export(constituency, start_date, end_date, status)
+        add_audit_log('police', session['username'], f'Exported {total} reports (zip)',
+                      f'Status: {status or "all"}', get_client_ip())
+        reports = iter_reports_for_export(constituency, start_date, end_date, status)
+        return Response(
+            stream_with_context(stream_reports_zip(reports)),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename=Reports_{stamp}.zip'}
+        )
+
+    except Exception as e:
+        logger.error(f"Bulk export error: {str(e)}")
+        return jsonify({'error': 'Failed to export reports'}), 500
+
+
 @app.route('/police/respond/<report_id>', methods=['POST'])
 @login_required('police')
 def police_respond(report_id):
@@ -540,7 +611,6 @@ def police_map():
         center_lat = sum(h.get('lat', 0) for h in hotspots) / len(hotspots) if hotspots else -0.3031
         center_lon = sum(h.get('lon', 0) for h in hotspots) / len(hotspots) if hotspots else 36.0800
 
-        import json
         hotspots_json = json.dumps([{
             'location': h.get('location', 'Unknown'),
             'lat': h.get('lat', 0),
@@ -673,18 +743,171 @@ def admin_activate_station(station_id):
         return jsonify({'error': str(e)}), 500
 
 
+AUDIT_LOG_PAGE_SIZE = 100
+
+
+def audit_log_filters():
+    """Filters from the query string, as given (for links) and parsed (for queries)"""
+    filters = {key: sanitize_input(request.args.get(key, ''), 100) for key in
+               ('user_type', 'username', 'action', 'start', 'end')}
+    filters = {key: value for key, value in filters.items() if value}
+    if filters.get('user_type') not in (None, 'admin', 'police', 'citizen'):
+        raise ValueError('Invalid user type')
+
+    parsed = dict(filters)
+    try:
+        for key in ('start', 'end'):
+            if key in parsed:
+                parsed[key] = datetime.strptime(parsed[key], '%Y-%m-%d')
+    except ValueError:
+        raise ValueError('Dates must be YYYY-MM-DD')
+    if 'end' in parsed:
+        # The end date is inclusive
+        parsed['end'] += timedelta(days=1)
+    return filters, parsed
+
+
 @app.route('/admin/audit_logs')
 @login_required('admin')
 def admin_audit_logs():
     try:
-        user_type = request.args.get('user_type')
-        logs = get_audit_logs(limit=1000, user_type=user_type)
-        return render_template('audit_logs.html', logs=logs)
+        try:
+            filters, parsed = audit_log_filters()
+        except ValueError as e:
+            return render_template('error.html', message=str(e), code=400), 400
+
+        cursor = request.args.get('cursor') or None
+        # One extra row tells whether an older page exists
+        logs = get_audit_logs(limit=AUDIT_LOG_PAGE_SIZE + 1, cursor=cursor, **parsed)
+        next_cursor = None
+        if len(logs) > AUDIT_LOG_PAGE_SIZE:
+            next_cursor = audit_log_cursor(logs[:AUDIT_LOG_PAGE_SIZE], cursor)
+
+        return render_template('audit_logs.html', logs=logs[:AUDIT_LOG_PAGE_SIZE], filters=filters, cursor=cursor,
+                               next_cursor=next_cursor, page_size=AUDIT_LOG_PAGE_SIZE)
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         return render_template('error.html', message="Failed to load logs", code=500), 500
 
 
+@app.route('/admin/audit_logs/export')
+@login_required('admin')
+def admin_export_audit_logs():
+    """Stream the filtered audit logs as CSV or NDJSON, oldest first"""
+    from data_export import stream_csv, stream_ndjson
+
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'error': 'Invalid format'}), 400
+    try:
+        filters, parsed = audit_log_filters()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    add_audit_log('admin', session['username'], f'Exported audit logs ({export_format})',
+                  ', '.join(f'{key}={value}' for key, value in filters.items()) or None, get_client_ip())
+
+    rows = iter_audit_logs(**parsed)
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    if export_format == 'csv':
+        body = stream_csv(rows, ['created_at', 'user_type', 'username', 'action', 'details', 'ip_address', 'id'])
+        mimetype = 'text/csv'
+    else:
+        body = stream_ndjson(rows)
+        mimetype = 'application/x-ndjson'
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=AuditLogs_{stamp}.{export_format}'}
+    )
+
+
+@app.route('/admin/export_reports')
+@login_required('admin')
+def admin_export_reports():
+    """Stream reports joined with their responses as NDJSON, CSV or Parquet for analysts"""
+    from data_export import stream_reports, parquet_available
+
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv', 'parquet'):
+        return jsonify({'error': 'Invalid format'}), 400
+    if export_format == 'parquet' and not parquet_available():
+        return jsonify({'error': 'Parquet export is not available on this server'}), 400
+
+    filters = {key: sanitize_input(request.args.get(key, ''), 100) or None for key in
+               ('constituency', 'category', 'status')}
+    if filters['status'] and filters['status'] not in ['pending', 'investigating', 'resolved', 'closed']:
+        return jsonify({'error': 'Invalid status'}), 400
+    try:
+        start = datetime.strptime(request.args['start'], '%Y-%m-%d') if request.args.get('start') else None
+        end = datetime.strptime(request.args['end'], '%Y-%m-%d') if request.args.get('end') else None
+    except ValueError:
+        return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+    if end:
+        # The end date is inclusive
+        end = end + timedelta(days=1)
+    include_archived = request.args.get('archived') == '1'
+
+    add_audit_log('admin', session['username'], f'Exported reports ({export_format})',
+                  ', '.join(f'{key}={value}' for key, value in filters.items() if value) or None, get_client_ip())
+
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    mimetypes_by_format = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv',
+                           'parquet': 'application/vnd.apache.parquet'}
+    return Response(
+        stream_with_context(stream_reports(export_format, start=start, end=end, include_archived=include_archived,
+                                           **filters)),
+        mimetype=mimetypes_by_format[export_format],
+        headers={'Content-Disposition': f'attachment; filename=Reports_{stamp}.{export_format}'}
+    )
+
+
+@app.route('/admin/language_metrics')
+@login_required('admin')
+def admin_language_metrics():
+    """Counters of the language service (detection, translation caches and service calls)"""
+    return jsonify(get_language_metrics())
+
+
+@app.route('/admin/db_pool')
+@login_required('admin')
+def admin_db_pool():
+    """MongoDB connection pool settings and counters for this worker process"""
+    return jsonify(get_pool_metrics())
+
+
+@app.route('/admin/slow_queries')
+@login_required('admin')
+def admin_slow_queries():
+    """Most expensive MongoDB query shapes in this worker process, to spot missing indexes"""
+    order_by = request.args.get('order_by', 'total_ms')
+    if order_by not in ('total_ms', 'max_ms', 'avg_ms', 'slow', 'count'):
+        order_by = 'total_ms'
+    limit = min(request.args.get('limit', 20, type=int), 200)
+    return jsonify(get_query_metrics(limit, order_by))
+
+
+@app.route('/admin/profiles')
+@login_required('admin')
+def admin_profiles():
+    """Stored request profiles (collapsed stacks), newest first"""
+    return jsonify({
+        'sample_rate': PROFILE_SAMPLE_RATE,
+        'header': PROFILE_HEADER,
+        'profiles': list_profiles()
+    })
+
+
+@app.route('/admin/profiles/<name>')
+@login_required('admin')
+def admin_download_profile(name):
+    """Download one profile; open it with flamegraph.pl or speedscope"""
+    filepath = os.path.join(os.path.abspath(PROFILE_DIR), name)
+    if not PROFILE_NAME_RE.match(name) or not os.path.isfile(filepath):
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(filepath, mimetype='text/plain', as_attachment=True, download_name=name)
+
+
 @app.route('/admin/settings', methods=['GET', 'POST'])
 @login_required('admin')
 def admin_settings():
@@ -719,40 +942,12 @@ def admin_logout():
 @app.route('/api/track_report/<report_id>')
 def api_track_report(report_id):
     try:
-        from bson.objectid import ObjectId
-
-        report = None
-        if len(report_id) == 24:
-            try:
-                report = reports_col.find_one({'_id': ObjectId(report_id)})
-            except:
-                pass
-
-        if not report:
-            all_reports = list(reports_col.find({}).sort('created_at', -1).limit(100))
-            for r in all_reports:
-                if str(r['_id'])[-8:] == report_id:
-                    report = r
-                    break
-
+        report = find_report_for_tracking(report_id)
         if not report:
             return jsonify({'success': False, 'message': 'Report not found'}), 404
 
-        response = responses_col.find_one({'report_id': report['_id']})
-
-        report_data = {
-            'short_id': str(report['_id'])[-8:],
-            'category': report.get('category', 'N/A'),
-            'manual_location': report.get('manual_location', 'N/A'),
-            'constituency': report.get('constituency', 'N/A'),
-            'status': report.get('status', 'pending'),
-            'created_at': report.get('created_at', datetime.now()).isoformat(),
-            'officer_name': response.get('officer_name') if response else None,
-            'action_taken': response.get('action_taken') if response else None,
-            'notes': response.get('notes') if response else None
-        }
-
-        return jsonify({'success': True, 'report': report_data})
+        response = get_response_for_report(report)
+        return jsonify({'success': True, 'report': tracking_summary(report, response)})
 
     except Exception as e:
         logger.error(f"Track report error: {str(e)}")
@@ -763,30 +958,32 @@ def api_track_report(report_id):
 @login_required('police')
 def api_translate_report(report_id, target_lang):
     try:
-        from bson.objectid import ObjectId
-
         if target_lang not in ('en', 'sw'):
             return jsonify({'error': 'Invalid language'}), 400
 
-        report = reports_col.find_one({'_id': ObjectId(report_id)})
+        report = get_report(report_id)
         if not report:
             return jsonify({'error': 'Report not found'}), 404
 
         if report['constituency'] != session.get('station'):
             return jsonify({'error': 'Unauthorized'}), 403
 
-        to_translate = {
-            'category': report.get('category', ''),
-            'description': report.get('description', ''),
-            'manual_location': report.get('manual_location', '')
-        }
+        original_language = LANGUAGE_CODES.get(report.get('language'), 'en')
+        translated = (report.get('translations') or {}).get(target_lang)
 
-        translated = translate_report(to_translate, target_lang)
+        if translated is None:
+            if target_lang == original_language:
+                translated = report_translation_fields(report)
+            else:
+                # Reports from before ingestion-time translation, or whose background job failed
+                translated = translate_report(report_translation_fields(report), target_lang)
+                if is_complete_translation(translated):
+                    save_report_translation(report['_id'], target_lang, translated)
 
         return jsonify({
             'success': True,
             'translated': translated,
-            'original_language': detect_language(report.get('description', '')),
+            'original_language': original_language,
             'target_language': target_lang
         })
 
@@ -803,6 +1000,14 @@ def api_stats():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus histograms for routes, database functions, external calls and stages"""
+    if not metrics_visible(session, request.headers.get('Authorization')):
+        return jsonify({'error': 'Unauthorized'}), 403
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
 @app.route('/api/health')
 def api_health():
     try:
@@ -849,18 +1054,55 @@ def inject_globals():
     return {
         'now': datetime.now(),
         'app_name': 'Safety App',
-        'get_translation': lambda key: get_translation(BASE_TEXTS.get(key, key), lang),
+        'get_translation': lambda key: translate_key(key, lang),
         'current_lang': lang
     }
 
 
 @app.before_request
 def before_request():
+    g.request_timing = begin_request()
+    if should_profile(bool(request.headers.get(PROFILE_HEADER)) and bool(session.get('admin_logged_in'))):
+        g.profile = begin_profile()
     session.permanent = True
     if 'language' not in session:
         session['language'] = 'English'
 
 
+@app.after_request
+def add_server_timing(response):
+    state = g.pop('request_timing', None)
+    if state is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        header = end_request(state, route, request.method, response.status_code)
+        # Anonymous responses (citizen reports, tracking) must not name internal functions
+        if timing_visible(session, request.headers.get('Authorization')):
+            response.headers['Server-Timing'] = header
+    return response
+
+
+@app.teardown_request
+def save_profile(exc=None):
+    # Teardown runs even when the view raised, so the sampler always lets go of the thread
+    state = g.pop('profile', None)
+    if state is not None:
+        end_profile(state, request.url_rule.rule if request.url_rule else 'unmatched', request.method)
+
+
+def _template_render_started(sender, template, context, **extra):
+    g.template_render_start = time.perf_counter()
+
+
+def _template_render_finished(sender, template, context, **extra):
+    start = g.pop('template_render_start', None)
+    if start is not None:
+        record(f'render_{template.name}', 'span', time.perf_counter() - start)
+
+
+before_render_template.connect(_template_render_started, app)
+template_rendered.connect(_template_render_finished, app)
+
+
 if __name__ == '__main__':
     if os.environ.get('FLASK_ENV') == 'production':
         app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
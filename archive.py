@@ -0,0 +1,114 @@
+"""
+Move closed reports older than ARCHIVE_AFTER_MONTHS into the compressed 'reports_archive' collection.
+
+    python archive.py [--months 12] [--batch-size 500] [--dry-run]
+
+Each archived document is the report with its police response embedded under 'response' and
+an 'archived_at' timestamp. A batch is written to the archive (idempotent upserts, majority
+write concern) before it is deleted from 'reports' and 'responses' in one transaction, so an
+interrupted run is safe to repeat and a report reopened or answered in between stays live.
+Lookups by report ID read through to the archive (database.get_report) and the statistics
+include archived reports, so archiving only shrinks the working set of the hot collections.
+Run it from cron, e.g. nightly, after migration 3 created the collection. Transactions need
+MongoDB running as a replica set.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+
+from pymongo import ReplaceOne
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_AFTER_MONTHS = int(os.environ.get('ARCHIVE_AFTER_MONTHS') or 12)
+CLOSED_STATUSES = ('resolved', 'closed')
+
+
+def archivable_query(months, now=None):
+    """Closed reports created more than `months` months ago"""
+    cutoff = (now or datetime.now()) - timedelta(days=30 * months)
+    return {'status': {'$in': list(CLOSED_STATUSES)}, 'created_at': {'$lt': cutoff}}
+
+
+def archive_document(report, response, archived_at):
+    return dict(report, response=response, archived_at=archived_at)
+
+
+def _delete_archived(session, db, reports, responses, query):
+    """Delete the archived reports and their responses unless they changed since they were read.
+
+    Runs in a transaction, so a report reopened or answered meanwhile is neither deleted nor left
+    without its response. Returns the IDs deleted.
+    """
+    seen = {report['_id']: report.get('updated_at') for report in reports}
+    current = {report['_id']: report.get('updated_at') for report in
+               db.reports.find({'_id': {'$in': list(seen)}, **query}, {'updated_at': 1}, session=session)}
+    answered = {response['report_id']: response.get('created_at') for response in
+                db.responses.find({'report_id': {'$in': list(current)}}, {'report_id': 1, 'created_at': 1},
+                                  session=session)}
+    removed = [report_id for report_id, updated_at in current.items() if updated_at == seen[report_id] and
+               answered.get(report_id) == (responses.get(report_id) or {}).get('created_at')]
+    if removed:
+        db.reports.delete_many({'_id': {'$in': removed}, **query}, session=session)
+        db.responses.delete_many({'report_id': {'$in': removed}}, session=session)
+    return removed
+
+
+def archive_reports(db, months=ARCHIVE_AFTER_MONTHS, batch_size=500, dry_run=False):
+    """Archive closed reports in batches; returns counts for the run"""
+    from database import DURABLE_WRITE
+
+    query = archivable_query(months)
+    if dry_run:
+        return {'archivable': db.reports.count_documents(query), 'cutoff': query['created_at']['$lt'].isoformat()}
+
+    archive = db.reports_archive.with_options(write_concern=DURABLE_WRITE)
+    archived = 0
+    while True:
+        reports = list(db.reports.find(query).sort('created_at', 1).limit(batch_size))
+        if not reports:
+            break
+        ids = [report['_id'] for report in reports]
+        responses = {response['report_id']: response for response in db.responses.find({'report_id': {'$in': ids}})}
+
+        now = datetime.now()
+        archive.bulk_write([
+            ReplaceOne({'_id': report['_id']}, archive_document(report, responses.get(report['_id']), now),
+                       upsert=True)
+            for report in reports
+        ], ordered=False)
+        with db.client.start_session() as session:
+            removed = session.with_transaction(
+                lambda s: _delete_archived(s, db, reports, responses, query), write_concern=DURABLE_WRITE)
+        # Reports changed since they were read stay live; drop their stale copies (a later batch
+        # archives them again if they are still closed)
+        removed_ids = set(removed)
+        kept = [report_id for report_id in ids if report_id not in removed_ids]
+        if kept:
+            archive.delete_many({'_id': {'$in': kept}})
+
+        archived += len(removed)
+        logger.info(f"✓ Archived {archived} reports (up to {reports[-1]['created_at']:%Y-%m-%d})")
+
+    return {'archived': archived, 'cutoff': query['created_at']['$lt'].isoformat()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--months', type=int, default=ARCHIVE_AFTER_MONTHS)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--dry-run', action='store_true', help='only count the reports that would be archived')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    from db_connection import get_database
+
+    print(json.dumps(archive_reports(get_database(), args.months, args.batch_size, args.dry_run), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
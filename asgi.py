@@ -0,0 +1,311 @@
+# ASGI serving mode. The I/O-bound endpoints below run on an event loop with Motor and httpx,
+# so a worker waiting on MongoDB or Nominatim keeps serving other requests; every other route
+# is the unchanged Flask app, mounted through a WSGI adapter. Run with e.g.
+#
+#     uvicorn asgi:application --workers 4
+#
+# The WSGI entry point (gunicorn app:app) is unaffected. Dependencies: requirements-async.txt
+import asyncio
+import functools
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from a2wsgi import WSGIMiddleware
+from itsdangerous import BadSignature
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, RedirectResponse
+from starlette.routing import Mount, Route
+
+import async_database
+from ai_analytics import fuzzy_match_location, detect_spam, NOMINATIM_URL, NOMINATIM_HEADERS, NOMINATIM_TIMEOUT, \
+    nominatim_params, nominatim_queries, parse_nominatim
+from app import app as flask_app, LANGUAGE_CODES, allowed_file, sanitize_input, translate_key
+from database import tracking_summary
+from instrumentation import begin_request, end_request, span, timing_visible
+from media_store import save_upload
+from thumbnails import schedule_previews
+from translate import translate_report, detect_language, schedule_report_translation, report_translation_fields, \
+    is_complete_translation
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LAT, DEFAULT_LON = -0.3031, 36.0800
+GEOCODE_CACHE_SIZE = 500
+
+_http_client = None
+_geocode_cache = OrderedDict()
+
+
+def get_http_client():
+    """Shared httpx client for outbound calls, created in the worker's event loop"""
+    global _http_client
+    if _http_client is None:
+        import httpx
+
+        _http_client = httpx.AsyncClient(headers=NOMINATIM_HEADERS, timeout=NOMINATIM_TIMEOUT)
+    return _http_client
+
+
+@asynccontextmanager
+async def lifespan(application):
+    yield
+    if _http_client is not None:
+        await _http_client.aclose()
+
+
+async def geocode_location_async(location_name, constituency='Nakuru'):
+    """Async twin of ai_analytics.geocode_location: landmarks first, then one Nominatim pass"""
+    coords = fuzzy_match_location(location_name)
+    if coords[0]:
+        return coords
+
+    key = (location_name, constituency)
+    if key in _geocode_cache:
+        _geocode_cache.move_to_end(key)
+        return _geocode_cache[key]
+
+    coords = (None, None)
+    for query in nominatim_queries(location_name, constituency):
+        try:
+            with span('nominatim', 'external'):
+                response = await get_http_client().get(NOMINATIM_URL, params=nominatim_params(query))
+            found = parse_nominatim(response.json()) if response.status_code == 200 else None
+            if found:
+                logger.info(f"✓ Geocoded '{location_name}' → ({found[0]:.4f}, {found[1]:.4f})")
+                coords = found
+                break
+        except Exception as e:
+            logger.warning(f"⚠ Geocoding '{location_name}' failed: {e}")
+
+    _geocode_cache[key] = coords
+    if len(_geocode_cache) > GEOCODE_CACHE_SIZE:
+        _geocode_cache.popitem(last=False)
+    return coords
+
+
+_session_serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+
+
+def read_session(request):
+    """Decode the Flask session cookie (read-only; only Flask routes modify the session)"""
+    cookie = request.cookies.get(flask_app.config['SESSION_COOKIE_NAME'])
+    if not cookie or _session_serializer is None:
+        return {}
+    try:
+        return _session_serializer.loads(cookie, max_age=int(flask_app.permanent_session_lifetime.total_seconds()))
+    except BadSignature:
+        return {}
+
+
+def get_client_ip(request):
+    forwarded = request.headers.get('x-forwarded-for')
+    if forwarded:
+        return forwarded.split(',')[0]
+    return request.client.host if request.client else None
+
+
+def instrumented(route, handler):
+    """Route timing and Server-Timing for an async handler, as app.py does for Flask routes"""
+    @functools.wraps(handler)
+    async def wrapper(request):
+        state = begin_request()
+        try:
+            response = await handler(request)
+        except Exception:
+            end_request(state, route, request.method, 500)
+            raise
+        header = end_request(state, route, request.method, response.status_code)
+        if timing_visible(read_session(request), request.headers.get('authorization')):
+            response.headers['Server-Timing'] = header
+        return response
+
+    return wrapper
+
+
+async def report(request):
+    """POST /report - async twin of app.report"""
+    lang = read_session(request).get('language', 'English')
+    try:
+        if int(request.headers.get('content-length') or 0) > flask_app.config['MAX_CONTENT_LENGTH']:
+            return JSONResponse({'error': 'File exceeds 10MB'}, status_code=413)
+        form = await request.form()
+
+        category = sanitize_input(form.get('category', ''), 100)
+
+        # If category is "Other", use the custom category field
+        if category == 'Other':
+            custom_category = sanitize_input(form.get('customCategory', ''), 100)
+            if custom_category:
+                category = custom_category
+            else:
+                return JSONResponse({'error': 'Please specify the incident type'}, status_code=400)
+
+        description = sanitize_input(form.get('description', ''), 2000)
+        manual_location = sanitize_input(form.get('manual_location', ''), 200)
+        constituency = sanitize_input(form.get('constituency', ''), 100)
+
+        detected_language = detect_language(description)
+        language = {'en': 'English', 'sw': 'Kiswahili', 'ki': 'Kiswahili'}.get(detected_language, 'English')
+
+        # One lookup serves both the GPS fallback and the spam check's location validation
+        location_coords = (None, None)
+        if len(manual_location) >= 3:
+            location_coords = await geocode_location_async(manual_location, constituency)
+
+        # GPS HANDLING
+        try:
+            lat = float(form.get('lat', str(DEFAULT_LAT)))
+            lon = float(form.get('lon', str(DEFAULT_LON)))
+
+            if (lat, lon) == (DEFAULT_LAT, DEFAULT_LON) and location_coords[0]:
+                lat, lon = location_coords
+
+            if not (-5 <= lat <= 5 and 33 <= lon <= 42):
+                lat, lon = DEFAULT_LAT, DEFAULT_LON
+        except (ValueError, TypeError) as e:
+            logger.error(f"GPS error: {str(e)}")
+            lat, lon = DEFAULT_LAT, DEFAULT_LON
+
+        if not all([category, description, manual_location, constituency]):
+            return JSONResponse({'error': translate_key('all_fields_required', lang)}, status_code=400)
+
+        enrolled, settings = await asyncio.gather(async_database.get_active_constituencies(),
+                                                  async_database.get_system_settings())
+        if constituency not in enrolled:
+            return JSONResponse({'error': 'Invalid or inactive constituency'}, status_code=400)
+
+        # FILE UPLOAD (hashing and disk writes run off the event loop)
+        media = None
+        upload = form.get('media')
+        if upload is not None and getattr(upload, 'filename', None) and allowed_file(upload.filename):
+            try:
+                media = await run_in_threadpool(save_upload, SimpleNamespace(filename=upload.filename,
+                                                                             stream=upload.file),
+                                                flask_app.config['UPLOAD_FOLDER'],
+                                                flask_app.config['MAX_CONTENT_LENGTH'])
+                logger.info(f"File uploaded: {media['name']} ({media['size']} bytes)")
+            except Exception as e:
+                logger.error(f"File upload error: {str(e)}")
+        media_path = media['name'] if media else None
+
+        spam_result = detect_spam({
+            'description': description,
+            'category': category,
+            'manual_location': manual_location,
+            'lat': lat,
+            'lon': lon,
+            'language': language
+        }, location_found=bool(location_coords[0]))
+
+        if spam_result['spam_score'] >= settings.get('auto_reject_threshold', 85):
+            # The upload stays for the media sweep, as in app.py
+            return JSONResponse({'error': 'Report rejected as spam'}, status_code=400)
+
+        report_id = await async_database.add_report(category, description, manual_location, lat, lon, constituency,
+                                                    language, media_path, spam_result, media)
+        await async_database.add_audit_log('citizen', 'anonymous', f'Submitted report #{report_id}',
+                                           f'Spam: {spam_result["spam_score"]}', get_client_ip(request))
+        if media:
+            schedule_previews(flask_app.config['UPLOAD_FOLDER'], media['name'])
+        schedule_report_translation(report_id, {
+            'category': category,
+            'description': description,
+            'manual_location': manual_location
+        }, LANGUAGE_CODES[language])
+
+        short_report_id = str(report_id)[-8:]
+
+        return JSONResponse({
+            'success': True,
+            'report_id': short_report_id,
+            'message': f'{translate_key("report_submitted", lang)} Report ID: {short_report_id}',
+            'gps_captured': lat != DEFAULT_LAT or lon != DEFAULT_LON,
+            'file_uploaded': media_path is not None
+        })
+
+    except Exception as e:
+        logger.error(f"Report error: {str(e)}")
+        return JSONResponse({'error': translate_key('report_failed', lang)}, status_code=500)
+
+
+async def track_report(request):
+    """GET /api/track_report/<report_id> - async twin of app.api_track_report"""
+    try:
+        report = await async_database.find_report_for_tracking(request.path_params['report_id'])
+        if not report:
+            return JSONResponse({'success': False, 'message': 'Report not found'}, status_code=404)
+
+        response = await async_database.get_response_for_report(report)
+        return JSONResponse({'success': True, 'report': tracking_summary(report, response)})
+
+    except Exception as e:
+        logger.error(f"Track report error: {str(e)}")
+        return JSONResponse({'success': False, 'message': 'Error tracking report'}, status_code=500)
+
+
+async def translate_report_route(request):
+    """GET /api/translate_report/<report_id>/<target_lang> - async twin of app.api_translate_report"""
+    session = read_session(request)
+    if not session.get('police_logged_in') or not session.get('station'):
+        return RedirectResponse('/police/login', status_code=302)
+
+    try:
+        target_lang = request.path_params['target_lang']
+        if target_lang not in ('en', 'sw'):
+            return JSONResponse({'error': 'Invalid language'}, status_code=400)
+
+        report = await async_database.get_report(request.path_params['report_id'])
+        if not report:
+            return JSONResponse({'error': 'Report not found'}, status_code=404)
+
+        if report['constituency'] != session.get('station'):
+            return JSONResponse({'error': 'Unauthorized'}, status_code=403)
+
+        original_language = LANGUAGE_CODES.get(report.get('language'), 'en')
+        translated = (report.get('translations') or {}).get(target_lang)
+
+        if translated is None:
+            if target_lang == original_language:
+                translated = report_translation_fields(report)
+            else:
+                # The translation client is synchronous; run the one batched call off the loop
+                translated = await run_in_threadpool(translate_report, report_translation_fields(report),
+                                                     target_lang)
+                if is_complete_translation(translated):
+                    await async_database.save_report_translation(report['_id'], target_lang, translated)
+
+        return JSONResponse({
+            'success': True,
+            'translated': translated,
+            'original_language': original_language,
+            'target_language': target_lang
+        })
+
+    except Exception as e:
+        logger.error(f"Translation error: {str(e)}")
+        return JSONResponse({'error': 'Translation failed'}, status_code=500)
+
+
+async def stats(request):
+    """GET /api/stats - async twin of app.api_stats"""
+    try:
+        return JSONResponse(await async_database.get_system_statistics())
+    except Exception as e:
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+
+application = Starlette(
+    routes=[
+        Route('/report', instrumented('/report', report), methods=['POST']),
+        Route('/api/track_report/{report_id}', instrumented('/api/track_report/<report_id>', track_report)),
+        Route('/api/translate_report/{report_id}/{target_lang}',
+              instrumented('/api/translate_report/<report_id>/<target_lang>', translate_report_route)),
+        Route('/api/stats', instrumented('/api/stats', stats)),
+        # Everything else, including GET /report, is served by the Flask app
+        Mount('/', app=WSGIMiddleware(flask_app)),
+    ],
+    lifespan=lifespan
+)
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+
+from database import DURABLE_WRITE, FAST_WRITE, ANALYTICS_READ, TRACKING_SCAN_LIMIT, EMPTY_SYSTEM_STATISTICS, \
+    report_document, hotspot_increment, audit_log_document, settings_from_document, system_statistics_counts, \
+    system_statistics_pipeline, system_statistics_from
+from db_connection import get_async_database
+from instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+# Async counterparts of the database.py functions used by the ASGI serving mode (asgi.py).
+# Documents, filters and pipelines come from database.py so both paths store and read the same
+# data, and each call keeps the write concern and read routing of its sync twin.
+
+
+def _collection(name, **options):
+    collection = get_async_database()[name]
+    return collection.with_options(**options) if options else collection
+
+
+# REPORT FUNCTIONS
+@timed('db', name='add_report_async')
+async def add_report(category, description, manual_location, lat, lon, constituency, language, media_path,
+                     spam_result, media=None):
+    """Create new incident report"""
+    try:
+        report = report_document(category, description, manual_location, lat, lon, constituency, language,
+                                 media_path, spam_result, media)
+        # Durable: the citizen's report is the record of the incident
+        result = await _collection('reports', write_concern=DURABLE_WRITE).insert_one(report)
+
+        # Fast: hotspot counters are derived data
+        await _collection('hotspots', write_concern=FAST_WRITE).update_one(
+            *hotspot_increment(constituency, manual_location, lat, lon), upsert=True)
+
+        return result.inserted_id
+    except Exception as e:
+        logger.error(f"Error adding report: {e}")
+        raise
+
+
+@timed('db', name='get_report_async')
+async def get_report(report_id):
+    """Get a report by its full ObjectId string, reading through to the archive"""
+    from bson.objectid import ObjectId
+
+    return await _collection('reports').find_one({'_id': ObjectId(report_id)}) or \
+        await _collection('reports_archive').find_one({'_id': ObjectId(report_id)})
+
+
+@timed('db', name='find_report_for_tracking_async')
+async def find_report_for_tracking(report_id):
+    """Find a report by its full ObjectId or its short tracking ID"""
+    from bson.objectid import ObjectId
+
+    reports = _collection('reports')
+    if len(report_id) == 24:
+        try:
+            report = await reports.find_one({'_id': ObjectId(report_id)}) or \
+                await _collection('reports_archive').find_one({'_id': ObjectId(report_id)})
+            if report:
+                return report
+        except Exception:
+            pass
+
+    async for report in reports.find({}).sort('created_at', -1).limit(TRACKING_SCAN_LIMIT):
+        if str(report['_id'])[-8:] == report_id:
+            return report
+    return None
+
+
+@timed('db', name='get_response_for_report_async')
+async def get_response_for_report(report):
+    """Get the police response to a report, if any; archived reports carry theirs"""
+    if 'archived_at' in report:
+        return report.get('response')
+    return await _collection('responses').find_one({'report_id': report['_id']})
+
+
+@timed('db', name='save_report_translation_async')
+async def save_report_translation(report_id, lang, translated):
+    """Store the translation of a report's text fields into one language"""
+    try:
+        # Fast: a lost translation is recomputed on demand
+        await _collection('reports', write_concern=FAST_WRITE).update_one(
+            {'_id': report_id},
+            {'$set': {f'translations.{lang}': translated}}
+        )
+    except Exception as e:
+        logger.error(f"Error saving report translation: {e}")
+
+
+# POLICE STATION FUNCTIONS
+@timed('db', name='get_active_constituencies_async')
+async def get_active_constituencies():
+    """Get the names of all active constituencies"""
+    try:
+        cursor = _collection('police_stations').find({'is_active': True}, {'constituency': 1})
+        return [station['constituency'] async for station in cursor]
+    except Exception as e:
+        logger.error(f"Error getting constituencies: {e}")
+        return []
+
+
+# SETTINGS FUNCTIONS
+@timed('db', name='get_system_settings_async')
+async def get_system_settings():
+    """Get current system settings"""
+    try:
+        return settings_from_document(await _collection('system_settings').find_one({}))
+    except Exception as e:
+        logger.error(f"Error getting system settings: {e}")
+        return {}
+
+
+# STATISTICS FUNCTIONS
+@timed('db', name='get_system_statistics_async')
+async def get_system_statistics():
+    """Get system-wide statistics, running the counts and the aggregation concurrently"""
+    try:
+        counts = system_statistics_counts()
+        results = await asyncio.gather(
+            *(_collection(collection, read_preference=ANALYTICS_READ).count_documents(query)
+              for collection, query in counts.values()),
+            _collection('reports', read_preference=ANALYTICS_READ).aggregate(
+                system_statistics_pipeline()).to_list(length=None)
+        )
+        return system_statistics_from(dict(zip(counts, results[:-1])), results[-1])
+    except Exception as e:
+        logger.error(f"Error getting system statistics: {e}")
+        return dict(EMPTY_SYSTEM_STATISTICS)
+
+
+# AUDIT LOG FUNCTIONS
+@timed('db', name='add_audit_log_async')
+async def add_audit_log(user_type, username, action, details=None, ip_address=None):
+    """Add audit log entry"""
+    try:
+        # Fast: written on every report
+        await _collection('audit_events', write_concern=FAST_WRITE).insert_one(
+            audit_log_document(user_type, username, action, details, ip_address))
+    except Exception as e:
+        logger.error(f"Failed to add audit log: {e}")
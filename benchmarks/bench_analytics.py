@@ -0,0 +1,190 @@
+"""
+Scaling benchmark for the ai_analytics engines: time and peak memory at increasing input sizes.
+
+    python benchmarks/bench_analytics.py [--sizes 100,1000,10000,100000] [--repeat 3]
+        [--function detect_anomalies ...] [--max-seconds 60] [--max-memory-mb 2048]
+        [--output results.json] [--baseline results.json] [--threshold 0.25]
+
+Each engine runs on seeded synthetic reports/hotspots. Time is the best of --repeat runs;
+peak memory comes from one extra run under tracemalloc. 'growth_exponent' is the slope of
+log(time) against log(n) between consecutive sizes: about 1 for linear code, 2 or more
+for quadratic paths. A size is skipped, not run, when a quadratic projection from the
+previous size would exceed --max-seconds or --max-memory-mb. With --baseline, exits 1 when
+time or peak memory of any (function, size) grew by more than the threshold.
+detect_spam runs with location_found=True so that it never geocodes over the network.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, BENCH_DIR)
+
+import ai_analytics  # noqa: E402
+from seed_data import CONSTITUENCIES, CATEGORIES, DESCRIPTIONS, PLACES  # noqa: E402
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+
+# Timings below this are dominated by noise and are not compared against the baseline
+NOISE_FLOOR_SECONDS = 0.001
+
+
+def synthetic_reports(n, seed=42):
+    """n reports, newest first as the database returns them"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    constituencies = list(CONSTITUENCIES.items())
+    reports = []
+    for _ in range(n):
+        constituency, (lat, lon) = rng.choice(constituencies)
+        language = 'Kiswahili' if rng.random() < 0.35 else 'English'
+        place = rng.choice(PLACES)
+        description = rng.choice(DESCRIPTIONS[language]).format(place=place)
+        if rng.random() < 0.1:
+            description += ' emergency, a man has a knife!!!'
+        reports.append({
+            'category': rng.choice(CATEGORIES),
+            'description': description,
+            'manual_location': f'{constituency} {place}',
+            'lat': lat + rng.uniform(-0.05, 0.05),
+            'lon': lon + rng.uniform(-0.05, 0.05),
+            'constituency': constituency,
+            'language': language,
+            'created_at': now - timedelta(days=60 * rng.random()),
+        })
+    reports.sort(key=lambda r: r['created_at'], reverse=True)
+    return reports
+
+
+def synthetic_hotspots(n, seed=42):
+    rng = random.Random(seed + 1)
+    centres = list(CONSTITUENCIES.values())
+    hotspots = []
+    for i in range(n):
+        lat, lon = rng.choice(centres)
+        hotspots.append({
+            'location': f'Location {i}',
+            'lat': lat + rng.gauss(0, 0.01),
+            'lon': lon + rng.gauss(0, 0.01),
+            'incident_count': rng.randint(1, 20),
+        })
+    return hotspots
+
+
+def _detect_spam_all(reports, hotspots):
+    for report in reports:
+        ai_analytics.detect_spam(report, location_found=True)
+
+
+ENGINES = {
+    'detect_spam': _detect_spam_all,
+    'detect_anomalies': lambda reports, hotspots: ai_analytics.detect_anomalies(reports),
+    'analyze_trends': lambda reports, hotspots: ai_analytics.analyze_trends(reports),
+    'calculate_hotspot_density': lambda reports, hotspots: ai_analytics.calculate_hotspot_density(hotspots),
+    'perform_clustering': lambda reports, hotspots: ai_analytics.perform_clustering(hotspots),
+    'generate_patrol_recommendations':
+        lambda reports, hotspots: ai_analytics.generate_patrol_recommendations(hotspots, reports, 'Bench'),
+}
+
+
+def measure(engine, reports, hotspots, repeat):
+    """Return (best seconds, peak MiB) for one engine on one input"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        engine(reports, hotspots)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        engine(reports, hotspots)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / (1024 * 1024)
+
+
+def run(functions, sizes, repeat, max_seconds, max_memory_mb):
+    results = {name: [] for name in functions}
+    for n in sizes:
+        reports, hotspots = synthetic_reports(n), synthetic_hotspots(n)
+        for name in functions:
+            history = results[name]
+            previous = history[-1] if history else None
+            if previous and 'skipped' not in previous:
+                scale = (n / previous['n']) ** 2
+                if previous['seconds'] * scale > max_seconds or previous['peak_mb'] * scale > max_memory_mb:
+                    history.append({'n': n, 'skipped': 'quadratic projection exceeds the time or memory budget'})
+                    continue
+            elif previous:
+                history.append({'n': n, 'skipped': 'a smaller size was skipped'})
+                continue
+
+            seconds, peak_mb = measure(ENGINES[name], reports, hotspots, repeat)
+            entry = {'n': n, 'seconds': round(seconds, 6), 'peak_mb': round(peak_mb, 3)}
+            if previous and previous['seconds'] > 0 and seconds > 0:
+                entry['growth_exponent'] = round(
+                    math.log(seconds / previous['seconds']) / math.log(n / previous['n']), 2)
+            history.append(entry)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return the (function, size) regressions against an earlier run of this script"""
+    regressions = []
+    for name, entries in results.items():
+        previous = {e['n']: e for e in baseline.get('results', {}).get(name, []) if 'skipped' not in e}
+        for entry in entries:
+            old = previous.get(entry['n'])
+            if not old:
+                continue
+            if 'skipped' in entry:
+                regressions.append(f"{name} n={entry['n']}: skipped, baseline ran in {old['seconds']}s")
+                continue
+            for metric in ('seconds', 'peak_mb'):
+                if metric == 'seconds' and old[metric] < NOISE_FLOOR_SECONDS:
+                    continue
+                if old[metric] and entry[metric] > old[metric] * (1 + threshold):
+                    regressions.append(f"{name} n={entry['n']}: {metric} {entry[metric]} vs baseline {old[metric]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--function', action='append', choices=list(ENGINES), help='repeatable; default all')
+    parser.add_argument('--max-seconds', type=float, default=60)
+    parser.add_argument('--max-memory-mb', type=float, default=2048)
+    parser.add_argument('--output', help='also write the JSON results to this file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25)
+    args = parser.parse_args()
+
+    sizes = sorted(int(s) for s in args.sizes.split(','))
+    results = run(args.function or list(ENGINES), sizes, args.repeat, args.max_seconds, args.max_memory_mb)
+    output = {'sizes': sizes, 'repeat': args.repeat, 'python': sys.version.split()[0], 'results': results}
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            output['regressions'] = compare(results, json.load(f), args.threshold)
+        status = 1 if output['regressions'] else 0
+
+    text = json.dumps(output, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
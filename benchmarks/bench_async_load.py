@@ -0,0 +1,125 @@
+"""
+Requests/sec of the WSGI (gunicorn app:app) and ASGI (uvicorn asgi:application) serving
+modes at equal worker counts, for the endpoints the ASGI mode serves asynchronously.
+
+    MONGO_URI=mongodb://... python benchmarks/bench_async_load.py [--workers 2] [--sync-threads 4]
+        [--concurrency 32] [--duration 10]
+
+Starts both servers against a scratch database (MONGO_DB_NAME, default 'safety_app_bench'),
+seeds one active station and a report to track, runs each scenario against each server
+and prints JSON. Requires gunicorn plus the packages in requirements-async.txt.
+The scratch database is dropped afterwards, so its name must end in '_bench'.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from urllib.parse import urlencode
+
+os.environ.setdefault('MONGO_DB_NAME', 'safety_app_bench')
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database  # noqa: E402
+from db_connection import get_client, MONGO_DB_NAME  # noqa: E402
+from mongo_fixture import require_scratch_database  # noqa: E402
+from loadgen import run_load, wait_until_ready  # noqa: E402
+
+CONSTITUENCY = 'Nakuru Town East'
+SPAM_RESULT = {'spam_score': 10, 'reasons': []}
+FORM_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded'}
+
+
+def seed():
+    """Ensure an active station exists and return the short ID of a report to track"""
+    if (CONSTITUENCY,) not in database.get_all_constituencies():
+        database.add_police_station(CONSTITUENCY, 'bench_station', 'bench-password', 'English', '', '')
+    report_id = database.add_report('Theft', 'Phone stolen at the market near the bus stage', 'Wakulima Market',
+                                    -0.3025, 36.0795, CONSTITUENCY, 'English', None, SPAM_RESULT)
+    return str(report_id)[-8:]
+
+
+def scenarios(short_id):
+    body = urlencode({
+        'category': 'Theft',
+        # Same text every time, so ingestion translation is served from the translation memory
+        'description': 'Two men snatched a phone from a woman at the market this evening',
+        'manual_location': 'Wakulima Market',
+        'constituency': CONSTITUENCY,
+        'lat': '-0.3025',
+        'lon': '36.0795',
+    })
+    return {
+        'api_stats': lambda i: ('GET', '/api/stats', None, None),
+        'api_track_report': lambda i: ('GET', f'/api/track_report/{short_id}', None, None),
+        'report_post': lambda i: ('POST', '/report', body, FORM_HEADERS),
+    }
+
+
+def start_servers(workers, sync_threads, sync_port, async_port):
+    env = dict(os.environ)
+    quiet = {'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL}
+    sync_server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-w', str(workers), '--threads', str(sync_threads),
+         '-b', f'127.0.0.1:{sync_port}', 'app:app'],
+        cwd=REPO_ROOT, env=env, **quiet
+    )
+    async_server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'asgi:application', '--workers', str(workers),
+         '--host', '127.0.0.1', '--port', str(async_port), '--no-access-log', '--log-level', 'warning'],
+        cwd=REPO_ROOT, env=env, **quiet
+    )
+    return sync_server, async_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--sync-threads', type=int, default=4, help='gthread threads per gunicorn worker')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--sync-port', type=int, default=8101)
+    parser.add_argument('--async-port', type=int, default=8102)
+    args = parser.parse_args()
+
+    try:
+        require_scratch_database(MONGO_DB_NAME)
+    except RuntimeError as e:
+        sys.exit(str(e))
+
+    servers = ()
+    results = {}
+    try:
+        short_id = seed()
+        servers = start_servers(args.workers, args.sync_threads, args.sync_port, args.async_port)
+        targets = {'sync': f'http://127.0.0.1:{args.sync_port}', 'async': f'http://127.0.0.1:{args.async_port}'}
+        for url in targets.values():
+            wait_until_ready(url)
+
+        for name, make_request in scenarios(short_id).items():
+            results[name] = {}
+            for mode, url in targets.items():
+                run_load(url, make_request, concurrency=args.concurrency, duration=1)  # warm up
+                results[name][mode] = run_load(url, make_request, concurrency=args.concurrency,
+                                               duration=args.duration)
+            sync_rps = results[name]['sync']['rps']
+            results[name]['async_speedup'] = round(results[name]['async']['rps'] / sync_rps, 2) if sync_rps else None
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait(timeout=30)
+        get_client().drop_database(MONGO_DB_NAME)
+
+    print(json.dumps({
+        'workers': args.workers,
+        'sync_threads_per_worker': args.sync_threads,
+        'concurrency': args.concurrency,
+        'duration_s': args.duration,
+        'results': results
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Latency and throughput baseline for the citizen, police and admin hot paths.
+
+    python benchmarks/bench_hot_paths.py [--backend mongod|mongomock|uri] [--seed 42]
+        [--reports-per-constituency 200] [--concurrency 8] [--duration 10] [--stub-latency-ms 50]
+        [--scenario home ...] [--output results.json] [--baseline results.json] [--tolerance 0.25]
+
+Seeds synthetic data (seed_data.py) into a local MongoDB (mongo_fixture.py) and applies the
+index migrations (migrations.py), serves Nominatim and translation from local stubs
+(stub_services.py) and runs the Flask app on an in-process threaded WSGI server, then drives
+each scenario with benchmarks/loadgen.py and prints JSON. The load generator shares the process
+with the app, so compare results from the same machine and settings. With --baseline, exits 1
+when a scenario's requests/sec fell or its p95 latency rose by more than the tolerance.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import sys
+import threading
+from urllib.parse import urlencode, urlsplit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, BENCH_DIR)
+
+from loadgen import run_load, wait_until_ready  # noqa: E402
+from mongo_fixture import mongo_backend, BACKENDS  # noqa: E402
+from seed_data import CONSTITUENCIES, DESCRIPTIONS, seed_database  # noqa: E402
+from stub_services import StubServices  # noqa: E402
+
+FORM_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded'}
+
+# Landmarks (local fuzzy match), unknown places (stub Nominatim) and a place the stub cannot find
+REPORT_LOCATIONS = ['Wakulima Market', 'Nakuru Bus Station', 'Kiamunyi Stage', 'Githima Estate',
+                    'Section 58', 'Nowhere Junction']
+
+
+def login(base_url, path, username, password):
+    """Log in through the form and return the session cookie header"""
+    parts = urlsplit(base_url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port)
+    conn.request('POST', path, body=urlencode({'username': username, 'password': password}), headers=FORM_HEADERS)
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    cookie = response.getheader('Set-Cookie')
+    if response.status != 302 or not cookie:
+        raise RuntimeError(f"Login as {username} failed with status {response.status}")
+    return cookie.split(';', 1)[0]
+
+
+def build_scenarios(base_url, summary):
+    """Scenario name -> make_request(i) for loadgen.run_load"""
+    constituencies = list(CONSTITUENCIES)
+    descriptions = [d.format(place='market') for texts in DESCRIPTIONS.values() for d in texts]
+    station_cookies = [login(base_url, '/police/login', summary['station_logins'][c], summary['station_password'])
+                       for c in constituencies]
+    admin_cookie = login(base_url, '/admin/login', summary['admin_username'], summary['station_password'])
+
+    # Full IDs take the indexed lookup; short IDs of recent reports take the tracking scan
+    track_ids = list(itertools.chain.from_iterable(
+        (full_id, recent[-8:]) for full_id, recent in zip(summary['report_ids'][::97], summary['recent_report_ids'])
+    ))
+
+    def report_post(i):
+        body = urlencode({
+            'category': 'Theft',
+            'description': descriptions[i % len(descriptions)],
+            'manual_location': REPORT_LOCATIONS[i % len(REPORT_LOCATIONS)],
+            'constituency': constituencies[i % len(constituencies)],
+        })
+        return 'POST', '/report', body, FORM_HEADERS
+
+    return {
+        'home': lambda i: ('GET', '/', None, None),
+        'report_post': report_post,
+        'api_track_report': lambda i: ('GET', f'/api/track_report/{track_ids[i % len(track_ids)]}', None, None),
+        'police_dashboard': lambda i: ('GET', '/police/dashboard', None,
+                                       {'Cookie': station_cookies[i % len(station_cookies)]}),
+        'admin_dashboard': lambda i: ('GET', '/admin/dashboard', None, {'Cookie': admin_cookie}),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return the regressions of results against a previous run of this script"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        if previous['rps'] and current['rps'] < previous['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: {current['rps']} req/s vs baseline {previous['rps']}")
+        if previous['p95_ms'] and current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']} ms vs baseline {previous['p95_ms']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=BACKENDS, default='mongod')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reports-per-constituency', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--stub-latency-ms', type=float, default=50)
+    parser.add_argument('--scenario', action='append', help='run only these scenarios (repeatable)')
+    parser.add_argument('--output', help='also write the JSON results to this file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    with StubServices(latency_ms=args.stub_latency_ms) as stubs:
+        # Read by ai_analytics and translate at import, so set before the app is imported
+        os.environ['NOMINATIM_URL'] = stubs.nominatim_url
+        os.environ['TRANSLATION_SERVICE_URL'] = stubs.translation_url
+
+        with mongo_backend(args.backend) as backend:
+            from db_connection import get_database
+            from migrations import apply_migrations
+
+            summary = seed_database(get_database(), args.seed, args.reports_per_constituency)
+            apply_migrations(get_database())
+
+            from werkzeug.serving import make_server
+            from app import app
+
+            server = make_server('127.0.0.1', 0, app, threaded=True)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            base_url = f'http://127.0.0.1:{server.server_port}'
+            try:
+                wait_until_ready(base_url)
+                scenarios = build_scenarios(base_url, summary)
+                selected = args.scenario or list(scenarios)
+
+                results = {}
+                for name in selected:
+                    run_load(base_url, scenarios[name], concurrency=args.concurrency, duration=1)  # warm up
+                    results[name] = run_load(base_url, scenarios[name], concurrency=args.concurrency,
+                                             duration=args.duration)
+            finally:
+                server.shutdown()
+
+        stub_requests = dict(stubs.counts)
+
+    output = {
+        'backend': backend['backend'],
+        'seed': args.seed,
+        'data': {k: summary[k] for k in ('stations', 'reports', 'responses', 'hotspots')},
+        'concurrency': args.concurrency,
+        'duration_s': args.duration,
+        'stub_latency_ms': args.stub_latency_ms,
+        'stub_requests': stub_requests,
+        'results': results,
+    }
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            output['regressions'] = compare(results, json.load(f), args.tolerance)
+        status = 1 if output['regressions'] else 0
+
+    text = json.dumps(output, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Import-time budget check for web worker startup, based on `python -X importtime`.
+
+    python benchmarks/bench_import_time.py [--module app] [--budget-ms 800] [--top 15]
+
+Imports the module in a fresh interpreter, reports the slowest imports and fails
+(exit status 1) if the total exceeds the budget or if a module that must be loaded
+lazily (scipy, reportlab, deep_translator, ...) was imported at startup.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Loaded on first use of clustering/density, PDF export, translation, geocoding and thumbnails
+LAZY_MODULES = ('numpy', 'scipy', 'reportlab', 'deep_translator', 'requests', 'PIL')
+
+
+def measure(module):
+    """Return (per-module timings sorted by cumulative time, lazily loaded modules that were imported)"""
+    probe = (
+        f"import sys, json; import {module}; "
+        f"print(json.dumps(sorted(m for m in {LAZY_MODULES!r} if m in sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', probe],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        # "import time:    self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings.append({
+            # One separator space, then two more per nesting level
+            'module': name[1:].rstrip(),
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000
+        })
+
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return timings, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--budget-ms', type=float, default=800)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    timings, loaded = measure(args.module)
+    # Top-level entries (no leading spaces in the name) add up to the total
+    total_ms = sum(t['cumulative_ms'] for t in timings if not t['module'].startswith(' '))
+    slowest = sorted(timings, key=lambda t: t['cumulative_ms'], reverse=True)[:args.top]
+
+    print(json.dumps({
+        'module': args.module,
+        'total_ms': round(total_ms, 1),
+        'budget_ms': args.budget_ms,
+        'eagerly_loaded_lazy_modules': loaded,
+        'slowest': [{**t, 'module': t['module'].strip()} for t in slowest]
+    }, indent=2))
+
+    return 0 if total_ms <= args.budget_ms and not loaded else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Accuracy and throughput benchmark for the offline language detector.
+
+    python benchmarks/bench_language_detect.py [--min-accuracy 0.9] [--rounds 2000]
+
+Exits with status 1 when accuracy on the labelled corpus falls below --min-accuracy.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from language_detect import detect  # noqa: E402
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'language_corpus.tsv')
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, encoding='utf-8') as f:
+        return [tuple(line.rstrip('\n').split('\t', 1)) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--min-accuracy', type=float, default=0.9)
+    parser.add_argument('--rounds', type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    misses = [(label, text) for label, text in corpus if detect(text) != label]
+    accuracy = 1 - len(misses) / len(corpus)
+
+    texts = [text for _, text in corpus]
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for text in texts:
+            detect(text)
+    elapsed = time.perf_counter() - start
+    calls = args.rounds * len(texts)
+
+    print(json.dumps({
+        'samples': len(corpus),
+        'accuracy': round(accuracy, 4),
+        'misclassified': [{'expected': label, 'text': text} for label, text in misses],
+        'detections_per_second': round(calls / elapsed),
+        'mean_microseconds': round(elapsed / calls * 1e6, 2)
+    }, indent=2))
+
+    return 0 if accuracy >= args.min_accuracy else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
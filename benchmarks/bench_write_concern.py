@@ -0,0 +1,81 @@
+"""
+Report-submit latency with per-operation write concerns versus majority everywhere.
+
+    MONGO_URI=mongodb://... python benchmarks/bench_write_concern.py [--iterations 200]
+
+Runs the database writes of one /report submission (report insert, hotspot upsert,
+audit log insert) against a scratch database (MONGO_DB_NAME, default 'safety_app_bench'),
+first with database.py's profiles and then with w='majority' on every write.
+Use a replica set: on a standalone server both concerns are acknowledged identically.
+The scratch database is dropped afterwards, so its name must end in '_bench'.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault('MONGO_DB_NAME', 'safety_app_bench')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import database  # noqa: E402
+from db_connection import get_client, MONGO_DB_NAME  # noqa: E402
+from mongo_fixture import require_scratch_database  # noqa: E402
+
+SPAM_RESULT = {'spam_score': 10, 'reasons': []}
+
+
+def submit_once(i):
+    report_id = database.add_report('Theft', f'Phone stolen at the market, benchmark report {i}',
+                                    f'Location {i % 20}', -0.3031, 36.08, 'Nakuru Town East', 'English',
+                                    None, SPAM_RESULT)
+    database.add_audit_log('citizen', 'anonymous', f'Submitted report #{report_id}', 'Spam: 10', '127.0.0.1')
+
+
+def run(iterations):
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        submit_once(i)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'mean_ms': round(statistics.mean(timings), 3),
+        'p50_ms': round(timings[len(timings) // 2], 3),
+        'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    try:
+        require_scratch_database(MONGO_DB_NAME)
+    except RuntimeError as e:
+        sys.exit(str(e))
+
+    try:
+        run(10)  # warm up the pool
+        profiles = run(args.iterations)
+
+        # Point every fast handle at majority for the comparison run
+        for name in ('hotspots_fast', 'audit_logs_fast', 'reports_fast', 'settings_fast',
+                     'translation_memory_fast'):
+            setattr(database, name, getattr(database, name).with_options(write_concern=database.DURABLE_WRITE))
+        majority = run(args.iterations)
+    finally:
+        get_client().drop_database(MONGO_DB_NAME)
+
+    print(json.dumps({
+        'iterations': args.iterations,
+        'per_operation_profiles': profiles,
+        'majority_everywhere': majority,
+        'mean_saving_ms': round(majority['mean_ms'] - profiles['mean_ms'], 3)
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
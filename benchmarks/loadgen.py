@@ -0,0 +1,94 @@
+"""
+Closed-loop HTTP load generator shared by the load benchmarks (standard library only).
+
+Each of `concurrency` threads keeps one keep-alive connection open and sends requests
+back to back for `duration` seconds. Requests are built by a callable
+make_request(i) -> (method, path, body, headers).
+"""
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def run_load(base_url, make_request, concurrency=16, duration=10.0, timeout=30.0):
+    """Drive a server and return throughput, error count and latency percentiles"""
+    parts = urlsplit(base_url)
+    latencies = []
+    statuses = {}
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(10 ** 12))
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+        local_latencies = []
+        local_statuses = {}
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            with lock:
+                i = next(counter)
+            method, path, body, headers = make_request(i)
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                response.read()
+                local_latencies.append((time.perf_counter() - start) * 1000)
+                local_statuses[response.status] = local_statuses.get(response.status, 0) + 1
+                if response.status >= 500:
+                    local_errors += 1
+                if response.getheader('Connection', '').lower() == 'close':
+                    conn.close()
+            except Exception:
+                local_errors += 1
+                conn.close()
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'statuses': {str(k): v for k, v in sorted(statuses.items())},
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0,
+        'mean_ms': round(sum(latencies) / len(latencies), 3) if latencies else 0,
+        'p50_ms': round(_percentile(latencies, 0.50), 3),
+        'p95_ms': round(_percentile(latencies, 0.95), 3),
+        'p99_ms': round(_percentile(latencies, 0.99), 3),
+    }
+
+
+def wait_until_ready(base_url, path='/api/health', timeout=30.0):
+    """Poll a server until it answers, or raise TimeoutError"""
+    parts = urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=2)
+            conn.request('GET', path)
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"{base_url} did not become ready within {timeout}s")
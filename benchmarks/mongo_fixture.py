@@ -0,0 +1,96 @@
+"""
+MongoDB for the benchmarks, as a context manager:
+
+    with mongo_backend('mongod') as info: ...
+
+Backends:
+    mongomock  in-process mongomock client (pip install mongomock); the app must run in this process
+    mongod     a throwaway mongod (binary on PATH) on a free port with a temporary data directory
+    uri        the server in MONGO_URI, using the scratch database MONGO_DB_NAME (must end in '_bench')
+
+The backend is selected before database.py is first used; the scratch database is dropped on exit.
+"""
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+
+BACKENDS = ('mongomock', 'mongod', 'uri')
+
+# The benchmarks drop their database when they finish, so its name must end in this
+SCRATCH_SUFFIX = '_bench'
+
+
+def require_scratch_database(name):
+    """Refuse to run against a database whose name does not mark it as disposable"""
+    if not name.endswith(SCRATCH_SUFFIX):
+        raise RuntimeError(f"Refusing to benchmark against {name!r}: the benchmarks empty or drop their database, "
+                           f"so MONGO_DB_NAME must end in {SCRATCH_SUFFIX!r}")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_mongod(uri, process, timeout=30):
+    from pymongo import MongoClient
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"mongod exited with status {process.returncode}")
+        client = MongoClient(uri, serverSelectionTimeoutMS=500)
+        try:
+            client.admin.command('ping')
+            return
+        except Exception:
+            time.sleep(0.2)
+        finally:
+            client.close()
+    raise TimeoutError(f"mongod did not start within {timeout}s")
+
+
+@contextmanager
+def mongo_backend(backend='mongod'):
+    """Point db_connection at the chosen backend and yield a description of it"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}; choose one of {BACKENDS}")
+    os.environ.setdefault('MONGO_DB_NAME', 'safety_app_bench')
+
+    process = data_dir = None
+    if backend == 'mongod':
+        binary = shutil.which('mongod')
+        if not binary:
+            raise RuntimeError("mongod not found on PATH; use --backend uri or --backend mongomock")
+        data_dir = tempfile.mkdtemp(prefix='safety-bench-mongo-')
+        port = _free_port()
+        process = subprocess.Popen([binary, '--dbpath', data_dir, '--port', str(port), '--bind_ip', '127.0.0.1',
+                                    '--quiet'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        os.environ['MONGO_URI'] = f'mongodb://127.0.0.1:{port}/'
+
+    import db_connection
+
+    require_scratch_database(db_connection.MONGO_DB_NAME)
+    try:
+        if backend == 'mongomock':
+            import mongomock
+
+            db_connection.use_client(mongomock.MongoClient())
+        else:
+            db_connection.MONGO_URI = os.environ.get('MONGO_URI', db_connection.MONGO_URI)
+            if process is not None:
+                _wait_for_mongod(db_connection.MONGO_URI, process)
+
+        yield {'backend': backend, 'database': db_connection.MONGO_DB_NAME}
+    finally:
+        if backend == 'uri':
+            db_connection.get_client().drop_database(db_connection.MONGO_DB_NAME)
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+            shutil.rmtree(data_dir, ignore_errors=True)
@@ -0,0 +1,209 @@
+"""
+Seeded synthetic data for the benchmarks: police stations, reports, responses, hotspots and an admin
+across the 11 Nakuru constituencies. The same seed always produces the same data, dated relative to now.
+
+    MONGO_URI=mongodb://... python benchmarks/seed_data.py [--seed 42] [--reports-per-constituency 200]
+
+Writes to MONGO_DB_NAME (default 'safety_app_bench', and the name must end in '_bench');
+existing seeded collections are replaced.
+Stations and the admin log in with the password 'bench-password'.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+os.environ.setdefault('MONGO_DB_NAME', 'safety_app_bench')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from mongo_fixture import require_scratch_database  # noqa: E402
+
+# Constituency -> approximate centre
+CONSTITUENCIES = {
+    'Bahati': (-0.2833, 36.0500),
+    'Gilgil': (-0.5000, 36.3200),
+    'Kuresoi North': (-0.1167, 35.5833),
+    'Kuresoi South': (-0.2000, 35.6000),
+    'Molo': (-0.2500, 35.7333),
+    'Naivasha': (-0.7167, 36.4333),
+    'Nakuru Town East': (-0.2800, 36.0900),
+    'Nakuru Town West': (-0.3200, 36.0700),
+    'Njoro': (-0.3333, 35.9333),
+    'Rongai': (-0.1722, 35.8653),
+    'Subukia': (-0.4000, 36.1500),
+}
+
+STATION_PASSWORD = 'bench-password'
+ADMIN_USERNAME = 'bench_admin'
+CATEGORIES = ['Theft', 'Assault', 'Vandalism', 'Drug Activity', 'Traffic Violation', 'Robbery', 'Other']
+STATUSES = ['pending', 'investigating', 'resolved', 'closed']
+STATUS_WEIGHTS = [4, 2, 3, 1]
+PLACES = ['Market', 'Bus Stage', 'Main Road', 'Primary School', 'Shopping Centre', 'Police Post', 'Estate Gate',
+          'Petrol Station', 'Hospital', 'Church', 'Chief Camp', 'Junction']
+
+DESCRIPTIONS = {
+    'English': [
+        'Two men snatched a phone from a woman near the {place} this evening',
+        'A shop was broken into at night and goods were stolen from the {place}',
+        'Youths are selling drugs openly behind the {place} every afternoon',
+        'A motorbike hit a pedestrian at the {place} and the rider fled',
+        'People are fighting with weapons outside the {place} right now',
+    ],
+    'Kiswahili': [
+        'Wezi wawili wamemwibia mwanamke simu karibu na {place} jioni hii',
+        'Duka limevunjwa usiku na mali imeibiwa karibu na {place}',
+        'Vijana wanauza dawa za kulevya nyuma ya {place} kila mchana',
+        'Pikipiki imemgonga mtu karibu na {place} na dereva ametoroka',
+    ],
+}
+
+OFFICERS = ['Cpl. Wanjiru', 'Sgt. Otieno', 'PC Kiprono', 'Insp. Mwangi', 'PC Achieng']
+
+
+def station_username(constituency):
+    return 'station_' + constituency.lower().replace(' ', '_')
+
+
+def generate(seed=42, reports_per_constituency=200, days=60, now=None):
+    """Build (stations, reports, responses, hotspots) documents without touching the database"""
+    rng = random.Random(seed)
+    now = now or datetime.now()
+    # One hash for every station keeps seeding fast; the login path still verifies it
+    password_hash = generate_password_hash(STATION_PASSWORD)
+
+    stations, reports, responses = [], [], []
+    hotspots = {}
+    for constituency, (base_lat, base_lon) in CONSTITUENCIES.items():
+        stations.append({
+            'constituency': constituency,
+            'username': station_username(constituency),
+            'password_hash': password_hash,
+            'preferred_language': rng.choice(['English', 'Kiswahili']),
+            'contact_phone': f'07{rng.randrange(10 ** 8):08d}',
+            'contact_email': f'{station_username(constituency)}@example.org',
+            'is_active': True,
+            'created_at': now - timedelta(days=days + 30),
+            'updated_at': now - timedelta(days=days + 30),
+        })
+
+        # Incidents cluster around a handful of locations per constituency
+        locations = [(place, f'{constituency} {place}',
+                      base_lat + rng.uniform(-0.03, 0.03),
+                      base_lon + rng.uniform(-0.03, 0.03)) for place in rng.sample(PLACES, 6)]
+
+        for _ in range(reports_per_constituency):
+            place, location, lat, lon = rng.choice(locations)
+            language = 'Kiswahili' if rng.random() < 0.35 else 'English'
+            created_at = now - timedelta(days=days * rng.random() ** 1.5)
+            status = rng.choices(STATUSES, STATUS_WEIGHTS)[0]
+            spam_score = rng.choice([0, 0, 0, 10, 20, 30, 50, 70])
+            report = {
+                'category': rng.choice(CATEGORIES),
+                'description': rng.choice(DESCRIPTIONS[language]).format(place=place),
+                'manual_location': location,
+                'lat': lat + rng.uniform(-0.002, 0.002),
+                'lon': lon + rng.uniform(-0.002, 0.002),
+                'constituency': constituency,
+                'language': language,
+                'media_path': None,
+                'media': None,
+                'spam_score': spam_score,
+                'spam_reasons': ['Too few words'] if spam_score >= 30 else [],
+                'status': status,
+                'created_at': created_at,
+                'updated_at': created_at,
+            }
+            reports.append(report)
+
+            if status != 'pending':
+                responses.append({
+                    '_report_index': len(reports) - 1,
+                    'officer_name': rng.choice(OFFICERS),
+                    'action_taken': 'Officers dispatched to the scene',
+                    'notes': 'Follow-up scheduled',
+                    'status': status,
+                    'created_at': created_at + timedelta(hours=rng.uniform(0.5, 72)),
+                })
+
+            hotspot = hotspots.setdefault((constituency, location), {
+                'constituency': constituency,
+                'location': location,
+                'lat': lat,
+                'lon': lon,
+                'incident_count': 0,
+                'created_at': created_at,
+                'last_incident': created_at,
+            })
+            hotspot['incident_count'] += 1
+            hotspot['created_at'] = min(hotspot['created_at'], created_at)
+            hotspot['last_incident'] = max(hotspot['last_incident'], created_at)
+
+    return stations, reports, responses, list(hotspots.values())
+
+
+def seed_database(db, seed=42, reports_per_constituency=200, days=60):
+    """Replace the seeded collections in db and return a summary used by the scenarios"""
+    # The seeded collections are emptied first, so only ever run against a scratch database
+    require_scratch_database(db.name)
+    stations, reports, responses, hotspots = generate(seed, reports_per_constituency, days)
+
+    for name in ('police_stations', 'reports', 'responses', 'hotspots', 'admin_users'):
+        db[name].delete_many({})
+
+    db['police_stations'].insert_many(stations)
+    db['admin_users'].insert_one({
+        'username': ADMIN_USERNAME,
+        'password_hash': stations[0]['password_hash'],
+        'email': f'{ADMIN_USERNAME}@example.org',
+        'is_active': True,
+        'created_at': datetime.now()
+    })
+    report_ids = db['reports'].insert_many(reports).inserted_ids
+    for response in responses:
+        response['report_id'] = report_ids[response.pop('_report_index')]
+    if responses:
+        db['responses'].insert_many(responses)
+    db['hotspots'].insert_many(hotspots)
+
+    return {
+        'seed': seed,
+        'stations': len(stations),
+        'reports': len(reports),
+        'responses': len(responses),
+        'hotspots': len(hotspots),
+        'station_logins': {c: station_username(c) for c in CONSTITUENCIES},
+        'station_password': STATION_PASSWORD,
+        'admin_username': ADMIN_USERNAME,
+        'report_ids': [str(report_id) for report_id in report_ids],
+        # Newest first; short tracking IDs only match among the newest reports
+        'recent_report_ids': [str(report_ids[i]) for i in
+                              sorted(range(len(reports)), key=lambda i: reports[i]['created_at'], reverse=True)[:50]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reports-per-constituency', type=int, default=200)
+    parser.add_argument('--days', type=int, default=60)
+    args = parser.parse_args()
+
+    from db_connection import get_database, MONGO_DB_NAME
+
+    try:
+        require_scratch_database(MONGO_DB_NAME)
+    except RuntimeError as e:
+        sys.exit(str(e))
+
+    summary = seed_database(get_database(), args.seed, args.reports_per_constituency, args.days)
+    summary.pop('report_ids')
+    summary.pop('recent_report_ids')
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
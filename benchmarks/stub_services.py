@@ -0,0 +1,105 @@
+"""
+Local stand-ins for Nominatim and Google Translate, so benchmarks never touch the network.
+
+    python benchmarks/stub_services.py [--port 8199] [--latency-ms 50]
+
+Serves GET /search (Nominatim JSON: a deterministic point in Nakuru County, or no result for
+queries containing 'nowhere') and GET /translate (the mobile page format deep_translator
+parses: each line of q prefixed with [<tl>]). Point the app at it with
+NOMINATIM_URL=http://127.0.0.1:<port>/search and TRANSLATION_SERVICE_URL=http://127.0.0.1:<port>/translate.
+A fixed per-request latency emulates the real services.
+"""
+import argparse
+import hashlib
+import html
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; avoid the Nagle / delayed-ACK stall on keep-alive
+    disable_nagle_algorithm = True
+    latency = 0.0
+    counts = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, content_type, body):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        if self.latency:
+            time.sleep(self.latency)
+        self.counts[parts.path] = self.counts.get(parts.path, 0) + 1
+
+        if parts.path == '/search':
+            query = params.get('q', '')
+            if 'nowhere' in query.lower():
+                return self._send(200, 'application/json', '[]')
+            # Deterministic point inside the Nakuru County bounding box used by parse_nominatim
+            digest = hashlib.sha1(query.encode('utf-8')).digest()
+            lat = -1.1 + 1.2 * digest[0] / 255
+            lon = 35.8 + 0.6 * digest[1] / 255
+            return self._send(200, 'application/json',
+                              json.dumps([{'lat': f'{lat:.6f}', 'lon': f'{lon:.6f}', 'display_name': query}]))
+
+        if parts.path == '/translate':
+            target = params.get('tl', 'en')
+            translated = '\n'.join(f'[{target}] {line}' for line in params.get('q', '').split('\n'))
+            return self._send(200, 'text/html; charset=utf-8',
+                              f'<html><body><div class="result-container">{html.escape(translated)}</div>'
+                              f'</body></html>')
+
+        self._send(404, 'text/plain', 'not found')
+
+
+class StubServices:
+    """Run the stub server in a background thread: with StubServices() as stubs: stubs.nominatim_url"""
+
+    def __init__(self, port=0, latency_ms=0):
+        handler = type('Handler', (StubHandler,), {'latency': latency_ms / 1000, 'counts': {}})
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+        self.server.daemon_threads = True
+        self.counts = handler.counts
+        base = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.nominatim_url = f'{base}/search'
+        self.translation_url = f'{base}/translate'
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8199)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    args = parser.parse_args()
+
+    with StubServices(args.port, args.latency_ms) as stubs:
+        print(f"NOMINATIM_URL={stubs.nominatim_url}\nTRANSLATION_SERVICE_URL={stubs.translation_url}", flush=True)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
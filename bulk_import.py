@@ -0,0 +1,278 @@
+"""
+Bulk import of historical incident records (legacy OB books, paper reports) from CSV or NDJSON.
+
+    python bulk_import.py records.csv [--source ob-2019] [--format csv|ndjson] [--batch-size 1000]
+        [--workers 4] [--status closed] [--geocode-online] [--checkpoint path] [--restart]
+
+Fields: category, description, manual_location, constituency and created_at (ISO date) are
+required, and the constituency must have a police station; id (the record's number in the
+source), lat, lon, status and language are optional.
+
+Each batch of records is
+  1. validated and cleaned; records without coordinates are located with the local gazetteer
+     (ai_analytics.NAKURU_LANDMARKS) and, with --geocode-online, Nominatim for the misses
+     (one request per distinct location)
+  2. language-detected and spam-scored in a process pool
+  3. inserted with one unordered insert_many
+and the imported reports are added to their hotspots in bulk once at the end, with $inc so the
+counts of reports coming in meanwhile are kept (database.count_imported_hotspots).
+
+Progress is logged and checkpointed to a JSON file after every batch; rerunning the same
+command resumes after the last checkpoint. Every report carries an import_key (source and
+record id, or record number) under a unique index (migration 5), so a batch inserted just
+before an interruption is skipped as duplicates on resume. Rejected records are written with
+their reason to <input>.rejects.ndjson. Imports go through the same DURABLE_WRITE as add_report.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+
+import bleach
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ('category', 'description', 'manual_location', 'constituency', 'created_at')
+# Same limits as the report form
+FIELD_LIMITS = {'category': 100, 'description': 2000, 'manual_location': 200, 'constituency': 100}
+STATUSES = ('pending', 'investigating', 'resolved', 'closed')
+LANGUAGES = {'en': 'English', 'sw': 'Kiswahili', 'ki': 'Kiswahili'}
+DEFAULT_LAT, DEFAULT_LON = -0.3031, 36.0800
+# Migration that creates the unique import_key index
+IMPORT_KEY_MIGRATION = 5
+
+
+def read_records(path, file_format):
+    """Yield (record number, record) from a CSV or NDJSON file; unparsable lines yield None"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if file_format == 'csv':
+            yield from enumerate(csv.DictReader(f), 1)
+            return
+        number = 0
+        for line in f:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                yield number, json.loads(line)
+            except ValueError:
+                yield number, None
+
+
+def _coordinate(value, low, high):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if low <= number <= high else None
+
+
+def normalize(number, record, source, default_status, constituencies):
+    """Validate and clean one record; returns (fields, None) or (None, reason)"""
+    if not isinstance(record, dict):
+        return None, 'not a JSON object'
+
+    fields = {key: bleach.clean(str(record.get(key) or '')[:limit]).strip() for key, limit in FIELD_LIMITS.items()}
+    missing = [key for key in REQUIRED_FIELDS if not (fields[key] if key in fields else record.get(key))]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+    if fields['constituency'] not in constituencies:
+        return None, f"no police station for constituency '{fields['constituency']}'"
+
+    try:
+        fields['created_at'] = datetime.fromisoformat(str(record['created_at']).strip())
+    except ValueError:
+        return None, 'created_at is not an ISO date'
+    if fields['created_at'].tzinfo is not None:
+        return None, 'created_at must be local time without a UTC offset'
+    if fields['created_at'] > datetime.now():
+        return None, 'created_at is in the future'
+
+    fields['status'] = str(record.get('status') or default_status).strip().lower()
+    if fields['status'] not in STATUSES:
+        return None, f"unknown status '{fields['status']}'"
+
+    language = str(record.get('language') or '').strip()
+    fields['language'] = language if language in LANGUAGES.values() else None
+
+    # Coordinates outside Kenya are treated as missing, as on the report form
+    fields['lat'] = _coordinate(record.get('lat'), -5, 5)
+    fields['lon'] = _coordinate(record.get('lon'), 33, 42)
+    if fields['lat'] is None or fields['lon'] is None:
+        fields['lat'] = fields['lon'] = None
+
+    fields['import_key'] = f"{source}:{record.get('id') or number}"
+    return fields, None
+
+
+def locate(fields, geocode_online, cache):
+    """Fill in missing coordinates; returns where they came from: source, gazetteer, nominatim or default"""
+    from ai_analytics import fuzzy_match_location, geocode_location
+
+    if fields['lat'] is not None:
+        return 'source'
+
+    coords, found_by = fuzzy_match_location(fields['manual_location']), 'gazetteer'
+    if not coords[0] and geocode_online:
+        key = (fields['manual_location'], fields['constituency'])
+        if key not in cache:
+            cache[key] = geocode_location(*key)
+        coords, found_by = cache[key], 'nominatim'
+
+    if coords[0]:
+        fields['lat'], fields['lon'] = coords
+        return found_by
+    fields['lat'], fields['lon'] = DEFAULT_LAT, DEFAULT_LON
+    return 'default'
+
+
+def score_record(settings, item):
+    """Language and spam score of one record; runs in the process pool"""
+    from ai_analytics import detect_spam
+    from language_detect import detect
+
+    data, location_found = item
+    language = data['language'] or LANGUAGES.get(detect(data['description']), 'English')
+    return language, detect_spam(dict(data, language=language), lambda: settings, location_found=location_found)
+
+
+def new_checkpoint(input_path, source):
+    return {
+        'input': os.path.abspath(input_path),
+        'source': source,
+        'records': 0,
+        'inserted': 0,
+        'duplicates': 0,
+        'rejected': 0,
+        'spam_flagged': 0,
+        'located': {'source': 0, 'gazetteer': 0, 'nominatim': 0, 'default': 0},
+        'constituencies': [],
+        'hotspots_counted': False,
+        'started_at': datetime.now().isoformat()
+    }
+
+
+def save_checkpoint(path, state):
+    state['updated_at'] = datetime.now().isoformat()
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def import_batch(batch, state, pool, settings, constituencies, args, geocode_cache, rejects):
+    """Clean, locate, score and insert one batch of (record number, record), updating the checkpoint state"""
+    from database import report_document, insert_reports_bulk
+
+    prepared, items = [], []
+    for number, record in batch:
+        fields, reason = normalize(number, record, args.source, args.status, constituencies)
+        if reason:
+            rejects.write(json.dumps({'record': number, 'reason': reason, 'data': record}, default=str) + '\n')
+            state['rejected'] += 1
+            continue
+        found_by = locate(fields, args.geocode_online, geocode_cache)
+        state['located'][found_by] += 1
+        prepared.append(fields)
+        items.append(({key: fields[key] for key in ('category', 'description', 'manual_location', 'constituency',
+                                                      'lat', 'lon', 'language')}, found_by != 'default'))
+
+    chunksize = max(1, len(items) // (args.workers * 4))
+    reports = []
+    for fields, (language, spam_result) in zip(prepared, pool.map(partial(score_record, settings), items,
+                                                                   chunksize=chunksize)):
+        report = report_document(fields['category'], fields['description'], fields['manual_location'],
+                                 fields['lat'], fields['lon'], fields['constituency'], language, None, spam_result)
+        report.update(status=fields['status'], created_at=fields['created_at'], updated_at=fields['created_at'],
+                      import_key=fields['import_key'], import_source=args.source, hotspot_pending=True)
+        reports.append(report)
+        state['spam_flagged'] += spam_result['is_spam']
+
+    if reports:
+        inserted, duplicates = insert_reports_bulk(reports)
+        state['inserted'] += inserted
+        state['duplicates'] += duplicates
+        state['hotspots_counted'] = False
+        state['constituencies'] = sorted(set(state['constituencies']) | {r['constituency'] for r in reports})
+    state['records'] = batch[-1][0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input')
+    parser.add_argument('--source', help='name of the source, part of every import_key; default the file name')
+    parser.add_argument('--format', choices=['csv', 'ndjson'], help='default from the file extension')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument('--status', choices=STATUSES, default='closed', help='status of records without one')
+    parser.add_argument('--geocode-online', action='store_true', help='ask Nominatim for gazetteer misses')
+    parser.add_argument('--checkpoint', help='default <input>.checkpoint.json')
+    parser.add_argument('--restart', action='store_true', help='ignore an existing checkpoint')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    args.source = args.source or os.path.basename(args.input)
+    file_format = args.format or ('ndjson' if args.input.endswith(('.ndjson', '.jsonl')) else 'csv')
+    checkpoint_path = args.checkpoint or args.input + '.checkpoint.json'
+
+    state = new_checkpoint(args.input, args.source)
+    if os.path.exists(checkpoint_path) and not args.restart:
+        with open(checkpoint_path) as f:
+            state = json.load(f)
+        if state['input'] != os.path.abspath(args.input) or state['source'] != args.source:
+            sys.exit(f"{checkpoint_path} belongs to another import; pass --checkpoint or --restart")
+        logger.info(f"Resuming after record {state['records']}")
+
+    from database import count_imported_hotspots, get_all_police_stations, get_system_settings
+    from db_connection import get_database
+    from migrations import pending_migrations
+
+    # Resuming relies on the unique import_key index to skip records already inserted
+    if any(version == IMPORT_KEY_MIGRATION for version, _, _ in pending_migrations(get_database())):
+        sys.exit(f"Migration {IMPORT_KEY_MIGRATION} (unique import_key index) is not applied; run python migrations.py")
+
+    settings = get_system_settings()
+    # Inactive stations included: historical records may predate a station's deactivation
+    constituencies = {station['constituency'] for station in get_all_police_stations()}
+    geocode_cache = {}
+    started, done_at_start = time.perf_counter(), state['records']
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool, \
+            open(args.input + '.rejects.ndjson', 'a') as rejects:
+        batch = []
+        for number, record in read_records(args.input, file_format):
+            if number <= state['records']:
+                continue
+            batch.append((number, record))
+            if len(batch) < args.batch_size:
+                continue
+            import_batch(batch, state, pool, settings, constituencies, args, geocode_cache, rejects)
+            batch = []
+            rejects.flush()
+            save_checkpoint(checkpoint_path, state)
+            rate = (state['records'] - done_at_start) / (time.perf_counter() - started)
+            logger.info(f"{state['records']} records ({rate:.0f}/s): {state['inserted']} inserted, "
+                        f"{state['duplicates']} already imported, {state['rejected']} rejected, "
+                        f"{state['spam_flagged']} flagged as spam")
+        if batch:
+            import_batch(batch, state, pool, settings, constituencies, args, geocode_cache, rejects)
+            save_checkpoint(checkpoint_path, state)
+
+    if state['constituencies'] and not state.get('hotspots_counted'):
+        logger.info(f"Counting the imported reports into the hotspots of {len(state['constituencies'])} constituencies")
+        state['hotspots'] = count_imported_hotspots(args.source)
+        state['hotspots_counted'] = True
+        save_checkpoint(checkpoint_path, state)
+
+    print(json.dumps(state, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+import argparse
+import csv
+import importlib.util
+import io
+import json
+import sys
+from datetime import datetime, timedelta
+
+# Streaming tabular exports: rows (dicts) come from a database cursor and leave as text or
+# Parquet chunks, so memory stays constant however many rows are exported. Used by the admin
+# export routes and, for reports, from the command line (main below).
+
+# Rows written per yielded chunk
+CHUNK_ROWS = 200
+
+# Rows per Parquet row group; one row group is held in memory at a time
+PARQUET_ROW_GROUP_SIZE = 10000
+
+# Columns of the analyst report export: (name, Parquet type)
+REPORT_EXPORT_FIELDS = [
+    ('id', 'string'),
+    ('created_at', 'timestamp'),
+    ('updated_at', 'timestamp'),
+    ('constituency', 'string'),
+    ('category', 'string'),
+    ('status', 'string'),
+    ('language', 'string'),
+    ('manual_location', 'string'),
+    ('description', 'string'),
+    ('lat', 'float'),
+    ('lon', 'float'),
+    ('spam_score', 'float'),
+    ('media_path', 'string'),
+    ('archived', 'bool'),
+    ('officer_name', 'string'),
+    ('action_taken', 'string'),
+    ('response_notes', 'string'),
+    ('response_status', 'string'),
+    ('responded_at', 'timestamp'),
+    ('response_hours', 'float'),
+]
+
+# Leading characters that make spreadsheet applications evaluate a cell as a formula
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_cell(value):
+    # Only text can be a formula; negative numbers such as latitudes stay numbers
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return _text(value)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def stream_csv(rows, fields):
+    """Yield a CSV header and then the rows, CHUNK_ROWS at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for count, row in enumerate(rows, 1):
+        writer.writerow([_csv_cell(row.get(field)) for field in fields])
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_ndjson(rows):
+    """Yield one JSON object per line, CHUNK_ROWS lines at a time"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, default=_json_default, ensure_ascii=False))
+        if len(lines) == CHUNK_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def parquet_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+class _ChunkSink:
+    """Write-only file object whose contents are taken out after each row group"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_parquet(rows, fields, row_group_size=PARQUET_ROW_GROUP_SIZE):
+    """Yield a Parquet file as bytes, one row group at a time (needs pyarrow)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {'string': pa.string(), 'timestamp': pa.timestamp('ms'), 'float': pa.float64(), 'bool': pa.bool_()}
+    schema = pa.schema([(name, types[kind]) for name, kind in fields])
+    names = [name for name, _ in fields]
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema, compression='zstd')
+    batch = []
+    for row in rows:
+        batch.append({name: row.get(name) for name in names})
+        if len(batch) == row_group_size:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            batch = []
+            yield sink.drain()
+    if batch:
+        writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+    writer.close()
+    yield sink.drain()
+
+
+def report_export_row(report, response):
+    """Flatten a report and its police response into one export row"""
+    response = response or {}
+    responded_at = response.get('created_at')
+    created_at = report.get('created_at')
+    hours = None
+    if responded_at and created_at:
+        hours = round((responded_at - created_at).total_seconds() / 3600, 2)
+    return {
+        'id': str(report['_id']),
+        'created_at': created_at,
+        'updated_at': report.get('updated_at'),
+        'constituency': report.get('constituency'),
+        'category': report.get('category'),
+        'status': report.get('status'),
+        'language': report.get('language'),
+        'manual_location': report.get('manual_location'),
+        'description': report.get('description'),
+        'lat': report.get('lat'),
+        'lon': report.get('lon'),
+        'spam_score': report.get('spam_score'),
+        'media_path': report.get('media_path'),
+        'archived': 'archived_at' in report,
+        'officer_name': response.get('officer_name'),
+        'action_taken': response.get('action_taken'),
+        'response_notes': response.get('notes'),
+        'response_status': response.get('status'),
+        'responded_at': responded_at,
+        'response_hours': hours,
+    }
+
+
+def stream_reports(export_format, constituency=None, category=None, status=None, start=None, end=None,
+                   include_archived=False):
+    """Chunks of the filtered reports, joined with their responses, in 'ndjson', 'csv' or 'parquet'"""
+    from database import iter_reports_for_analysts
+
+    rows = (report_export_row(report, response) for report, response in
+            iter_reports_for_analysts(constituency, category, status, start, end, include_archived))
+    if export_format == 'parquet':
+        return stream_parquet(rows, REPORT_EXPORT_FIELDS)
+    if export_format == 'csv':
+        return stream_csv(rows, [name for name, _ in REPORT_EXPORT_FIELDS])
+    return stream_ndjson(rows)
+
+
+def main():
+    """python data_export.py --format parquet --output reports.parquet [filters]"""
+    parser = argparse.ArgumentParser(description='Export reports joined with their police responses')
+    parser.add_argument('--format', choices=['ndjson', 'csv', 'parquet'], default='ndjson')
+    parser.add_argument('--output', help='file to write; default stdout')
+    parser.add_argument('--constituency')
+    parser.add_argument('--category')
+    parser.add_argument('--status')
+    parser.add_argument('--start', type=lambda value: datetime.strptime(value, '%Y-%m-%d'), help='YYYY-MM-DD')
+    parser.add_argument('--end', type=lambda value: datetime.strptime(value, '%Y-%m-%d'),
+                        help='YYYY-MM-DD, inclusive')
+    parser.add_argument('--include-archived', action='store_true')
+    args = parser.parse_args()
+
+    if args.format == 'parquet' and not parquet_available():
+        sys.exit('Parquet export needs pyarrow (pip install pyarrow)')
+
+    end = args.end + timedelta(days=1) if args.end else None
+    chunks = stream_reports(args.format, args.constituency, args.category, args.status, args.start, end,
+                            args.include_archived)
+    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            output.write(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,69 +1,71 @@
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo import ASCENDING
+from pymongo.read_preferences import SecondaryPreferred
+from pymongo.write_concern import WriteConcern
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
 import logging
-import os
-import urllib.parse
-import certifi
+import re
 
-logger = logging.getLogger(__name__)
-
-# MongoDB Connection with proper SSL/TLS handling for Render + MongoDB Atlas
-MONGO_URI = os.environ.get('MONGO_URI')
-
-if not MONGO_URI:
-    MONGO_URI = 'mongodb://127.0.0.1:27017/'
-    logger.warning("⚠️ Using local MongoDB. Set MONGO_URI environment variable for production.")
-
-try:
-    # CRITICAL: Use certifi for SSL certificate verification on Render
-    client = MongoClient(
-        MONGO_URI,
-        tlsCAFile=certifi.where(),  # This is the key fix!
-        serverSelectionTimeoutMS=5000,  # Reduced timeout
-        connectTimeoutMS=10000,
-        socketTimeoutMS=10000,
-        retryWrites=True,
-        w='majority'
-    )
-    
-    # Test the connection
-    client.admin.command('ping')
-    logger.info("✓ MongoDB connection successful")
-    
-except Exception as e:
-    logger.error(f"✗ MongoDB connection failed: {e}")
-    raise 
-    # Fallback to local MongoDB if Atlas connection fails
-    logger.warning("⚠️ Falling back to local MongoDB")
-    client = MongoClient('mongodb://127.0.0.1:27017/')
-
-db = client['safety_app']
-
-# Collections
-reports_col = db['reports']
-stations_col = db['police_stations']
-responses_col = db['responses']
-hotspots_col = db['hotspots']
-audit_logs_col = db['audit_logs']
-settings_col = db['system_settings']
-admin_col = db['admin_users']
+from instrumentation import timed
+from db_connection import LazyCollection, get_database, MONGO_ANALYTICS_MAX_STALENESS_SECONDS
 
+logger = logging.getLogger(__name__)
 
+# Collections. The MongoClient is created lazily in each process (see db_connection.py),
+# so importing this module neither connects nor shares a client across forks.
+reports_col = LazyCollection('reports')
+stations_col = LazyCollection('police_stations')
+responses_col = LazyCollection('responses')
+hotspots_col = LazyCollection('hotspots')
+# Time-series collection (timeField 'created_at', metaField 'meta'), created by migration 4
+audit_logs_col = LazyCollection('audit_events')
+settings_col = LazyCollection('system_settings')
+admin_col = LazyCollection('admin_users')
+translation_memory_col = LazyCollection('translation_memory')
+# Closed reports moved out of 'reports' by archive.py, each with its response embedded
+reports_archive_col = LazyCollection('reports_archive')
+
+# Write concern profiles. Collections use the client default (MONGO_WRITE_CONCERN, 'majority')
+# unless a call site below opts into the fast profile. Every write documents its choice.
+#   DURABLE_WRITE: citizen reports and police responses - must survive a primary failover
+#   FAST_WRITE:    audit entries, hotspot counters, settings, translation caches - acknowledged
+#                  by the primary only, since a rollback loses little and they are on hot paths
+DURABLE_WRITE = WriteConcern(w='majority')
+FAST_WRITE = WriteConcern(w=1)
+
+reports_durable = reports_col.with_options(write_concern=DURABLE_WRITE)
+responses_durable = responses_col.with_options(write_concern=DURABLE_WRITE)
+reports_fast = reports_col.with_options(write_concern=FAST_WRITE)
+hotspots_fast = hotspots_col.with_options(write_concern=FAST_WRITE)
+audit_logs_fast = audit_logs_col.with_options(write_concern=FAST_WRITE)
+settings_fast = settings_col.with_options(write_concern=FAST_WRITE)
+translation_memory_fast = translation_memory_col.with_options(write_concern=FAST_WRITE)
+
+# Read routing. Statistics, hotspot readers, audit log browsing and exports tolerate slightly stale
+# data, so they read from a secondary when one is within the staleness bound, keeping load off
+# the primary that takes citizen reports. Everything else, including the read-then-write paths
+# such as update_report_response and login checks, reads from the primary.
+ANALYTICS_READ = SecondaryPreferred(max_staleness=MONGO_ANALYTICS_MAX_STALENESS_SECONDS)
+
+reports_analytics = reports_col.with_options(read_preference=ANALYTICS_READ)
+stations_analytics = stations_col.with_options(read_preference=ANALYTICS_READ)
+hotspots_analytics = hotspots_col.with_options(read_preference=ANALYTICS_READ)
+audit_logs_analytics = audit_logs_col.with_options(read_preference=ANALYTICS_READ)
+reports_archive_analytics = reports_archive_col.with_options(read_preference=ANALYTICS_READ)
+
+
+@timed('db')
 def init_db():
-    """Initialize database with indexes and default data"""
+    """Seed default data and warn about pending index migrations"""
     try:
-        # Create indexes for fast queries
-        reports_col.create_index([('constituency', ASCENDING), ('created_at', DESCENDING)])
-        reports_col.create_index([('status', ASCENDING)])
-        reports_col.create_index([('spam_score', DESCENDING)])
-        stations_col.create_index([('constituency', ASCENDING)], unique=True)
-        stations_col.create_index([('username', ASCENDING)], unique=True)
-        responses_col.create_index([('report_id', ASCENDING)])
-        hotspots_col.create_index([('constituency', ASCENDING)])
-        hotspots_col.create_index([('incident_count', DESCENDING)])
-        audit_logs_col.create_index([('created_at', DESCENDING)])
+        # Indexes are created out-of-band by migrations.py, once per deployment
+        from migrations import pending_migrations
+
+        pending = [version for version, _, _ in pending_migrations(get_database())]
+        if pending:
+            logger.warning(f"⚠ Index migrations {pending} are pending; run 'python migrations.py'")
 
+        # Seed documents use the default write concern (majority)
         # Default settings - Only English and Kiswahili
         if settings_col.count_documents({}) == 0:
             settings_col.insert_one({
@@ -94,43 +96,52 @@ def init_db():
 
 
 # REPORT FUNCTIONS
-def add_report(category, description, manual_location, lat, lon, constituency, language, media_path, spam_result):
+# Documents and updates are built here once and shared with the async path (async_database.py)
+def report_document(category, description, manual_location, lat, lon, constituency, language, media_path,
+                    spam_result, media=None):
+    """Build a new report document"""
+    return {
+        'category': category,
+        'description': description,
+        'manual_location': manual_location,
+        'lat': float(lat),
+        'lon': float(lon),
+        'constituency': constituency,
+        'language': language,
+        'media_path': media_path,
+        'media': {k: media[k] for k in ('sha256', 'size', 'mime')} if media else None,
+        'spam_score': spam_result['spam_score'],
+        'spam_reasons': spam_result.get('reasons', []),
+        'status': 'pending',
+        'created_at': datetime.now(),
+        'updated_at': datetime.now()
+    }
+
+
+def hotspot_increment(constituency, manual_location, lat, lon):
+    """Return the (filter, update) upsert that counts one incident at a location"""
+    return (
+        {'constituency': constituency, 'location': manual_location},
+        {
+            '$inc': {'incident_count': 1},
+            '$set': {'last_incident': datetime.now()},
+            '$setOnInsert': {'lat': float(lat), 'lon': float(lon), 'created_at': datetime.now()}
+        }
+    )
+
+
+@timed('db')
+def add_report(category, description, manual_location, lat, lon, constituency, language, media_path, spam_result,
+               media=None):
     """Create new incident report"""
     try:
-        report = {
-            'category': category,
-            'description': description,
-            'manual_location': manual_location,
-            'lat': float(lat),
-            'lon': float(lon),
-            'constituency': constituency,
-            'language': language,
-            'media_path': media_path,
-            'spam_score': spam_result['spam_score'],
-            'spam_reasons': spam_result.get('reasons', []),
-            'status': 'pending',
-            'created_at': datetime.now(),
-            'updated_at': datetime.now()
-        }
-        result = reports_col.insert_one(report)
-
-        # Update hotspot
-        hotspot = hotspots_col.find_one({'constituency': constituency, 'location': manual_location})
-        if hotspot:
-            hotspots_col.update_one(
-                {'_id': hotspot['_id']},
-                {'$inc': {'incident_count': 1}, '$set': {'last_incident': datetime.now()}}
-            )
-        else:
-            hotspots_col.insert_one({
-                'constituency': constituency,
-                'location': manual_location,
-                'lat': float(lat),
-                'lon': float(lon),
-                'incident_count': 1,
-                'last_incident': datetime.now(),
-                'created_at': datetime.now()
-            })
+        report = report_document(category, description, manual_location, lat, lon, constituency, language,
+                                 media_path, spam_result, media)
+        # Durable: the citizen's report is the record of the incident
+        result = reports_durable.insert_one(report)
+
+        # Fast: hotspot counters are derived data; one upsert replaces find + update/insert
+        hotspots_fast.update_one(*hotspot_increment(constituency, manual_location, lat, lon), upsert=True)
 
         return result.inserted_id
     except Exception as e:
@@ -138,6 +149,153 @@ def add_report(category, description, manual_location, lat, lon, constituency, l
         raise
 
 
+@timed('db')
+def insert_reports_bulk(reports):
+    """Insert report documents in one unordered batch; returns (inserted, duplicates).
+
+    Documents whose import_key is already stored (a resumed import) are skipped as duplicates.
+    """
+    from pymongo.errors import BulkWriteError
+
+    try:
+        # Durable, like add_report: imported records are the record of the incidents
+        return len(reports_durable.insert_many(reports, ordered=False).inserted_ids), 0
+    except BulkWriteError as e:
+        errors = e.details.get('writeErrors', [])
+        if any(error.get('code') != 11000 for error in errors):
+            raise
+        return e.details.get('nInserted', 0), len(errors)
+
+
+@timed('db')
+def count_imported_hotspots(source, batch_size=1000):
+    """Add the imported reports of a source not yet counted (hotspot_pending) to their hotspots.
+
+    Reads the primary, right after the import's inserts, and applies the counts with $inc, so
+    increments made meanwhile by add_report are kept. The marker is removed once the counts are
+    written; an interruption between the two counts those reports twice when rerun.
+    """
+    from pymongo import UpdateOne
+
+    match = {'$match': {'import_source': source, 'hotspot_pending': True}}
+    pipeline = [
+        match,
+        {'$unionWith': {'coll': 'reports_archive', 'pipeline': [match]}},
+        {'$group': {
+            '_id': {'constituency': '$constituency', 'location': '$manual_location'},
+            'incident_count': {'$sum': 1},
+            'last_incident': {'$max': '$created_at'},
+            'first_incident': {'$min': '$created_at'},
+            'lat': {'$first': '$lat'},
+            'lon': {'$first': '$lon'},
+        }},
+    ]
+    updated, batch = 0, []
+    for row in reports_col.aggregate(pipeline, allowDiskUse=True):
+        batch.append(UpdateOne(
+            {'constituency': row['_id']['constituency'], 'location': row['_id']['location']},
+            {
+                '$inc': {'incident_count': row['incident_count']},
+                '$max': {'last_incident': row['last_incident']},
+                '$setOnInsert': {'lat': row['lat'], 'lon': row['lon'], 'created_at': row['first_incident']}
+            },
+            upsert=True
+        ))
+        if len(batch) == batch_size:
+            # Fast: hotspot counters are derived data
+            hotspots_fast.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+    if batch:
+        hotspots_fast.bulk_write(batch, ordered=False)
+        updated += len(batch)
+
+    # Fast: losing the unset only matters if the import is rerun
+    for collection in (reports_fast, reports_archive_col.with_options(write_concern=FAST_WRITE)):
+        collection.update_many({'import_source': source, 'hotspot_pending': True}, {'$unset': {'hotspot_pending': ''}})
+    return updated
+
+
+@timed('db')
+def save_report_translation(report_id, lang, translated):
+    """Store the translation of a report's text fields into one language"""
+    try:
+        # Fast: a lost translation is recomputed on demand
+        reports_fast.update_one(
+            {'_id': report_id},
+            {'$set': {f'translations.{lang}': translated}}
+        )
+    except Exception as e:
+        logger.error(f"Error saving report translation: {e}")
+
+
+# Short tracking IDs (last 8 hex digits) are matched against this many of the newest reports
+TRACKING_SCAN_LIMIT = 100
+
+
+@timed('db')
+def find_report_for_tracking(report_id):
+    """Find a report by its full ObjectId or its short tracking ID"""
+    from bson.objectid import ObjectId
+
+    if len(report_id) == 24:
+        try:
+            report = reports_col.find_one({'_id': ObjectId(report_id)}) or \
+                reports_archive_col.find_one({'_id': ObjectId(report_id)})
+            if report:
+                return report
+        except Exception:
+            pass
+
+    for report in reports_col.find({}).sort('created_at', -1).limit(TRACKING_SCAN_LIMIT):
+        if str(report['_id'])[-8:] == report_id:
+            return report
+    return None
+
+
+@timed('db')
+def get_report(report_id):
+    """Get a report by its full ObjectId string, reading through to the archive"""
+    from bson.objectid import ObjectId
+
+    return reports_col.find_one({'_id': ObjectId(report_id)}) or \
+        reports_archive_col.find_one({'_id': ObjectId(report_id)})
+
+
+@timed('db')
+def get_response_for_report(report):
+    """Get the police response to a report, if any; archived reports carry theirs"""
+    if 'archived_at' in report:
+        return report.get('response')
+    return responses_col.find_one({'report_id': report['_id']})
+
+
+@timed('db')
+def get_referenced_media():
+    """Names of the stored media files that live or archived reports refer to"""
+    # Primary: a file referenced by a report just written must not look orphaned. An aggregation
+    # rather than distinct(), whose single result document is capped at 16 MB.
+    pipeline = [{'$match': {'media_path': {'$type': 'string'}}}, {'$group': {'_id': '$media_path'}}]
+    return {row['_id'] for collection in (reports_col, reports_archive_col)
+            for row in collection.aggregate(pipeline, allowDiskUse=True)}
+
+
+def tracking_summary(report, response):
+    """Public view of a report and its police response for citizen tracking"""
+    return {
+        'short_id': str(report['_id'])[-8:],
+        'category': report.get('category', 'N/A'),
+        'manual_location': report.get('manual_location', 'N/A'),
+        'constituency': report.get('constituency', 'N/A'),
+        'status': report.get('status', 'pending'),
+        'created_at': report.get('created_at', datetime.now()).isoformat(),
+        'officer_name': response.get('officer_name') if response else None,
+        'action_taken': response.get('action_taken') if response else None,
+        'notes': response.get('notes') if response else None
+    }
+
+
+@timed('db')
 def get_reports_for_station(constituency):
     """Get all reports with response data"""
     try:
@@ -164,6 +322,83 @@ def get_reports_for_station(constituency):
         return []
 
 
+def _report_export_query(constituency, start_date=None, end_date=None, status=None):
+    """Build the reports filter shared by the export functions"""
+    query = {'constituency': constituency}
+    if start_date or end_date:
+        query['created_at'] = {}
+        if start_date:
+            query['created_at']['$gte'] = start_date
+        if end_date:
+            query['created_at']['$lt'] = end_date
+    if status:
+        query['status'] = status
+    return query
+
+
+@timed('db')
+def count_reports_for_export(constituency, start_date=None, end_date=None, status=None):
+    """Count reports matching an export filter"""
+    try:
+        return reports_analytics.count_documents(_report_export_query(constituency, start_date, end_date, status))
+    except Exception as e:
+        logger.error(f"Error counting reports for export: {e}")
+        return 0
+
+
+def iter_reports_for_export(constituency, start_date=None, end_date=None, status=None, batch_size=50, limit=None):
+    """Yield (report, response) pairs for an export filter without loading them all into memory"""
+    pipeline = [
+        {'$match': _report_export_query(constituency, start_date, end_date, status)},
+        {'$sort': {'created_at': 1}},
+    ]
+    if limit:
+        pipeline.append({'$limit': limit})
+    pipeline.append(
+        {'$lookup': {'from': 'responses', 'localField': '_id', 'foreignField': 'report_id', 'as': 'response'}})
+    for report in reports_analytics.aggregate(pipeline, batchSize=batch_size):
+        responses = report.pop('response', [])
+        yield report, (responses[0] if responses else None)
+
+
+def analyst_report_query(constituency=None, category=None, status=None, start=None, end=None):
+    """Build the reports filter of the analyst export; every criterion is optional"""
+    query = {}
+    if constituency:
+        query['constituency'] = constituency
+    if category:
+        query['category'] = category
+    if status:
+        query['status'] = status
+    if start or end:
+        query['created_at'] = {}
+        if start:
+            query['created_at']['$gte'] = start
+        if end:
+            query['created_at']['$lt'] = end
+    return query
+
+
+def iter_reports_for_analysts(constituency=None, category=None, status=None, start=None, end=None,
+                              include_archived=False, batch_size=1000):
+    """Yield (report, response) pairs for the analyst export, oldest first, one batch in memory at a time"""
+    query = analyst_report_query(constituency, category, status, start, end)
+    if include_archived:
+        # Archived reports are older than the live ones and carry their response
+        for report in reports_archive_analytics.find(query).sort('created_at', 1).batch_size(batch_size):
+            yield report, report.get('response')
+
+    pipeline = [
+        {'$match': query},
+        {'$sort': {'created_at': 1}},
+        {'$lookup': {'from': 'responses', 'localField': '_id', 'foreignField': 'report_id', 'as': 'response'}},
+    ]
+    for report in reports_analytics.aggregate(pipeline, batchSize=batch_size, allowDiskUse=True):
+        responses = report.pop('response', [])
+        yield report, (responses[0] if responses else None)
+
+
+@timed('db')
 def update_report_response(report_id, constituency, officer_name, notes, status, action_taken):
     """Update report with police response"""
     try:
@@ -177,14 +412,14 @@ def update_report_response(report_id, constituency, officer_name, notes, status,
         if not station:
             raise ValueError(f"No active station found for {constituency}")
 
-        # Update report status
-        reports_col.update_one(
+        # Update report status (durable: part of the police response)
+        reports_durable.update_one(
             {'_id': ObjectId(report_id)},
             {'$set': {'status': status, 'updated_at': datetime.now()}}
         )
 
-        # Add or update response
-        responses_col.update_one(
+        # Add or update response (durable)
+        responses_durable.update_one(
             {'report_id': ObjectId(report_id)},
             {'$set': {
                 'report_id': ObjectId(report_id),
@@ -203,11 +438,12 @@ def update_report_response(report_id, constituency, officer_name, notes, status,
 
 
 # HOTSPOT FUNCTIONS
+@timed('db')
 def get_hotspots_for_station(constituency):
     """Get crime hotspots for a constituency"""
     try:
         hotspots = list(
-            hotspots_col.find({'constituency': constituency})
+            hotspots_analytics.find({'constituency': constituency})
             .sort([('incident_count', -1), ('last_incident', -1)])
             .limit(100)
         )
@@ -220,6 +456,7 @@ def get_hotspots_for_station(constituency):
 
 
 # POLICE STATION FUNCTIONS
+@timed('db')
 def get_all_constituencies():
     """Get list of all active constituencies"""
     try:
@@ -230,12 +467,14 @@ def get_all_constituencies():
         return []
 
 
+@timed('db')
 def add_police_station(constituency, username, password, preferred_language, contact_phone, contact_email):
     """Add new police station - Only English or Kiswahili"""
     try:
         if preferred_language not in ['English', 'Kiswahili']:
             preferred_language = 'English'
 
+        # Default write concern (majority): station accounts and credentials
         stations_col.insert_one({
             'constituency': constituency,
             'username': username,
@@ -252,6 +491,7 @@ def add_police_station(constituency, username, password, preferred_language, con
         raise
 
 
+@timed('db')
 def update_police_station(station_id, constituency, username, password_hash, preferred_language, contact_phone,
                           contact_email):
     """Update police station details"""
@@ -273,12 +513,14 @@ def update_police_station(station_id, constituency, username, password_hash, pre
         if password_hash:
             update_data['password_hash'] = password_hash
 
+        # Default write concern (majority): station accounts and credentials
         stations_col.update_one({'_id': ObjectId(station_id)}, {'$set': update_data})
     except Exception as e:
         logger.error(f"Error updating police station: {e}")
         raise
 
 
+@timed('db')
 def verify_police_credentials(username, password):
     """Verify police login"""
     try:
@@ -294,6 +536,7 @@ def verify_police_credentials(username, password):
         return None
 
 
+@timed('db')
 def get_all_police_stations():
     """Get all police stations"""
     try:
@@ -306,10 +549,12 @@ def get_all_police_stations():
         return []
 
 
+@timed('db')
 def deactivate_police_station(station_id):
     """Deactivate station"""
     try:
         from bson.objectid import ObjectId
+        # Default write concern (majority): controls whether a station can log in
         stations_col.update_one(
             {'_id': ObjectId(station_id)},
             {'$set': {'is_active': False, 'updated_at': datetime.now()}}
@@ -319,10 +564,12 @@ def deactivate_police_station(station_id):
         raise
 
 
+@timed('db')
 def activate_police_station(station_id):
     """Activate station"""
     try:
         from bson.objectid import ObjectId
+        # Default write concern (majority): controls whether a station can log in
         stations_col.update_one(
             {'_id': ObjectId(station_id)},
             {'$set': {'is_active': True, 'updated_at': datetime.now()}}
@@ -333,6 +580,7 @@ def activate_police_station(station_id):
 
 
 # ADMIN FUNCTIONS
+@timed('db')
 def verify_admin_credentials(username, password):
     """Verify admin login"""
     try:
@@ -346,40 +594,44 @@ def verify_admin_credentials(username, password):
 
 
 # SETTINGS FUNCTIONS
+DEFAULT_SETTINGS = {
+    'categories': ['Theft', 'Assault', 'Vandalism', 'Drug Activity', 'Traffic Violation', 'Robbery', 'Other'],
+    'spam_threshold': 60,
+    'auto_reject_threshold': 80,
+    'critical_density_threshold': 10,
+    'high_density_threshold': 6,
+    'medium_density_threshold': 3,
+    'trend_time_window': 7,
+    'emergency_number': '0725646760'
+}
+
+
+def settings_from_document(settings):
+    """Fill a stored settings document (or None) with defaults"""
+    if not settings:
+        return dict(DEFAULT_SETTINGS, categories=list(DEFAULT_SETTINGS['categories']))
+    return {
+        'categories': settings.get('categories', []),
+        **{key: settings.get(key, default) for key, default in DEFAULT_SETTINGS.items() if key != 'categories'}
+    }
+
+
+@timed('db')
 def get_system_settings():
     """Get current system settings"""
     try:
-        settings = settings_col.find_one({})
-        if settings:
-            return {
-                'categories': settings.get('categories', []),
-                'spam_threshold': settings.get('spam_threshold', 60),
-                'auto_reject_threshold': settings.get('auto_reject_threshold', 80),
-                'critical_density_threshold': settings.get('critical_density_threshold', 10),
-                'high_density_threshold': settings.get('high_density_threshold', 6),
-                'medium_density_threshold': settings.get('medium_density_threshold', 3),
-                'trend_time_window': settings.get('trend_time_window', 7),
-                'emergency_number': settings.get('emergency_number', '0725646760')
-            }
-        return {
-            'categories': ['Theft', 'Assault', 'Vandalism', 'Drug Activity', 'Traffic Violation', 'Robbery', 'Other'],
-            'spam_threshold': 60,
-            'auto_reject_threshold': 80,
-            'critical_density_threshold': 10,
-            'high_density_threshold': 6,
-            'medium_density_threshold': 3,
-            'trend_time_window': 7,
-            'emergency_number': '0725646760'
-        }
+        return settings_from_document(settings_col.find_one({}))
     except Exception as e:
         logger.error(f"Error getting system settings: {e}")
         return {}
 
 
+@timed('db')
 def update_system_settings(categories, spam_threshold, auto_reject_threshold):
     """Update system settings"""
     try:
-        settings_col.update_one(
+        # Fast: settings are small, rarely changed and re-applied by saving again
+        settings_fast.update_one(
             {},
             {'$set': {
                 'categories': categories,
@@ -395,28 +647,37 @@ def update_system_settings(categories, spam_threshold, auto_reject_threshold):
 
 
 # STATISTICS FUNCTIONS
+def response_time_pipeline(match):
+    """Aggregation for the average hours between a report and its police response"""
+    return [
+        {'$match': match},
+        {'$lookup': {'from': 'responses', 'localField': '_id', 'foreignField': 'report_id', 'as': 'response'}},
+        {'$unwind': '$response'},
+        {'$project': {'response_time': {'$divide': [{'$subtract': ['$response.created_at', '$created_at']}, 3600000]}}},
+        {'$group': {'_id': None, 'avg_response_time': {'$avg': '$response_time'}}}
+    ]
+
+
+@timed('db')
 def get_constituency_statistics(constituency):
     """Get statistics for specific constituency"""
     try:
-        total_reports = reports_col.count_documents({'constituency': constituency})
-        pending_reports = reports_col.count_documents({'constituency': constituency, 'status': 'pending'})
-        resolved_reports = reports_col.count_documents(
-            {'constituency': constituency, 'status': {'$in': ['resolved', 'closed']}})
+        # Archived reports are all closed, so they count as resolved
+        archived_reports = reports_archive_analytics.count_documents({'constituency': constituency})
+        total_reports = reports_analytics.count_documents({'constituency': constituency}) + archived_reports
+        pending_reports = reports_analytics.count_documents({'constituency': constituency, 'status': 'pending'})
+        resolved_reports = reports_analytics.count_documents(
+            {'constituency': constituency, 'status': {'$in': ['resolved', 'closed']}}) + archived_reports
 
         yesterday = datetime.now() - timedelta(days=1)
-        recent_reports = reports_col.count_documents({'constituency': constituency, 'created_at': {'$gte': yesterday}})
+        recent_reports = reports_analytics.count_documents(
+            {'constituency': constituency, 'created_at': {'$gte': yesterday}})
 
         # Average response time (in hours)
         thirty_days_ago = datetime.now() - timedelta(days=30)
-        pipeline = [
-            {'$match': {'constituency': constituency, 'created_at': {'$gte': thirty_days_ago}}},
-            {'$lookup': {'from': 'responses', 'localField': '_id', 'foreignField': 'report_id', 'as': 'response'}},
-            {'$unwind': '$response'},
-            {'$project': {'response_time': {'$divide': [{'$subtract': ['$response.created_at', '$created_at']}, 3600000]}}},
-            {'$group': {'_id': None, 'avg_response_time': {'$avg': '$response_time'}}}
-        ]
-
-        result = list(reports_col.aggregate(pipeline))
+        pipeline = response_time_pipeline({'constituency': constituency, 'created_at': {'$gte': thirty_days_ago}})
+
+        result = list(reports_analytics.aggregate(pipeline))
         avg_response = round(result[0]['avg_response_time'], 2) if result else 0
 
         return {
@@ -437,93 +698,216 @@ def get_constituency_statistics(constituency):
         }
 
 
+def system_statistics_counts():
+    """Return {name: (collection name, filter)} for the counts behind the system statistics"""
+    yesterday = datetime.now() - timedelta(days=1)
+    today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return {
+        'total_reports': ('reports', {}),
+        'archived_reports': ('reports_archive', {}),
+        'pending_reports': ('reports', {'status': 'pending'}),
+        'resolved_reports': ('reports', {'status': {'$in': ['resolved', 'closed']}}),
+        'active_stations': ('police_stations', {'is_active': True}),
+        'recent_reports': ('reports', {'created_at': {'$gte': yesterday}}),
+        # Spam detection statistics
+        'spam_detected': ('reports', {'spam_score': {'$gte': 60}}),
+        'reports_today': ('reports', {'created_at': {'$gte': today_start}}),
+    }
+
+
+def system_statistics_pipeline():
+    """Average response time over the last thirty days"""
+    return response_time_pipeline({'created_at': {'$gte': datetime.now() - timedelta(days=30)}})
+
+
+def system_statistics_from(counts, response_rows):
+    """Combine the counts and the response time aggregation result into the statistics dict"""
+    avg_response = round(response_rows[0]['avg_response_time'], 2) if response_rows else 0
+
+    # Archived reports are all closed, so they count as resolved
+    total_reports = counts['total_reports'] + counts['archived_reports']
+    resolved_reports = counts['resolved_reports'] + counts['archived_reports']
+
+    # Resolution rate
+    if total_reports > 0:
+        resolution_rate = round((resolved_reports / total_reports) * 100, 1)
+    else:
+        resolution_rate = 0
+
+    return {
+        'total_reports': total_reports,
+        'pending_reports': counts['pending_reports'],
+        'resolved_reports': resolved_reports,
+        'active_stations': counts['active_stations'],
+        'recent_reports': counts['recent_reports'],
+        'avg_response_time': avg_response,
+        'spam_detected': counts['spam_detected'],
+        'resolution_rate': resolution_rate,
+        'reports_today': counts['reports_today']
+    }
+
+
+EMPTY_SYSTEM_STATISTICS = {
+    'total_reports': 0,
+    'pending_reports': 0,
+    'resolved_reports': 0,
+    'active_stations': 0,
+    'recent_reports': 0,
+    'avg_response_time': 0,
+    'spam_detected': 0,
+    'resolution_rate': 0,
+    'reports_today': 0
+}
+
+
+@timed('db')
 def get_system_statistics():
     """Get system-wide statistics"""
     try:
-        total_reports = reports_col.count_documents({})
-        pending_reports = reports_col.count_documents({'status': 'pending'})
-        resolved_reports = reports_col.count_documents({'status': {'$in': ['resolved', 'closed']}})
-        active_stations = stations_col.count_documents({'is_active': True})
-
-        yesterday = datetime.now() - timedelta(days=1)
-        recent_reports = reports_col.count_documents({'created_at': {'$gte': yesterday}})
-
-        # Spam detection statistics
-        spam_detected = reports_col.count_documents({'spam_score': {'$gte': 60}})
-
-        # Average response time
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        pipeline = [
-            {'$match': {'created_at': {'$gte': thirty_days_ago}}},
-            {'$lookup': {'from': 'responses', 'localField': '_id', 'foreignField': 'report_id', 'as': 'response'}},
-            {'$unwind': '$response'},
-            {'$project': {'response_time': {'$divide': [{'$subtract': ['$response.created_at', '$created_at']}, 3600000]}}},
-            {'$group': {'_id': None, 'avg_response_time': {'$avg': '$response_time'}}}
-        ]
-
-        result = list(reports_col.aggregate(pipeline))
-        avg_response = round(result[0]['avg_response_time'], 2) if result else 0
-
-        # Resolution rate
-        if total_reports > 0:
-            resolution_rate = round((resolved_reports / total_reports) * 100, 1)
-        else:
-            resolution_rate = 0
-
-        # Reports today
-        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        reports_today = reports_col.count_documents({'created_at': {'$gte': today_start}})
-
-        return {
-            'total_reports': total_reports,
-            'pending_reports': pending_reports,
-            'resolved_reports': resolved_reports,
-            'active_stations': active_stations,
-            'recent_reports': recent_reports,
-            'avg_response_time': avg_response,
-            'spam_detected': spam_detected,
-            'resolution_rate': resolution_rate,
-            'reports_today': reports_today
-        }
+        collections = {'reports': reports_analytics, 'reports_archive': reports_archive_analytics,
+                       'police_stations': stations_analytics}
+        counts = {name: collections[collection].count_documents(query)
+                  for name, (collection, query) in system_statistics_counts().items()}
+        response_rows = list(reports_analytics.aggregate(system_statistics_pipeline()))
+        return system_statistics_from(counts, response_rows)
     except Exception as e:
         logger.error(f"Error getting system statistics: {e}")
-        return {
-            'total_reports': 0,
-            'pending_reports': 0,
-            'resolved_reports': 0,
-            'active_stations': 0,
-            'recent_reports': 0,
-            'avg_response_time': 0,
-            'spam_detected': 0,
-            'resolution_rate': 0,
-            'reports_today': 0
-        }
+        return dict(EMPTY_SYSTEM_STATISTICS)
 
 
 # AUDIT LOG FUNCTIONS
+def audit_log_document(user_type, username, action, details=None, ip_address=None):
+    """Build an audit log entry; who acted is the time-series metaField"""
+    return {
+        'meta': {'user_type': user_type, 'username': username},
+        'action': action,
+        'details': details,
+        'ip_address': ip_address,
+        'created_at': datetime.now()
+    }
+
+
+def audit_log_row(log):
+    """Flatten a stored audit log entry for display and export"""
+    meta = log.get('meta') or {}
+    return {
+        'id': str(log['_id']),
+        'user_type': meta.get('user_type'),
+        'username': meta.get('username'),
+        'action': log.get('action'),
+        'details': log.get('details'),
+        'ip_address': log.get('ip_address'),
+        'created_at': log.get('created_at')
+    }
+
+
+def audit_log_query(user_type=None, username=None, action=None, start=None, end=None):
+    """Build the audit log filter shared by browsing and export"""
+    query = {}
+    if user_type:
+        query['meta.user_type'] = user_type
+    if username:
+        query['meta.username'] = username
+    if action:
+        query['action'] = {'$regex': re.escape(action), '$options': 'i'}
+    if start or end:
+        query['created_at'] = {}
+        if start:
+            query['created_at']['$gte'] = start
+        if end:
+            query['created_at']['$lt'] = end
+    return query
+
+
+# Newest first; _id is not a second key, which would force a blocking sort of every matching entry
+AUDIT_LOG_SORT = [('created_at', -1)]
+
+
+def audit_log_cursor(rows, cursor=None):
+    """Keyset pagination token for the page after these rows (newest first): the last row's time
+    and the IDs of the rows shown at that time, which the next page skips"""
+    last = rows[-1]['created_at']
+    ids = [row['id'] for row in rows if row['created_at'] == last]
+    if cursor:
+        # More rows than a page share this time: keep skipping the ones shown before
+        stamp, seen = cursor.split('_', 1)
+        if datetime.fromisoformat(stamp) == last:
+            ids = seen.split('.') + ids
+    return f"{last.isoformat()}_{'.'.join(ids)}"
+
+
+def audit_log_page_query(cursor=None, **filters):
+    """The audit log filter of one page; sorted on created_at alone (AUDIT_LOG_SORT) so the
+    created_at indexes return it in order without a blocking sort"""
+    from bson.objectid import ObjectId
+
+    query = audit_log_query(**filters)
+    if not cursor:
+        return query
+    # Entries logged in the same millisecond as the boundary are kept unless already shown
+    stamp, seen = cursor.split('_', 1)
+    return {'$and': [query, {
+        'created_at': {'$lte': datetime.fromisoformat(stamp)},
+        '_id': {'$nin': [ObjectId(log_id) for log_id in seen.split('.')]}
+    }]}
+
+
+@timed('db')
 def add_audit_log(user_type, username, action, details=None, ip_address=None):
     """Add audit log entry"""
     try:
-        audit_logs_col.insert_one({
-            'user_type': user_type,
-            'username': username,
-            'action': action,
-            'details': details,
-            'ip_address': ip_address,
-            'created_at': datetime.now()
-        })
+        # Fast: written on every login, logout and report
+        audit_logs_fast.insert_one(audit_log_document(user_type, username, action, details, ip_address))
     except Exception as e:
         logger.error(f"Failed to add audit log: {e}")
 
 
-def get_audit_logs(limit=100, user_type=None):
-    """Get audit logs with optional filtering"""
+@timed('db')
+def get_audit_logs(limit=100, user_type=None, username=None, action=None, start=None, end=None, cursor=None):
+    """Get one page of audit logs, newest first; pass audit_log_cursor of the page for the next one"""
     try:
-        query = {'user_type': user_type} if user_type else {}
-        logs = list(audit_logs_col.find(query).sort('created_at', -1).limit(limit))
-        for log in logs:
-            log['id'] = str(log['_id'])
-        return logs
+        query = audit_log_page_query(cursor, user_type=user_type, username=username, action=action, start=start,
+                                     end=end)
+        logs = audit_logs_analytics.find(query).sort(AUDIT_LOG_SORT).limit(limit)
+        return [audit_log_row(log) for log in logs]
     except Exception as e:
         logger.error(f"Error getting audit logs: {e}")
         return []
+
+
+def iter_audit_logs(user_type=None, username=None, action=None, start=None, end=None, batch_size=1000):
+    """Yield matching audit log rows oldest first, one cursor batch in memory at a time"""
+    query = audit_log_query(user_type, username, action, start, end)
+    for log in audit_logs_analytics.find(query).sort('created_at', 1).batch_size(batch_size):
+        yield audit_log_row(log)
+
+
+# TRANSLATION MEMORY FUNCTIONS
+@timed('db')
+def get_translation_memory(text_hash, src, dest):
+    """Look up a stored translation by normalized text hash and language pair"""
+    try:
+        entry = translation_memory_col.find_one({'text_hash': text_hash, 'src': src, 'dest': dest},
+                                                {'translation': 1})
+        return entry['translation'] if entry else None
+    except Exception as e:
+        logger.error(f"Error reading translation memory: {e}")
+        return None
+
+
+@timed('db')
+def save_translation_memory(text_hash, src, dest, text, translation):
+    """Store a translation so it is only paid for once across all workers"""
+    try:
+        # Fast: a lost entry only costs one more translation
+        translation_memory_fast.update_one(
+            {'text_hash': text_hash, 'src': src, 'dest': dest},
+            {'$setOnInsert': {
+                'text': text,
+                'translation': translation,
+                'created_at': datetime.now()
+            }},
+            upsert=True
+        )
+    except Exception as e:
+        logger.error(f"Error saving translation memory: {e}")
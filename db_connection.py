@@ -0,0 +1,229 @@
+import logging
+import os
+import threading
+
+import certifi
+from pymongo import MongoClient, monitoring
+
+from query_monitor import command_monitor
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+# MongoDB connection settings, all overridable through the environment
+MONGO_URI = os.environ.get('MONGO_URI')
+MONGO_DB_NAME = os.environ.get('MONGO_DB_NAME', 'safety_app')
+
+MONGO_SETTINGS = {
+    'maxPoolSize': _env_int('MONGO_MAX_POOL_SIZE', 50),
+    'minPoolSize': _env_int('MONGO_MIN_POOL_SIZE', 0),
+    'maxIdleTimeMS': _env_int('MONGO_MAX_IDLE_TIME_MS', 300000),
+    'waitQueueTimeoutMS': _env_int('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000),
+    'serverSelectionTimeoutMS': _env_int('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000),
+    'connectTimeoutMS': _env_int('MONGO_CONNECT_TIMEOUT_MS', 10000),
+    'socketTimeoutMS': _env_int('MONGO_SOCKET_TIMEOUT_MS', 10000),
+}
+
+# Default write and read concerns for every collection
+MONGO_WRITE_CONCERN = os.environ.get('MONGO_WRITE_CONCERN', 'majority')
+if MONGO_WRITE_CONCERN.isdigit():
+    MONGO_WRITE_CONCERN = int(MONGO_WRITE_CONCERN)
+MONGO_READ_CONCERN = os.environ.get('MONGO_READ_CONCERN') or None
+
+# Staleness bound for analytics reads routed to secondaries (MongoDB requires at least 90 seconds)
+MONGO_ANALYTICS_MAX_STALENESS_SECONDS = max(90, _env_int('MONGO_ANALYTICS_MAX_STALENESS_SECONDS', 120))
+
+if not MONGO_URI:
+    MONGO_URI = 'mongodb://127.0.0.1:27017/'
+    logger.warning("⚠️ Using local MongoDB. Set MONGO_URI environment variable for production.")
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Collects connection pool counters for this process"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self.counters = dict.fromkeys((
+            'pools_created', 'pools_cleared', 'connections_created', 'connections_closed',
+            'checkouts', 'checkout_failures', 'checked_out'
+        ), 0)
+
+    def _add(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def pool_created(self, event):
+        self._add('pools_created')
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._add('pools_cleared')
+        logger.warning(f"MongoDB connection pool cleared for {event.address}")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._add('connections_created')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add('connections_closed')
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._add('checkout_failures')
+        logger.warning(f"MongoDB connection checkout failed ({event.reason}) for {event.address}")
+
+    def connection_checked_out(self, event):
+        self._add('checkouts')
+        self._add('checked_out')
+
+    def connection_checked_in(self, event):
+        self._add('checked_out', -1)
+
+
+pool_metrics = PoolMetricsListener()
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+# Motor client for the ASGI serving mode (asgi.py), created on first use in each worker
+_async_client = None
+_async_client_pid = None
+
+
+def _reset_after_fork():
+    # A client inherited from the parent must not be used in the child
+    global _client, _client_pid, _client_lock, _async_client, _async_client_pid
+    _client = None
+    _client_pid = None
+    _client_lock = threading.Lock()
+    _async_client = None
+    _async_client_pid = None
+    pool_metrics.reset()
+    command_monitor.reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_client():
+    """Return this process's MongoClient, creating it on first use (after any fork)"""
+    global _client, _client_pid
+    if _client is not None and _client_pid == os.getpid():
+        return _client
+
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            # connect=False defers server selection to the first operation
+            _client = MongoClient(
+                MONGO_URI,
+                tlsCAFile=certifi.where(),
+                retryWrites=True,
+                w=MONGO_WRITE_CONCERN,
+                readConcernLevel=MONGO_READ_CONCERN,
+                connect=False,
+                event_listeners=[pool_metrics, command_monitor],
+                **MONGO_SETTINGS
+            )
+            _client_pid = os.getpid()
+            logger.info(f"✓ MongoDB client created for process {_client_pid}")
+    return _client
+
+
+def use_client(client):
+    """Install an already built client for this process (benchmark fixtures, e.g. mongomock)"""
+    global _client, _client_pid
+    with _client_lock:
+        _client = client
+        _client_pid = os.getpid()
+
+
+def get_database():
+    return get_client()[MONGO_DB_NAME]
+
+
+def get_async_client():
+    """Return this process's Motor client (optional dependency), creating it on first use"""
+    global _async_client, _async_client_pid
+    if _async_client is None or _async_client_pid != os.getpid():
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        # Motor binds to the running event loop on its first operation; each worker runs one loop
+        _async_client = AsyncIOMotorClient(
+            MONGO_URI,
+            tlsCAFile=certifi.where(),
+            retryWrites=True,
+            w=MONGO_WRITE_CONCERN,
+            readConcernLevel=MONGO_READ_CONCERN,
+            event_listeners=[pool_metrics, command_monitor],
+            **MONGO_SETTINGS
+        )
+        _async_client_pid = os.getpid()
+        logger.info(f"✓ Async MongoDB client created for process {_async_client_pid}")
+    return _async_client
+
+
+def get_async_database():
+    return get_async_client()[MONGO_DB_NAME]
+
+
+def ping():
+    """Check that the server is reachable"""
+    get_client().admin.command('ping')
+
+
+class LazyCollection:
+    """Module-level handle for a collection that binds to the per-process client on use"""
+
+    def __init__(self, name, **options):
+        self.name = name
+        self._options = options
+
+    def _collection(self):
+        collection = get_database()[self.name]
+        return collection.with_options(**self._options) if self._options else collection
+
+    def with_options(self, **options):
+        return LazyCollection(self.name, **{**self._options, **options})
+
+    def __getattr__(self, attr):
+        return getattr(self._collection(), attr)
+
+
+def get_query_metrics(limit=20, order_by='total_ms'):
+    """Top MongoDB query shapes of this process, with the calling database.py function"""
+    return command_monitor.top_shapes(limit, order_by)
+
+
+def get_pool_metrics():
+    """Pool counters plus the configured pool settings"""
+    return {
+        'pid': os.getpid(),
+        'client_created': _client is not None and _client_pid == os.getpid(),
+        'async_client_created': _async_client is not None and _async_client_pid == os.getpid(),
+        'settings': dict(MONGO_SETTINGS, write_concern=MONGO_WRITE_CONCERN, read_concern=MONGO_READ_CONCERN,
+                         analytics_max_staleness_seconds=MONGO_ANALYTICS_MAX_STALENESS_SECONDS),
+        'pool': pool_metrics.snapshot()
+    }
@@ -0,0 +1,191 @@
+import contextvars
+import functools
+import hmac
+import inspect
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# Lightweight timing for the hot paths. Spans feed two sinks:
+#   - process-wide Prometheus histograms, exposed by render_metrics() on /metrics
+#   - the current request's timings, sent back as a Server-Timing header
+# Metrics are per process; with several workers each scrape sees the worker that served it.
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Server-Timing names internal functions and external calls, like /metrics, so it is only sent to
+# the same audience (timing_visible); SERVER_TIMING=0 turns it off for everyone
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING', '1') != '0'
+# Server-Timing entries per response, longest first
+SERVER_TIMING_MAX_ENTRIES = 20
+
+# /metrics names routes and database functions, so it needs an admin session or, for scrapers,
+# 'Authorization: Bearer <METRICS_TOKEN>'. METRICS_PUBLIC=1 opts into unauthenticated scraping.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+METRICS_PUBLIC = os.environ.get('METRICS_PUBLIC', '0') == '1'
+
+
+
+def metrics_token_matches(authorization):
+    """Whether an Authorization header carries METRICS_TOKEN, compared in constant time"""
+    if not METRICS_TOKEN:
+        return False
+    return hmac.compare_digest((authorization or '').encode('utf-8'), f'Bearer {METRICS_TOKEN}'.encode('utf-8'))
+
+
+def metrics_visible(session, authorization):
+    """Whether a request may see /metrics: METRICS_PUBLIC, an admin session or the metrics token"""
+    return METRICS_PUBLIC or bool(session.get('admin_logged_in')) or metrics_token_matches(authorization)
+
+
+def timing_visible(session, authorization):
+    """Whether a response may carry Server-Timing: as for /metrics, and also for police logins"""
+    return SERVER_TIMING_ENABLED and (bool(session.get('police_logged_in')) or metrics_visible(session, authorization))
+
+
+_TOKEN_RE = re.compile(r"[^A-Za-z0-9!#$%&'*+.^_`|~-]")
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus text format"""
+
+    def __init__(self, name, help_text, label_names, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, seconds):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def expose(self):
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, series in sorted(snapshot.items()):
+            label_text = ','.join(f'{k}="{_escape_label(v)}"' for k, v in zip(self.label_names, labels))
+            prefix = label_text + ',' if label_text else ''
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {series[-2]:.6f}')
+            lines.append(f'{self.name}_count{{{label_text}}} {series[-1]}')
+        return lines
+
+
+def _escape_label(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+HTTP_REQUESTS = Histogram('safety_http_request_duration_seconds', 'Request duration by route.',
+                          ('route', 'method', 'status'))
+DB_CALLS = Histogram('safety_db_call_duration_seconds', 'Duration of database functions.', ('function',))
+EXTERNAL_CALLS = Histogram('safety_external_call_duration_seconds', 'Duration of outbound service calls.',
+                           ('service',))
+SPANS = Histogram('safety_span_duration_seconds', 'Duration of in-process stages (analytics, rendering).',
+                  ('name',))
+
+# Span kind -> histogram; the kind is also the Server-Timing name prefix
+_KINDS = {'db': DB_CALLS, 'external': EXTERNAL_CALLS, 'span': SPANS}
+
+# {server-timing name: [seconds, calls]} for the request being handled, or None outside one
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+# Name of the innermost running 'db' span, used to tag MongoDB commands (query_monitor.py)
+_db_function = contextvars.ContextVar('db_function', default=None)
+
+
+def current_db_function():
+    return _db_function.get()
+
+
+def record(name, kind, seconds):
+    """Record a finished span"""
+    _KINDS[kind].observe((name,), seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.setdefault(f'{kind}-{name}', [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+
+@contextmanager
+def span(name, kind='span'):
+    """Time a block: with span('nominatim', 'external'): ..."""
+    token = _db_function.set(name) if kind == 'db' else None
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, kind, time.perf_counter() - start)
+        if token is not None:
+            _db_function.reset(token)
+
+
+def timed(kind='span', name=None):
+    """Decorator form of span(); the name defaults to the function name. Works on coroutines"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def begin_request():
+    """Start collecting timings for a request; returns the state to pass to end_request"""
+    return _request_timings.set({}), time.perf_counter()
+
+
+def end_request(state, route, method, status):
+    """Record the request duration and return its Server-Timing header value"""
+    token, start = state
+    total = time.perf_counter() - start
+    timings = _request_timings.get() or {}
+    try:
+        _request_timings.reset(token)
+    except ValueError:
+        # The request started in a different context (e.g. a copied one); just stop collecting
+        _request_timings.set(None)
+    HTTP_REQUESTS.observe((route, method, str(status)), total)
+
+    entries = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[:SERVER_TIMING_MAX_ENTRIES]
+    parts = [f'total;dur={total * 1000:.2f}']
+    for key, (seconds, calls) in entries:
+        part = f'{_TOKEN_RE.sub("_", key)};dur={seconds * 1000:.2f}'
+        if calls > 1:
+            part += f';desc="{calls} calls"'
+        parts.append(part)
+    return ', '.join(parts)
+
+
+def render_metrics():
+    """All histograms in the Prometheus text exposition format"""
+    lines = []
+    for histogram in (HTTP_REQUESTS, DB_CALLS, EXTERNAL_CALLS, SPANS):
+        lines.extend(histogram.expose())
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,108 @@
+import re
+
+# Offline English/Kiswahili detector. Everything here is built once at import and
+# detection never touches the network.
+
+SWAHILI_WORDS = frozenset([
+    # Common particles and connectors
+    'ni', 'na', 'wa', 'kwa', 'ya', 'cha', 'za', 'la', 'vya', 'kama', 'pia', 'au', 'bila', 'hadi', 'tena',
+    # Pronouns
+    'mimi', 'wewe', 'yeye', 'sisi', 'ninyi', 'wao',
+    # Demonstratives and common nouns
+    'hii', 'hiyo', 'hizo', 'yule', 'huyu', 'wale', 'hawa', 'huko', 'hapo',
+    'watu', 'mtu', 'kitu', 'vitu', 'mahali', 'wakati', 'siku', 'usiku', 'mchana', 'nyumba', 'duka',
+    'soko', 'barabara', 'gari', 'pesa', 'simu', 'mtoto', 'watoto', 'mwanamke', 'mwanaume', 'jirani',
+    # Safety vocabulary
+    'polisi', 'wezi', 'mwizi', 'wizi', 'ajali', 'moto', 'dharura', 'msaada', 'haraka', 'hatari', 'kisu',
+    'bunduki', 'risasi', 'damu', 'shambulio', 'vita', 'fujo', 'tukio', 'matukio', 'usalama',
+    # Common phrases
+    'tafadhali', 'asante', 'habari', 'jambo', 'karibu', 'samahani',
+    # Time
+    'sasa', 'leo', 'jana', 'kesho', 'juzi', 'asubuhi', 'jioni', 'saa',
+    # Location
+    'hapa', 'pale', 'kule', 'mbali', 'ndani', 'nje', 'juu', 'chini', 'mbele', 'nyuma',
+    # Action words
+    'kuna', 'hakuna', 'ndiyo', 'hapana', 'kwamba', 'lakini', 'sana', 'tu', 'bado', 'kila', 'wengi',
+    # Possessives
+    'yake', 'yangu', 'yako', 'yetu', 'yenu', 'yao', 'wake', 'wangu', 'wetu',
+    # Common verb forms
+    'nimewona', 'nimesikia', 'ninaomba', 'nataka', 'nina', 'ana', 'wana', 'alikuwa', 'walikuwa',
+    'ameua', 'ameibiwa', 'amelipuka', 'amepigwa',
+])
+
+ENGLISH_WORDS = frozenset([
+    'the', 'a', 'an', 'and', 'or', 'but', 'of', 'to', 'in', 'on', 'at', 'by', 'for', 'with', 'from', 'near',
+    'is', 'are', 'was', 'were', 'be', 'been', 'being', 'am',
+    'have', 'has', 'had', 'having', 'do', 'does', 'did', 'can', 'could', 'would',
+    'should', 'will', 'shall', 'may', 'might', 'must',
+    'this', 'that', 'these', 'those', 'there', 'here', 'where',
+    'what', 'when', 'why', 'how', 'which', 'who', 'whom',
+    'i', 'we', 'you', 'he', 'she', 'it', 'they', 'my', 'our', 'his', 'her', 'their', 'me', 'him', 'them',
+    'not', 'no', 'some', 'someone', 'people', 'man', 'men', 'woman', 'car', 'house', 'shop', 'road', 'street',
+    'police', 'help', 'now', 'today', 'yesterday', 'night', 'morning', 'evening', 'please', 'very', 'just',
+    # Safety vocabulary, so one-word reports are recognised
+    'fire', 'smoke', 'knife', 'gun', 'guns', 'shots', 'thief', 'thieves', 'robbery', 'theft', 'stolen', 'accident',
+    'fight', 'attack', 'missing', 'child', 'children', 'injured', 'dead', 'body', 'outside', 'inside', 'market',
+    'school', 'hospital', 'bar',
+])
+
+_WORD_RE = re.compile(r"[a-z']+")
+
+# Swahili verbs: subject prefix + tense marker + stem, e.g. wa-me-vunja, a-na-iba, tu-li-ona
+_SWAHILI_VERB_RE = re.compile(r'^(ni|u|a|tu|m|wa|ki|vi|li|ya|i|zi|ku|ha)(na|li|ta|me|ki|si)[a-z]{2,}$')
+
+# English inflection and derivation suffixes that Swahili words (which end in vowels) lack
+_ENGLISH_SUFFIX_RE = re.compile(r'(ing|ed|tion|ment|ness|ly|ful|less|ght|th|ck|ss)$')
+
+_VOWELS = frozenset('aeiou')
+
+# Word endings are weak evidence: they only count when at least this many tokens matched
+# nothing else, so a single unknown word such as 'fire' cannot decide the language
+VOWEL_HINT_MIN_TOKENS = 3
+
+# Below this score neither language has real evidence and detect() returns its fallback
+MIN_SCORE = 1
+
+
+def score_text(text):
+    """Return (swahili_score, english_score) for a text"""
+    swahili = english = 0.0
+    undecided = []
+    for token in _WORD_RE.findall(text.lower()):
+        if token in SWAHILI_WORDS:
+            swahili += 2
+        elif token in ENGLISH_WORDS:
+            english += 2
+        elif token.endswith('ni') and token[:-2] in SWAHILI_WORDS:
+            # Locative of a known noun: sokoni, barabarani, nyumbani
+            swahili += 2
+        else:
+            matched = False
+            if _SWAHILI_VERB_RE.match(token):
+                swahili += 1
+                matched = True
+            if _ENGLISH_SUFFIX_RE.search(token):
+                english += 1
+                matched = True
+            if not matched:
+                undecided.append(token)
+
+    if len(undecided) >= VOWEL_HINT_MIN_TOKENS:
+        # Native Swahili words almost always end in a vowel
+        for token in undecided:
+            if token[-1] in _VOWELS:
+                swahili += 0.5
+            else:
+                english += 0.5
+    return swahili, english
+
+
+def detect(text, fallback='en'):
+    """Detect language offline. Returns 'sw' for Kiswahili or 'en' for English, and the fallback
+    for empty text, ties and texts with no real evidence either way"""
+    if not text or not text.strip():
+        return fallback
+    swahili, english = score_text(text)
+    if max(swahili, english) < MIN_SCORE or swahili == english:
+        return fallback
+    return 'sw' if swahili > english else 'en'
@@ -0,0 +1,165 @@
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import sys
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+# Read/write size used while streaming uploads to disk
+CHUNK_SIZE = 64 * 1024
+
+# Unreferenced files younger than this are kept by the sweep: their report may still be saving
+SWEEP_MIN_AGE_SECONDS = 24 * 3600
+
+# Stored media names are '<sha256>.<ext>'; anything else is a legacy flat upload
+HASHED_NAME_RE = re.compile(r'^([0-9a-f]{64})\.([a-z0-9]{1,5})$')
+
+# Leading bytes of the formats we accept, used to record the real MIME type
+MAGIC_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+)
+
+
+def sniff_mime(head, filename):
+    """Detect MIME type from the first bytes of a file, falling back to its extension"""
+    for signature, mime in MAGIC_SIGNATURES:
+        if head.startswith(signature):
+            return mime
+    if head[4:8] == b'ftyp':
+        return 'video/quicktime' if head[8:10] == b'qt' else 'video/mp4'
+    return mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+
+def shard_path(root, digest, ext):
+    """Path of a stored file: <root>/ab/cd/<digest>.<ext>"""
+    return os.path.join(root, digest[:2], digest[2:4], f'{digest}.{ext}')
+
+
+def resolve_path(root, name):
+    """Resolve a media name as stored on a report to a file path"""
+    match = HASHED_NAME_RE.match(name)
+    if match:
+        return shard_path(root, match.group(1), match.group(2))
+    # Uploads stored before content addressing live flat in the root folder
+    return os.path.join(root, os.path.basename(name))
+
+
+def save_upload(file_storage, root, max_bytes=None):
+    """
+    Stream an uploaded file to disk in chunks while hashing it, and store it under its SHA-256.
+    Identical files are stored once. Returns the media record saved on the report:
+    {'name', 'sha256', 'size', 'mime', 'created'} where 'created' is False for a duplicate.
+    """
+    ext = file_storage.filename.rsplit('.', 1)[1].lower()
+    hasher = hashlib.sha256()
+    size = 0
+    head = b''
+
+    os.makedirs(root, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=root, prefix='.upload-')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = file_storage.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if not head:
+                    head = chunk[:16]
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise ValueError("File exceeds the upload size limit")
+                hasher.update(chunk)
+                out.write(chunk)
+
+        if size == 0:
+            raise ValueError("Empty file")
+
+        digest = hasher.hexdigest()
+        dest = shard_path(root, digest, ext)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        # link() fails if the name exists, so of two concurrent identical uploads exactly one creates it
+        try:
+            os.link(tmp_path, dest)
+            created = True
+        except FileExistsError:
+            created = False
+            # A fresh mtime keeps the sweep off a file that is about to be referenced again
+            os.utime(dest)
+            logger.info(f"Duplicate upload deduplicated: {digest[:12]}")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return {
+        'name': f'{digest}.{ext}',
+        'sha256': digest,
+        'size': size,
+        'mime': sniff_mime(head, file_storage.filename),
+        'created': created
+    }
+
+
+def sweep_unreferenced(root, referenced, min_age_seconds=SWEEP_MIN_AGE_SECONDS, dry_run=False):
+    """
+    Delete stored files whose names are not in `referenced`, e.g. uploads of reports rejected as
+    spam. Content-addressed files are shared between reports, so they are never deleted when one
+    report is rejected. Files changed within min_age_seconds are kept: their report may still be
+    saving, and save_upload touches a file each time it is uploaded again. Legacy flat uploads and
+    previews are left alone. Returns the names deleted (or, with dry_run, that would be).
+    """
+    cutoff = time.time() - min_age_seconds
+    removed = []
+    for folder, _, files in os.walk(root):
+        for filename in files:
+            match = HASHED_NAME_RE.match(filename)
+            path = os.path.join(folder, filename)
+            if not match or path != shard_path(root, match.group(1), match.group(2)) or filename in referenced:
+                continue
+            try:
+                if os.path.getmtime(path) > cutoff:
+                    continue
+                if not dry_run:
+                    os.remove(path)
+                removed.append(filename)
+            except OSError as e:
+                logger.warning(f"Could not remove media {filename}: {e}")
+    return removed
+
+
+def media_etag(name):
+    """Strong ETag for a stored file: its content hash. Legacy uploads have none."""
+    match = HASHED_NAME_RE.match(name)
+    return match.group(1) if match else None
+
+
+def media_cache_control(name, max_age=31536000):
+    """Cache-Control for authenticated media; content-addressed files never change"""
+    if media_etag(name):
+        return f'private, max-age={max_age}, immutable'
+    return 'private, no-cache'
+
+
+def main():
+    """python media_store.py [--root Uploads] [--dry-run]: delete stored files no report refers to"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--root', default='Uploads', help="the app's UPLOAD_FOLDER")
+    parser.add_argument('--dry-run', action='store_true', help='only count the files that would be deleted')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    from database import get_referenced_media
+
+    removed = sweep_unreferenced(args.root, get_referenced_media(), dry_run=args.dry_run)
+    logger.info(f"{'Would delete' if args.dry_run else 'Deleted'} {len(removed)} unreferenced media files")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""
+Versioned index migrations, run once per deployment instead of on every worker boot.
+
+    python migrations.py                 apply pending migrations
+    python migrations.py --status        list migrations and whether they are applied
+    python migrations.py --check-plans   explain() the hot queries; exit 1 if any uses a COLLSCAN
+    python migrations.py --copy-audit-logs
+                                         copy audit entries the old code wrote to 'audit_logs' after
+                                         migration 4 (run once the deployment is complete)
+
+Applied versions are recorded in the 'schema_migrations' collection. Index creation is
+idempotent, so re-running a migration whose record was lost is harmless. Run --check-plans
+against a database with realistic data: on an empty collection the planner has nothing to
+choose between.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = 'schema_migrations'
+
+# Audit log entries expire this many days after they are written (migration 3)
+AUDIT_LOG_RETENTION_DAYS = int(os.environ.get('AUDIT_LOG_RETENTION_DAYS') or 365)
+
+
+def _data_lifecycle(db):
+    """Audit log TTL and the compressed archive collection for old closed reports (archive.py)"""
+    from pymongo.errors import OperationFailure
+
+    # The TTL index replaces the plain created_at index, which has the same key
+    try:
+        db.audit_logs.drop_index('created_at_-1')
+    except OperationFailure:
+        pass
+    created = {'audit_logs': [db.audit_logs.create_index([('created_at', DESCENDING)],
+                                                         expireAfterSeconds=AUDIT_LOG_RETENTION_DAYS * 86400)]}
+
+    if 'reports_archive' not in db.list_collection_names():
+        db.create_collection('reports_archive',
+                             storageEngine={'wiredTiger': {'configString': 'block_compressor=zstd'}})
+    # The archival job's batch query
+    created['reports'] = [db.reports.create_index([('status', ASCENDING), ('created_at', ASCENDING)])]
+    created['reports_archive'] = db.reports_archive.create_indexes([
+        IndexModel([('constituency', ASCENDING), ('created_at', DESCENDING)]),
+    ])
+    return created
+
+
+def copy_audit_logs(db):
+    """Copy the entries of the old 'audit_logs' into audit_events; returns how many were new"""
+    # Copy in batches, keeping _id. Time-series collections do not enforce unique _id,
+    # so a rerun skips the entries already there.
+    def copy(batch):
+        ids = [doc['_id'] for doc in batch]
+        copied = {doc['_id'] for doc in db.audit_events.find({'_id': {'$in': ids}}, {'_id': 1})}
+        documents = [doc for doc in batch if doc['_id'] not in copied]
+        if documents:
+            db.audit_events.insert_many(documents, ordered=False)
+        return len(documents)
+
+    total, batch = 0, []
+    for log in db.audit_logs.find({'created_at': {'$type': 'date'}}).sort('created_at', ASCENDING):
+        batch.append({
+            '_id': log['_id'],
+            'meta': {'user_type': log.get('user_type'), 'username': log.get('username')},
+            'action': log.get('action'),
+            'details': log.get('details'),
+            'ip_address': log.get('ip_address'),
+            'created_at': log['created_at']
+        })
+        if len(batch) == 1000:
+            total += copy(batch)
+            batch = []
+    if batch:
+        total += copy(batch)
+    return total
+
+
+def _audit_events(db):
+    """Time-series collection for audit logs, filled with the entries of the old 'audit_logs'"""
+    existing = list(db.list_collections(filter={'name': 'audit_events'}))
+    if not existing:
+        db.create_collection('audit_events',
+                             timeseries={'timeField': 'created_at', 'metaField': 'meta', 'granularity': 'seconds'},
+                             expireAfterSeconds=AUDIT_LOG_RETENTION_DAYS * 86400)
+    elif 'timeseries' not in existing[0].get('options', {}):
+        # The app wrote an audit entry before this migration ran, creating an ordinary collection
+        raise RuntimeError("'audit_events' exists but is not a time-series collection; rename it "
+                           "(e.g. to audit_events_plain), rerun the migration and copy its entries back")
+    created = {'audit_events': db.audit_events.create_indexes([
+        IndexModel([('meta.user_type', ASCENDING), ('created_at', DESCENDING)]),
+        IndexModel([('meta.username', ASCENDING), ('created_at', DESCENDING)]),
+        IndexModel([('created_at', DESCENDING)]),
+    ])}
+    total = copy_audit_logs(db)
+    logger.info(f"✓ Copied {total} audit log entries into audit_events; run --copy-audit-logs again once "
+                f"every worker runs the new code, then 'audit_logs' can be dropped")
+    return created
+
+
+# (version, description, {collection: [IndexModel, ...]} or a function of the database).
+# Append new versions; never edit applied ones.
+MIGRATIONS = [
+    (1, 'Indexes previously created by init_db at every start', {
+        'reports': [
+            IndexModel([('constituency', ASCENDING), ('created_at', DESCENDING)]),
+            IndexModel([('status', ASCENDING)]),
+            IndexModel([('spam_score', DESCENDING)]),
+        ],
+        'police_stations': [
+            IndexModel([('constituency', ASCENDING)], unique=True),
+            IndexModel([('username', ASCENDING)], unique=True),
+        ],
+        'responses': [IndexModel([('report_id', ASCENDING)])],
+        'hotspots': [
+            IndexModel([('constituency', ASCENDING)]),
+            IndexModel([('incident_count', DESCENDING)]),
+        ],
+        'audit_logs': [IndexModel([('created_at', DESCENDING)])],
+        'translation_memory': [
+            IndexModel([('text_hash', ASCENDING), ('src', ASCENDING), ('dest', ASCENDING)], unique=True),
+        ],
+    }),
+    (2, 'Cover every query shape in database.py', {
+        'reports': [
+            # Tracking scan (newest first) and the system-wide created_at counts and response time $match
+            IndexModel([('created_at', DESCENDING)]),
+            # Per-constituency status counts and status-filtered exports sorted by date
+            IndexModel([('constituency', ASCENDING), ('status', ASCENDING), ('created_at', DESCENDING)]),
+        ],
+        'police_stations': [
+            # get_all_constituencies, active station counts
+            IndexModel([('is_active', ASCENDING), ('constituency', ASCENDING)]),
+        ],
+        'hotspots': [
+            # get_hotspots_for_station: equality, then both sort keys
+            IndexModel([('constituency', ASCENDING), ('incident_count', DESCENDING), ('last_incident', DESCENDING)]),
+            # The per-report hotspot upsert
+            IndexModel([('constituency', ASCENDING), ('location', ASCENDING)]),
+        ],
+        'audit_logs': [IndexModel([('user_type', ASCENDING), ('created_at', DESCENDING)])],
+        'admin_users': [IndexModel([('username', ASCENDING)], unique=True)],
+    }),
+    (3, 'Audit log TTL and the compressed report archive', _data_lifecycle),
+    (4, 'Audit logs in a time-series collection', _audit_events),
+    (5, 'Idempotent bulk imports (bulk_import.py)', {
+        'reports': [
+            IndexModel([('import_key', ASCENDING)], unique=True,
+                       partialFilterExpression={'import_key': {'$exists': True}}),
+        ],
+    }),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def applied_versions(db):
+    return {doc['_id'] for doc in db[MIGRATIONS_COLLECTION].find({}, {'_id': 1})}
+
+
+def pending_migrations(db):
+    applied = applied_versions(db)
+    return [migration for migration in MIGRATIONS if migration[0] not in applied]
+
+
+def apply_migrations(db):
+    """Apply pending migrations in order; returns the versions applied"""
+    done = []
+    for version, description, change in pending_migrations(db):
+        if callable(change):
+            created = change(db)
+        else:
+            created = {collection: db[collection].create_indexes(models) for collection, models in change.items()}
+        db[MIGRATIONS_COLLECTION].insert_one({
+            '_id': version,
+            'description': description,
+            'indexes': created,
+            'applied_at': datetime.now()
+        })
+        logger.info(f"✓ Applied migration {version}: {description}")
+        done.append(version)
+    return done
+
+
+def hot_queries():
+    """(name, collection, explainable command) for the queries on the request paths"""
+    from bson.objectid import ObjectId
+    from database import AUDIT_LOG_SORT, TRACKING_SCAN_LIMIT, _report_export_query, audit_log_page_query, \
+        hotspot_increment, response_time_pipeline, system_statistics_counts
+
+    constituency = 'Nakuru Town East'
+    month_ago = datetime.now() - timedelta(days=30)
+    page_cursor = f"{month_ago.isoformat()}_{ObjectId()}"
+
+    def find(collection, query, sort=None, limit=0):
+        command = {'find': collection, 'filter': query, 'limit': limit}
+        if sort:
+            command['sort'] = sort
+        return collection, command
+
+    def count(collection, query):
+        # count_documents runs as this aggregation
+        return collection, {'aggregate': collection, 'cursor': {},
+                            'pipeline': [{'$match': query}, {'$group': {'_id': 1, 'n': {'$sum': 1}}}]}
+
+    def aggregate(collection, pipeline):
+        return collection, {'aggregate': collection, 'pipeline': pipeline, 'cursor': {}}
+
+    queries = {
+        'reports_by_constituency': find('reports', {'constituency': constituency}, {'created_at': -1}, 500),
+        'tracking_scan': find('reports', {}, {'created_at': -1}, TRACKING_SCAN_LIMIT),
+        'export_by_status': aggregate('reports', [
+            {'$match': _report_export_query(constituency, month_ago, datetime.now(), 'pending')},
+            {'$sort': {'created_at': 1}}]),
+        'constituency_pending': count('reports', {'constituency': constituency, 'status': 'pending'}),
+        'constituency_response_time': aggregate('reports', response_time_pipeline(
+            {'constituency': constituency, 'created_at': {'$gte': month_ago}})),
+        'system_response_time': aggregate('reports', response_time_pipeline({'created_at': {'$gte': month_ago}})),
+        'response_for_report': find('responses', {'report_id': None}, limit=1),
+        'hotspots_for_station': find('hotspots', {'constituency': constituency},
+                                     {'incident_count': -1, 'last_incident': -1}, 100),
+        'hotspot_upsert': find('hotspots', hotspot_increment(constituency, 'Bus stage', 0, 0)[0], limit=1),
+        'active_constituencies': find('police_stations', {'is_active': True}, {'constituency': 1}),
+        'station_login': find('police_stations', {'username': 'station', 'is_active': True}, limit=1),
+        'admin_login': find('admin_users', {'username': 'admin', 'is_active': True}, limit=1),
+        # The admin audit log pages, as get_audit_logs queries them
+        'audit_logs_first_page': find('audit_events', audit_log_page_query(), dict(AUDIT_LOG_SORT), 101),
+        'audit_logs_by_type': find('audit_events', audit_log_page_query(page_cursor, user_type='police'),
+                                   dict(AUDIT_LOG_SORT), 101),
+        'audit_logs_by_user': find('audit_events', audit_log_page_query(page_cursor, username='admin'),
+                                   dict(AUDIT_LOG_SORT), 101),
+        'translation_memory': find('translation_memory', {'text_hash': '', 'src': 'en', 'dest': 'sw'}, limit=1),
+    }
+    # The system statistics counts; the unfiltered total has nothing to plan
+    for name, (collection, query) in system_statistics_counts().items():
+        if query:
+            queries[f'system_{name}'] = count(collection, query)
+    return [(name, collection, command) for name, (collection, command) in queries.items()]
+
+
+def _has_collscan(plan):
+    if isinstance(plan, dict):
+        return plan.get('stage') == 'COLLSCAN' or any(_has_collscan(value) for value in plan.values())
+    if isinstance(plan, list):
+        return any(_has_collscan(item) for item in plan)
+    return False
+
+
+def check_plans(db):
+    """Return {query name: 'COLLSCAN' | 'ok' | error} from explain() of each hot query"""
+    results = {}
+    for name, collection, command in hot_queries():
+        try:
+            plan = db.command('explain', command, verbosity='queryPlanner')
+            results[name] = 'COLLSCAN' if _has_collscan(plan) else 'ok'
+        except Exception as e:
+            results[name] = f'error: {e}'
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--status', action='store_true', help='list migrations without applying them')
+    parser.add_argument('--check-plans', action='store_true', help='explain() the hot queries after migrating')
+    parser.add_argument('--copy-audit-logs', action='store_true',
+                        help="copy entries still written to the old 'audit_logs' into audit_events")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    from db_connection import get_database
+
+    db = get_database()
+    if args.status:
+        applied = applied_versions(db)
+        for version, description, _ in MIGRATIONS:
+            print(f"{version:>4}  {'applied' if version in applied else 'pending':<8} {description}")
+        return 0
+
+    applied = apply_migrations(db)
+    if args.copy_audit_logs:
+        logger.info(f"✓ Copied {copy_audit_logs(db)} audit log entries into audit_events")
+    if not applied:
+        logger.info(f"Indexes are up to date (version {LATEST_VERSION})")
+
+    if args.check_plans:
+        results = check_plans(db)
+        print(json.dumps(results, indent=2))
+        return 1 if any(result != 'ok' for result in results.values()) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
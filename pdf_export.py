@@ -0,0 +1,189 @@
+import io
+import logging
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+
+logger = logging.getLogger(__name__)
+
+# Number of render processes used by bulk exports
+EXPORT_WORKERS = int(os.environ.get('PDF_EXPORT_WORKERS', max(1, min(4, (os.cpu_count() or 2) - 1))))
+
+# Maximum number of rendered PDFs held in memory while streaming a bulk export
+EXPORT_MAX_PENDING = EXPORT_WORKERS * 2
+
+# A combined PDF is built in one pass, so it is capped; ZIP exports are not
+COMBINED_PDF_MAX_REPORTS = int(os.environ.get('PDF_COMBINED_MAX_REPORTS', 200))
+
+# Styles are built once per process and shared by every render
+STYLES = getSampleStyleSheet()
+
+
+def _table_style(header_color):
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), header_color),
+        ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+
+REPORT_TABLE_STYLE = _table_style(colors.grey)
+RESPONSE_TABLE_STYLE = _table_style(colors.green)
+
+_executor = None
+
+
+def report_filename(report):
+    """File name used for a single report PDF"""
+    return f'Report_{str(report["_id"])[-8:]}.pdf'
+
+
+def build_report_story(report, response=None):
+    """Build the platypus flowables for one report"""
+    story = [
+        Paragraph(f"<b>INCIDENT REPORT #{str(report['_id'])[-8:]}</b>", STYLES['Title']),
+        Spacer(1, 12)
+    ]
+
+    data = [
+        ['Category:', report.get('category', 'N/A')],
+        ['Location:', report.get('manual_location', 'N/A')],
+        ['Constituency:', report.get('constituency', 'N/A')],
+        ['Status:', report.get('status', 'pending').upper()],
+        ['Submitted:', report.get('created_at', datetime.now()).strftime('%Y-%m-%d %H:%M:%S')],
+        ['Language:', report.get('language', 'English')],
+    ]
+
+    table = Table(data, colWidths=[150, 350])
+    table.setStyle(REPORT_TABLE_STYLE)
+    story.append(table)
+    story.append(Spacer(1, 12))
+
+    story.append(Paragraph("<b>Description:</b>", STYLES['Heading2']))
+    story.append(Paragraph(report.get('description', 'N/A'), STYLES['BodyText']))
+    story.append(Spacer(1, 12))
+
+    if response:
+        story.append(Paragraph("<b>Police Response:</b>", STYLES['Heading2']))
+        response_data = [
+            ['Officer:', response.get('officer_name', 'N/A')],
+            ['Action Taken:', response.get('action_taken', 'N/A')],
+            ['Notes:', response.get('notes', 'N/A')],
+            ['Response Date:', response.get('created_at', datetime.now()).strftime('%Y-%m-%d %H:%M:%S')],
+        ]
+        response_table = Table(response_data, colWidths=[150, 350])
+        response_table.setStyle(RESPONSE_TABLE_STYLE)
+        story.append(response_table)
+
+    return story
+
+
+def render_report_pdf(report, response=None):
+    """Render a single report to PDF bytes"""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    doc.build(build_report_story(report, response))
+    return buffer.getvalue()
+
+
+def _render_job(item):
+    """Process pool entry point: (report, response) -> (filename, pdf bytes)"""
+    report, response = item
+    return report_filename(report), render_report_pdf(report, response)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=EXPORT_WORKERS)
+    return _executor
+
+
+def render_many(items):
+    """
+    Render (report, response) pairs in the process pool, yielding (filename, pdf bytes) in order.
+    At most EXPORT_MAX_PENDING renders are in flight, so memory stays bounded for any input size.
+    """
+    try:
+        executor = _get_executor()
+    except Exception as e:
+        logger.warning(f"PDF process pool unavailable, rendering inline: {e}")
+        executor = None
+
+    if executor is None:
+        for item in items:
+            yield _render_job(item)
+        return
+
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(_render_job, item))
+        if len(pending) >= EXPORT_MAX_PENDING:
+            yield pending.popleft().result()
+
+    while pending:
+        yield pending.popleft().result()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable sink that hands written bytes back to a generator"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_reports_zip(items):
+    """Stream a ZIP archive containing one PDF per (report, response) pair"""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED) as archive:
+        for filename, pdf in render_many(items):
+            # PDFs are already compressed internally, so they are stored as-is
+            archive.writestr(filename, pdf)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+def render_combined_pdf(items):
+    """Render up to COMBINED_PDF_MAX_REPORTS (report, response) pairs into a single PDF"""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    story = []
+    for count, (report, response) in enumerate(items):
+        if count >= COMBINED_PDF_MAX_REPORTS:
+            raise ValueError(f"Combined PDF is limited to {COMBINED_PDF_MAX_REPORTS} reports, use ZIP export")
+        if story:
+            story.append(PageBreak())
+        story.extend(build_report_story(report, response))
+
+    if not story:
+        story.append(Paragraph("No reports match the selected filter", STYLES['BodyText']))
+
+    doc.build(story)
+    return buffer.getvalue()
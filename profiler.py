@@ -0,0 +1,161 @@
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Opt-in request profiling. A sampled request has its thread's stack read every
+# PROFILE_INTERVAL_MS by one background thread; the result is written as collapsed stacks
+# ('frame;frame;frame count' lines, the input of flamegraph.pl and speedscope) to a bounded
+# ring of files in PROFILE_DIR. Sampling only reads the profiled threads' frames, so the
+# other requests of the worker are not slowed down.
+
+# Fraction of requests to profile (0 disables random sampling)
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE') or 0)
+# Requests from a logged-in admin carrying this header are always profiled
+PROFILE_HEADER = 'X-Profile-Request'
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS') or 5)
+PROFILE_DIR = os.environ.get('PROFILE_DIR') or os.path.join('logs', 'profiles')
+# Profiles kept on disk, oldest removed first (shared by all workers)
+PROFILE_KEEP = max(1, int(os.environ.get('PROFILE_KEEP') or 50))
+
+PROFILE_NAME_RE = re.compile(r'^[0-9]{8}T[0-9]{6}-[0-9]{3}-[0-9]+-[A-Za-z0-9_.-]+-[0-9]+ms\.folded$')
+_SLUG_RE = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+def should_profile(admin_requested):
+    """Whether to profile this request: the admin header, or a PROFILE_SAMPLE_RATE draw"""
+    return admin_requested or (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE)
+
+
+def collapse_stack(frame):
+    """'module:function;...' from the outermost frame down to this one"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        module = os.path.splitext(os.path.basename(code.co_filename))[0]
+        names.append(f'{module}:{code.co_name}')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler:
+    """Samples the stacks of registered threads while at least one is registered"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.reset()
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self._stacks = {}
+        self._thread = None
+
+    def start(self, thread_id):
+        with self._lock:
+            self._stacks[thread_id] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+                self._thread.start()
+
+    def stop(self, thread_id):
+        """Stop sampling a thread and return its {stack: samples}"""
+        with self._lock:
+            return self._stacks.pop(thread_id, Counter())
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._stacks:
+                    self._thread = None
+                    return
+                thread_ids = list(self._stacks)
+
+            frames = sys._current_frames()
+            samples = {tid: collapse_stack(frames[tid]) for tid in thread_ids if tid in frames and tid != me}
+            del frames
+
+            with self._lock:
+                for thread_id, stack in samples.items():
+                    stacks = self._stacks.get(thread_id)
+                    if stacks is not None:
+                        stacks[stack] += 1
+
+
+sampler = StackSampler(PROFILE_INTERVAL_MS / 1000)
+
+if hasattr(os, 'register_at_fork'):
+    # The sampling thread does not survive a fork
+    os.register_at_fork(after_in_child=sampler.reset)
+
+
+def begin_profile():
+    """Start sampling the current thread; returns the state to pass to end_profile"""
+    thread_id = threading.get_ident()
+    sampler.start(thread_id)
+    return thread_id, time.perf_counter()
+
+
+def end_profile(state, route, method):
+    """Stop sampling and store the profile in the on-disk ring"""
+    thread_id, start = state
+    stacks = sampler.stop(thread_id)
+    duration_ms = int((time.perf_counter() - start) * 1000)
+    if not stacks:
+        return None
+
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        now = datetime.now()
+        slug = _SLUG_RE.sub('_', f'{method}{route}').strip('_')[:80] or 'unmatched'
+        name = (f"{now.strftime('%Y%m%dT%H%M%S')}-{now.microsecond // 1000:03d}-{os.getpid()}-{slug}-"
+                f"{duration_ms}ms.folded")
+        with open(os.path.join(PROFILE_DIR, name), 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f'{stack} {count}\n')
+        _trim_profiles()
+        return name
+    except Exception as e:
+        logger.error(f"Error saving profile: {str(e)}")
+        return None
+
+
+def _trim_profiles():
+    names = sorted(n for n in os.listdir(PROFILE_DIR) if PROFILE_NAME_RE.match(n))
+    for name in names[:-PROFILE_KEEP]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except FileNotFoundError:
+            # Another worker trimmed it first
+            pass
+
+
+def list_profiles():
+    """Stored profiles, newest first"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in sorted((n for n in os.listdir(PROFILE_DIR) if PROFILE_NAME_RE.match(n)), reverse=True):
+        try:
+            size = os.path.getsize(os.path.join(PROFILE_DIR, name))
+        except FileNotFoundError:
+            continue
+        head, duration = name[:-len('.folded')].rsplit('-', 1)
+        stamp, millis, pid, slug = head.split('-', 3)
+        profiles.append({
+            'name': name,
+            'created_at': datetime.strptime(stamp, '%Y%m%dT%H%M%S').isoformat() + f'.{millis}',
+            'pid': int(pid),
+            'route': slug,
+            'duration_ms': int(duration[:-2]),
+            'size': size
+        })
+    return profiles
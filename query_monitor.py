@@ -0,0 +1,150 @@
+import json
+import logging
+import os
+import threading
+
+from pymongo import monitoring
+
+from instrumentation import current_db_function
+
+logger = logging.getLogger(__name__)
+
+# Commands slower than this are logged with their filter shape (never the values)
+MONGO_SLOW_QUERY_MS = float(os.environ.get('MONGO_SLOW_QUERY_MS') or 100)
+
+# Distinct (function, command, collection, shape) entries kept per process
+MAX_QUERY_SHAPES = 1000
+
+MONITORED_COMMANDS = frozenset(('find', 'aggregate', 'count', 'distinct', 'update', 'delete', 'insert',
+                                'findAndModify', 'getMore'))
+
+# Commands whose filter lives under a single key
+_FILTER_KEYS = {'find': 'filter', 'count': 'query', 'distinct': 'query', 'findAndModify': 'query'}
+
+
+def query_shape(value):
+    """Replace every value in a filter with 1, keeping field names and operators"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # $and/$or keep their clauses; $in/$nin lists of values collapse to 1
+        clauses = [query_shape(item) for item in value if isinstance(item, dict)]
+        return clauses or 1
+    return 1
+
+
+def command_shape(name, command):
+    """Shape of a command: filter and sort for finds, stage outline for pipelines, filter for writes"""
+    if name in _FILTER_KEYS:
+        shape = {'filter': query_shape(command.get(_FILTER_KEYS[name]) or {})}
+        if command.get('sort'):
+            shape['sort'] = dict(command['sort'])
+        return shape
+    if name == 'aggregate':
+        stages = []
+        for stage in command.get('pipeline', []):
+            operator = next(iter(stage), None)
+            if operator == '$match':
+                stages.append({'$match': query_shape(stage[operator])})
+            elif operator == '$sort':
+                stages.append({'$sort': dict(stage[operator])})
+            elif operator == '$lookup':
+                stages.append({'$lookup': stage[operator].get('from')})
+            else:
+                stages.append(operator)
+        return {'pipeline': stages}
+    if name in ('update', 'delete'):
+        statements = command.get(name + 's') or [{}]
+        return {'filter': query_shape(statements[0].get('q') or {})}
+    return {}
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """Per-command durations grouped by calling database.py function and query shape"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._stats = {}
+        self.dropped = 0
+
+    def started(self, event):
+        if event.command_name not in MONITORED_COMMANDS:
+            return
+        command = event.command
+        if event.command_name == 'getMore':
+            collection, shape = command.get('collection'), {}
+        else:
+            collection, shape = command.get(event.command_name), command_shape(event.command_name, command)
+        # Motor runs commands on executor threads, where the calling function is not visible
+        key = (current_db_function() or 'unknown', event.command_name, str(collection),
+               json.dumps(shape, sort_keys=True, default=str))
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = key
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed):
+        with self._lock:
+            key = self._pending.pop((event.connection_id, event.request_id), None)
+            if key is None:
+                return
+            duration_ms = event.duration_micros / 1000
+            slow = duration_ms >= MONGO_SLOW_QUERY_MS
+
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= MAX_QUERY_SHAPES:
+                    self.dropped += 1
+                else:
+                    stats = self._stats[key] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'slow': 0, 'failed': 0}
+            if stats is not None:
+                stats['count'] += 1
+                stats['total_ms'] += duration_ms
+                stats['max_ms'] = max(stats['max_ms'], duration_ms)
+                stats['slow'] += slow
+                stats['failed'] += failed
+
+        if slow:
+            function, command_name, collection, shape = key
+            logger.warning(f"Slow MongoDB {command_name} on {collection} ({duration_ms:.1f} ms) "
+                           f"in {function}: {shape}")
+
+    def top_shapes(self, limit=20, order_by='total_ms'):
+        """The most expensive query shapes, ordered by total_ms, max_ms, slow or count"""
+        with self._lock:
+            items = [(key, dict(stats)) for key, stats in self._stats.items()]
+            dropped = self.dropped
+
+        shapes = []
+        for (function, command_name, collection, shape), stats in items:
+            shapes.append({
+                'function': function,
+                'command': command_name,
+                'collection': collection,
+                'shape': json.loads(shape),
+                'count': stats['count'],
+                'slow': stats['slow'],
+                'failed': stats['failed'],
+                'total_ms': round(stats['total_ms'], 3),
+                'avg_ms': round(stats['total_ms'] / stats['count'], 3),
+                'max_ms': round(stats['max_ms'], 3),
+            })
+        shapes.sort(key=lambda s: s[order_by], reverse=True)
+        return {
+            'pid': os.getpid(),
+            'slow_threshold_ms': MONGO_SLOW_QUERY_MS,
+            'tracked_shapes': len(items),
+            'dropped_commands': dropped,
+            'shapes': shapes[:limit]
+        }
+
+
+command_monitor = CommandMonitor()
@@ -58,15 +58,18 @@ function openManageModal(btn) {
     if (mediaPath) {
         mediaSection.style.display = 'block';
         const mediaUrl = `/media/${mediaPath}`;
+        const thumbUrl = `/media/thumb/${mediaPath}`;
 
+        // Show the preview first; the full file is only fetched on demand
         if (mediaPath.match(/\.(jpg|jpeg|png)$/i)) {
             mediaPreview.innerHTML = `
-                <img src="${mediaUrl}" alt="Evidence" 
-                     style="max-width:100%;max-height:400px;border-radius:8px;box-shadow:0 2px 8px rgba(0,0,0,0.1);">
+                <img src="${thumbUrl}" alt="Evidence preview" title="Click to load full image"
+                     onclick="loadFullImage(this, '${mediaUrl}')" onerror="loadFullImage(this, '${mediaUrl}')"
+                     style="max-width:100%;max-height:400px;border-radius:8px;box-shadow:0 2px 8px rgba(0,0,0,0.1);cursor:zoom-in;">
             `;
         } else if (mediaPath.match(/\.(mp4|mov)$/i)) {
             mediaPreview.innerHTML = `
-                <video controls style="max-width:100%;max-height:400px;border-radius:8px;">
+                <video controls preload="none" poster="${thumbUrl}" style="max-width:100%;max-height:400px;border-radius:8px;">
                     <source src="${mediaUrl}" type="video/mp4">
                     Your browser does not support video playback.
                 </video>
@@ -115,6 +118,16 @@ function openManageModal(btn) {
     document.getElementById('manageModal').classList.add('active');
 }
 
+/**
+ * Replace a preview image with the full-size file
+ */
+function loadFullImage(img, mediaUrl) {
+    img.onclick = null;
+    img.onerror = null;
+    img.style.cursor = 'default';
+    img.src = mediaUrl;
+}
+
 /**
  * Close manage modal
  */
@@ -0,0 +1,119 @@
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from media_store import HASHED_NAME_RE, resolve_path
+
+logger = logging.getLogger(__name__)
+
+# Longest edge of generated thumbnails, in pixels
+THUMBNAIL_SIZE = int(os.environ.get('THUMBNAIL_SIZE', 320))
+THUMBNAIL_QUALITY = 75
+THUMBNAIL_WORKERS = int(os.environ.get('THUMBNAIL_WORKERS', 2))
+
+IMAGE_EXTENSIONS = {'jpg', 'jpeg', 'png'}
+VIDEO_EXTENSIONS = {'mp4', 'mov'}
+
+_executor = None
+
+
+def thumbnail_path(root, digest, fmt):
+    """Path of a generated preview: <root>/thumbs/ab/<digest>.<fmt>"""
+    return os.path.join(root, 'thumbs', digest[:2], f'{digest}.{fmt}')
+
+
+def find_thumbnail(root, name, accept_webp=False):
+    """Return (path, mimetype) of the best ready preview for a media name, or (None, None)"""
+    match = HASHED_NAME_RE.match(name)
+    if not match:
+        return None, None
+    digest = match.group(1)
+    if accept_webp:
+        path = thumbnail_path(root, digest, 'webp')
+        if os.path.isfile(path):
+            return path, 'image/webp'
+    path = thumbnail_path(root, digest, 'jpg')
+    if os.path.isfile(path):
+        return path, 'image/jpeg'
+    return None, None
+
+
+def _extract_video_frame(video_path):
+    """Extract the first frame of a video to a temporary JPEG using ffmpeg, if installed"""
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        logger.info("ffmpeg not installed, skipping video poster")
+        return None
+
+    fd, frame_path = tempfile.mkstemp(suffix='.jpg')
+    os.close(fd)
+    try:
+        subprocess.run(
+            [ffmpeg, '-y', '-loglevel', 'error', '-i', video_path, '-frames:v', '1', frame_path],
+            check=True, timeout=30
+        )
+        return frame_path
+    except Exception as e:
+        logger.warning(f"Video poster extraction failed: {e}")
+        os.remove(frame_path)
+        return None
+
+
+def generate_previews(root, name):
+    """Generate JPEG and WebP previews for one stored media file"""
+    match = HASHED_NAME_RE.match(name)
+    if not match:
+        return
+    digest, ext = match.group(1), match.group(2)
+    if os.path.isfile(thumbnail_path(root, digest, 'jpg')):
+        return
+
+    source = resolve_path(root, name)
+    frame_path = None
+    try:
+        from PIL import Image, ImageOps, features
+
+        if ext in VIDEO_EXTENSIONS:
+            frame_path = _extract_video_frame(source)
+            if not frame_path:
+                return
+            source = frame_path
+        elif ext not in IMAGE_EXTENSIONS:
+            return
+
+        with Image.open(source) as img:
+            # draft() lets the JPEG decoder downscale while decoding
+            img.draft('RGB', (THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            img = ImageOps.exif_transpose(img).convert('RGB')
+            img.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+
+            os.makedirs(os.path.dirname(thumbnail_path(root, digest, 'jpg')), exist_ok=True)
+            formats = [('webp', 'WEBP')] if features.check('webp') else []
+            # JPEG is written last since its presence marks the previews as complete
+            formats.append(('jpg', 'JPEG'))
+            for fmt, pil_format in formats:
+                dest = thumbnail_path(root, digest, fmt)
+                tmp = f'{dest}.tmp'
+                img.save(tmp, pil_format, quality=THUMBNAIL_QUALITY, optimize=True)
+                os.replace(tmp, dest)
+
+        logger.info(f"Previews generated for {digest[:12]}")
+    except Exception as e:
+        logger.error(f"Preview generation error for {name}: {e}")
+    finally:
+        if frame_path and os.path.exists(frame_path):
+            os.remove(frame_path)
+
+
+def schedule_previews(root, name):
+    """Queue preview generation on the background worker pool"""
+    global _executor
+    try:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=THUMBNAIL_WORKERS, thread_name_prefix='thumbnails')
+        _executor.submit(generate_previews, root, name)
+    except Exception as e:
+        logger.error(f"Could not schedule previews for {name}: {e}")
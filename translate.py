@@ -1,6 +1,13 @@
+import hashlib
 import logging
+import os
+import threading
 import time
-from functools import lru_cache
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import language_detect
+from instrumentation import span
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -8,128 +15,94 @@ logger = logging.getLogger(__name__)
 # Language mapping
 LANG_MAP = {'en': 'en', 'sw': 'sw', 'ki': 'sw', 'kikuyu': 'sw'}
 
+TRANSLATION_UNAVAILABLE = "[Translation unavailable]"
+
+# Size of the in-process (L1) cache in front of the shared translation memory
+TRANSLATION_L1_SIZE = int(os.environ.get('TRANSLATION_L1_SIZE', 2000))
+
+# Maximum concurrent requests to the translation service from this process
+TRANSLATION_MAX_CONCURRENCY = int(os.environ.get('TRANSLATION_MAX_CONCURRENCY', 4))
+
+# Fields of one report are sent as a single request, one field per line
+BATCH_SEPARATOR = '\n'
+
+# Languages every report is translated into at ingestion (the station languages)
+REPORT_LANGUAGES = ('en', 'sw')
+REPORT_TRANSLATION_FIELDS = ('category', 'description', 'manual_location')
+TRANSLATION_WORKERS = int(os.environ.get('TRANSLATION_WORKERS', 2))
+
+# Alternative endpoint serving Google Translate's mobile page format (e.g. the benchmark stub)
+TRANSLATION_SERVICE_URL = os.environ.get('TRANSLATION_SERVICE_URL') or None
+
+_executor = None
+_translation_slots = threading.BoundedSemaphore(TRANSLATION_MAX_CONCURRENCY)
+_local = threading.local()
+_translator_cls = None
+
+# One set of counters for detection, both cache levels and the translation service
+_metrics = dict.fromkeys((
+    'detections', 'l1_hits', 'l2_hits', 'cache_misses',
+    'service_requests', 'service_errors', 'batch_fallbacks', 'unavailable'
+), 0)
+_metrics_lock = threading.Lock()
+
+
+def _count(name, amount=1):
+    with _metrics_lock:
+        _metrics[name] += amount
+
+
+def get_language_metrics():
+    """Snapshot of the language service counters and L1 cache size"""
+    with _metrics_lock:
+        snapshot = dict(_metrics)
+    snapshot['l1_size'] = len(_l1_cache)
+    snapshot['l1_capacity'] = TRANSLATION_L1_SIZE
+    return snapshot
+
 
 def detect_language(text: str) -> str:
     """
-    Detect language using enhanced heuristic analysis
+    Detect language with the offline detector (no network calls)
     Returns: 'en' for English, 'sw' for Swahili/Kiswahili
     """
-    if not text or not text.strip():
-        return 'en'
+    _count('detections')
+    return language_detect.detect(text)
 
-    text = text.strip()
 
-    # Try deep-translator first
-    try:
-        from deep_translator import single_detection
-        detected = single_detection(text, api_key=None)
-        if detected:
-            detected_lower = detected.lower()
-            # Map various codes to our supported languages
-            if detected_lower in ('sw', 'swahili', 'kiswahili'):
-                return 'sw'
-            elif detected_lower in ('en', 'english'):
-                return 'en'
-    except Exception as e:
-        logger.warning(f"Deep-translator detection failed: {e}")
-
-    # Enhanced heuristic fallback
-    text_lower = text.lower()
-
-    # Expanded Swahili word list (common words and phrases)
-    swahili_words = [
-        # Common verbs
-        'ni', 'na', 'wa', 'kwa', 'ya', 'cha', 'za',
-        # Pronouns
-        'mimi', 'wewe', 'yeye', 'sisi', 'ninyi', 'wao',
-        # Common words
-        'hii', 'hiyo', 'hizo', 'yule', 'huyu', 'wale', 'hawa',
-        'watu', 'mtu', 'kitu', 'vitu', 'mahali', 'wakati',
-        # Police/Crime related
-        'polisi', 'usalama', 'tukio', 'uhalifu', 'ajali',
-        # Common phrases
-        'tafadhali', 'asante', 'habari', 'jambo', 'karibu', 'samahani',
-        # Time
-        'sasa', 'leo', 'jana', 'kesho', 'juzi', 'asubuhi', 'jioni',
-        # Location
-        'hapa', 'pale', 'kule', 'karibu', 'mbali',
-        # Action words
-        'kuna', 'hakuna', 'ndiyo', 'hapana', 'kwamba', 'lakini',
-        # Possessives
-        'yake', 'yangu', 'yako', 'yetu', 'yenu', 'yao',
-        # Other common
-        'nimewona', 'nimesikia', 'ninaomba', 'nataka', 'nina',
-        'ameua', 'ameibiwa', 'amelipuka', 'amepigwa'
-    ]
+def _get_translator(src, dest):
+    """Reuse one GoogleTranslator per language pair and thread (instances are not thread-safe)"""
+    translators = getattr(_local, 'translators', None)
+    if translators is None:
+        translators = _local.translators = {}
+    translator = translators.get((src, dest))
+    if translator is None:
+        translator = translators[(src, dest)] = _translator_class()(source=src, target=dest)
+    return translator
 
-    # English indicator words (words that rarely appear in Swahili)
-    english_indicators = [
-        'the', 'and', 'are', 'was', 'were', 'been', 'being',
-        'have', 'has', 'had', 'having', 'can', 'could', 'would',
-        'should', 'will', 'shall', 'may', 'might', 'must',
-        'this', 'that', 'these', 'those', 'there', 'where',
-        'what', 'when', 'why', 'how', 'which', 'who', 'whom'
-    ]
 
-    # Split into words and clean
-    words = text_lower.split()
-    total_words = len(words)
-
-    if total_words == 0:
-        return 'en'
-
-    # Count Swahili and English indicators
-    swahili_count = 0
-    english_count = 0
-
-    for word in words:
-        # Remove punctuation for matching
-        clean_word = ''.join(c for c in word if c.isalnum())
-
-        if clean_word in swahili_words:
-            swahili_count += 1
-
-        if clean_word in english_indicators:
-            english_count += 1
-
-    # Calculate percentages
-    swahili_percentage = (swahili_count / total_words) * 100
-    english_percentage = (english_count / total_words) * 100
-
-    # Decision logic
-    # If we have strong Swahili indicators (2+ words or 20%+)
-    if swahili_count >= 2 or swahili_percentage >= 20:
-        logger.info(f"Detected Swahili: {swahili_count} words ({swahili_percentage:.1f}%)")
-        return 'sw'
-
-    # If we have strong English indicators
-    if english_count >= 3 or english_percentage >= 30:
-        logger.info(f"Detected English: {english_count} words ({english_percentage:.1f}%)")
-        return 'en'
-
-    # Check for common Swahili patterns
-    swahili_patterns = [
-        r'\bni\s+\w+',  # "ni watu", "ni kitu"
-        r'\bna\s+\w+',  # "na watu"
-        r'\bkwa\s+\w+',  # "kwa sababu"
-        r'\bya\s+\w+',  # "ya watu"
-        r'(ame|ana|ta)\w+',  # Swahili verb prefixes
-        r'\w+(ni|na|li|wa|ya|cha|za)$'  # Common Swahili suffixes
-    ]
+def _translator_class():
+    """GoogleTranslator, or with TRANSLATION_SERVICE_URL set, a subclass that sends requests there"""
+    global _translator_cls
+    if _translator_cls is not None:
+        return _translator_cls
+    from deep_translator import GoogleTranslator
 
-    import re
-    swahili_pattern_matches = 0
-    for pattern in swahili_patterns:
-        if re.search(pattern, text_lower):
-            swahili_pattern_matches += 1
+    if not TRANSLATION_SERVICE_URL:
+        _translator_cls = GoogleTranslator
+        return _translator_cls
 
-    if swahili_pattern_matches >= 2:
-        logger.info(f"Detected Swahili via patterns: {swahili_pattern_matches} matches")
-        return 'sw'
+    class ServiceTranslator(GoogleTranslator):
+        def __init__(self, source, target):
+            super().__init__(source=source, target=target)
+            # deep_translator has no public option for the endpoint; translate() requests self._base_url
+            if not isinstance(getattr(self, '_base_url', None), str):
+                raise RuntimeError("deep_translator no longer keeps its endpoint in _base_url, "
+                                   "so TRANSLATION_SERVICE_URL cannot be applied")
+            self._base_url = TRANSLATION_SERVICE_URL
 
-    # Default to English
-    logger.info(f"Defaulting to English (sw={swahili_count}, en={english_count})")
-    return 'en'
+    _translator_cls = ServiceTranslator
+    return _translator_cls
 
 
 def safe_translate(text, src='auto', dest='en', retries=3):
@@ -141,20 +114,136 @@ def safe_translate(text, src='auto', dest='en', retries=3):
 
     for attempt in range(retries):
         try:
-            from deep_translator import GoogleTranslator
-            translator = GoogleTranslator(source=src, target=dest)
-            result = translator.translate(text)
+            with _translation_slots:
+                _count('service_requests')
+                with span('google_translate', 'external'):
+                    result = _get_translator(src, dest).translate(text)
             if result:
                 return result
         except Exception as e:
+            _count('service_errors')
             logger.warning(f"Translation attempt {attempt + 1} failed: {e}")
             if attempt < retries - 1:
                 time.sleep(2 ** attempt)
 
-    return "[Translation unavailable]"
+    return TRANSLATION_UNAVAILABLE
+
+
+def safe_translate_batch(texts, src, dest, retries=3):
+    """
+    Translate several normalized texts with one request by sending them one per line.
+    Falls back to one request per text if the service does not keep the line structure.
+    """
+    if len(texts) == 1:
+        return [safe_translate(texts[0], src=src, dest=dest, retries=retries)]
+
+    for attempt in range(retries):
+        try:
+            with _translation_slots:
+                _count('service_requests')
+                with span('google_translate', 'external'):
+                    result = _get_translator(src, dest).translate(BATCH_SEPARATOR.join(texts))
+            if result:
+                parts = [part.strip() for part in result.split(BATCH_SEPARATOR)]
+                if len(parts) == len(texts):
+                    return parts
+                logger.warning(f"Batch translation returned {len(parts)} lines for {len(texts)} texts")
+                break
+        except Exception as e:
+            _count('service_errors')
+            logger.warning(f"Batch translation attempt {attempt + 1} failed: {e}")
+            if attempt < retries - 1:
+                time.sleep(2 ** attempt)
+
+    _count('batch_fallbacks')
+    return [safe_translate(text, src=src, dest=dest, retries=1) for text in texts]
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different inputs share one translation memory entry"""
+    return ' '.join(text.split())
+
+
+def text_hash(text):
+    """Translation memory key for already normalized text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+# L1: per-process LRU in front of the shared translation_memory collection (L2)
+_l1_cache = OrderedDict()
+_l1_lock = threading.Lock()
+
+
+def _l1_get(key):
+    with _l1_lock:
+        value = _l1_cache.get(key)
+        if value is not None:
+            _l1_cache.move_to_end(key)
+        return value
+
+
+def _l1_put(key, value):
+    with _l1_lock:
+        _l1_cache[key] = value
+        _l1_cache.move_to_end(key)
+        while len(_l1_cache) > TRANSLATION_L1_SIZE:
+            _l1_cache.popitem(last=False)
+
+
+def _memory_functions():
+    try:
+        from database import get_translation_memory, save_translation_memory
+        return get_translation_memory, save_translation_memory
+    except Exception as e:
+        logger.warning(f"Translation memory unavailable: {e}")
+        return None, None
+
+
+def translate_many(texts, src, dest):
+    """
+    Translate normalized texts from src to dest through L1, then L2, sending all misses
+    in one batch request. Failed translations are returned but never cached.
+    """
+    get_memory, save_memory = _memory_functions()
+    results = [None] * len(texts)
+    missing = []
+
+    for i, text in enumerate(texts):
+        key = (text_hash(text), src, dest)
+        cached = _l1_get(key)
+        if cached is not None:
+            _count('l1_hits')
+        elif get_memory:
+            cached = get_memory(*key)
+            if cached:
+                _count('l2_hits')
+                _l1_put(key, cached)
+        if cached:
+            results[i] = cached
+        else:
+            missing.append(i)
+
+    if missing:
+        _count('cache_misses', len(missing))
+        translated = safe_translate_batch([texts[i] for i in missing], src, dest)
+        for i, result in zip(missing, translated):
+            results[i] = result
+            if result == TRANSLATION_UNAVAILABLE:
+                _count('unavailable')
+                continue
+            key = (text_hash(texts[i]), src, dest)
+            _l1_put(key, result)
+            if save_memory:
+                save_memory(*key, texts[i], result)
+
+    return results
+
+
+def translate_with_memory(text, src, dest):
+    """Translate text between known languages through the translation memory"""
+    return translate_many([normalize_text(text)], src, dest)[0]
 
 
-@lru_cache(maxsize=200)
 def translate_text(text, target_lang):
     """SMART TRANSLATION with automatic language detection"""
     if not text or not text.strip():
@@ -169,28 +258,79 @@ def translate_text(text, target_lang):
     if src_lang == target:
         return text
 
-    return safe_translate(text, src=src_lang, dest=target)
+    return translate_with_memory(text, src_lang, target)
 
 
 def translate_report(report_dict, target_lang):
-    """BATCH TRANSLATION: Translates all fields in a report"""
+    """BATCH TRANSLATION: Translates all fields in a report with one detection and one request"""
     if not report_dict:
         return {}
 
-    translated = {}
-    for key, value in report_dict.items():
-        if not value:
-            translated[key] = value
-            continue
+    translated = dict(report_dict)
+    texts = {key: normalize_text(str(value)) for key, value in report_dict.items() if value}
+    texts = {key: text for key, text in texts.items() if text}
+    if not texts:
+        return translated
 
-        try:
-            translated[key] = translate_text(str(value), target_lang)
-        except:
-            translated[key] = value
+    target = LANG_MAP.get(target_lang.lower(), 'en')
+    # The description carries the most signal, so detect on all fields together
+    src_lang = LANG_MAP.get(detect_language(' '.join(texts.values())), 'en')
+    if src_lang == target:
+        return translated
+
+    try:
+        keys = list(texts)
+        for key, result in zip(keys, translate_many([texts[k] for k in keys], src_lang, target)):
+            translated[key] = result
+    except Exception as e:
+        logger.error(f"Report translation error: {e}")
 
     return translated
 
 
+def report_translation_fields(report):
+    """The text fields of a report that are translated"""
+    return {field: report.get(field, '') for field in REPORT_TRANSLATION_FIELDS}
+
+
+def is_complete_translation(translated):
+    """True if no field of a translated report failed"""
+    return TRANSLATION_UNAVAILABLE not in translated.values()
+
+
+def translate_report_at_ingestion(report_id, fields, source_lang):
+    """Translate a new report into every other station language and store the results on it"""
+    try:
+        from database import save_report_translation
+
+        for target in REPORT_LANGUAGES:
+            if target == source_lang:
+                continue
+            translated = translate_report(fields, target)
+            # Incomplete results are not stored; the dashboard translates those on demand
+            if is_complete_translation(translated):
+                save_report_translation(report_id, target, translated)
+    except Exception as e:
+        logger.error(f"Ingestion translation failed for {report_id}: {e}")
+
+
+def schedule_report_translation(report_id, fields, source_lang):
+    """Queue ingestion-time translation on the background worker pool"""
+    global _executor
+    try:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=TRANSLATION_WORKERS, thread_name_prefix='translation')
+        _executor.submit(translate_report_at_ingestion, report_id, fields, source_lang)
+    except Exception as e:
+        logger.error(f"Could not schedule translation for {report_id}: {e}")
+
+
+# With an endpoint override, fail at import rather than on the first translation if a
+# deep_translator upgrade changed the internals ServiceTranslator relies on
+if TRANSLATION_SERVICE_URL:
+    _translator_class()(source='en', target='sw')
+
+
 # Test function
 if __name__ == "__main__":
     print("\n=== Testing Translation Module ===\n")